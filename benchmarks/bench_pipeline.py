@@ -0,0 +1,139 @@
+"""
+Pipeline Benchmark
+
+Runs the CNT_27 transform and load pipeline end to end against the SQLite backend, so the ETL
+can be timed and profiled without Experity, Selenium or SQL Server. A synthetic raw export is
+generated, transformed with :class:`TransformCSV`, loaded with :class:`BulkLoadSQL` and the
+status rows are written with :class:`EtlStatusWriter`.
+
+Usage::
+
+    python benchmarks/bench_pipeline.py --rows 200000 --runs 3
+    python benchmarks/bench_pipeline.py --rows 200000 --profile
+    python benchmarks/bench_pipeline.py --rows 200000 --format parquet
+
+:module: bench_pipeline.py
+:platform: Unix, Windows
+:synopsis: Offline benchmark of the transform and load stages.
+"""
+
+import os
+import sys
+import time
+import random
+import pstats
+import argparse
+import cProfile
+import tempfile
+
+import polars as pl
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.pyodbc_sql import PyODBCSQL
+from utils.etl.transform_csv import TransformCSV
+from utils.etl.load_sql import BulkLoadSQL
+from utils.etl.schema_cache import SchemaCache
+from utils.etl.status_writer import EtlStatusWriter
+from utils.etl.report_config import PROCESSED_EXTENSIONS
+from utils.create_table_queries import cnt_27_staging_table, status_table
+
+
+CLIENT_ID = 16
+BASE_TABLE = "CNT_27_Staging_Base"
+STAGING_TABLE = f"CNT_27_Staging_{CLIENT_ID}"
+STATUS_TABLE = "data_uploads_status"
+
+
+def generate_cnt_27(path: str, rows: int, seed: int = 0) -> None:
+    """
+    Writes a synthetic CNT_27 export with the column layout and value formats of the Experity report.
+    """
+    rng = random.Random(seed)
+    clinics = ["Main St", "North, Campus", "O'Hare", "Downtown"]
+    payers = ["Aetna", "Blue Cross", "Self Pay", "Medicare"]
+    pl.DataFrame({
+        "Clinic": [rng.choice(clinics) for _ in range(rows)],
+        "Svc_Date": [f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/2024" for _ in range(rows)],
+        "Time_In": [f"{rng.randint(1, 12)}:{rng.randint(0, 59):02d} AM" for _ in range(rows)],
+        "Time_Out": [f"{rng.randint(1, 12)}:{rng.randint(0, 59):02d} PM" for _ in range(rows)],
+        "Status_Name": ["Discharged"] * rows,
+        "ArrivalStatus": ["Walk-In"] * rows,
+        "Class": ["Commercial"] * rows,
+        "Payer_Type": ["Primary"] * rows,
+        "Payer": [rng.choice(payers) for _ in range(rows)],
+        "Member_ID": [f"W{rng.randint(10**8, 10**9)}" for _ in range(rows)],
+        "Pat_Num": [str(rng.randint(1, 10**6)) for _ in range(rows)],
+        "Pat_Name": [f"Doe, Patient {i}" for i in range(rows)],
+        "Visit_Type": ["New"] * rows,
+        "Rendering_Phy": ["Smith, John MD"] * rows,
+        "SignOffSealedDate": ["03/16/2024 10:00:00 AM"] * rows,
+        "Log_Num": [str(i) for i in range(rows)],
+        "Inv_Num": [str(500000 + i) for i in range(rows)],
+        "Withhold_Code": [None] * rows,
+        "Total_Charge": [f"${rng.randint(0, 500000) / 100:,.2f}" for _ in range(rows)],
+    }).write_csv(path)
+
+
+def run_pipeline(sql: PyODBCSQL, work_dir: str, raw_file: str, run: int, file_format: str = "csv") -> dict[str, float]:
+    """
+    Runs one transform, load and status cycle and returns the seconds spent in each stage.
+    """
+    timings = {}
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    processed_file = os.path.join(work_dir, f"CNT_27_Processed_{run}{PROCESSED_EXTENSIONS[file_format]}")
+    load_csv = BulkLoadSQL(sql, empty_table=True, schema_cache=SchemaCache(ttl=None))
+    status_writer = EtlStatusWriter(sql, STATUS_TABLE)
+    etl_id = f"{CLIENT_ID}_CNT_27_bench_{run}"
+
+    start = time.perf_counter()
+    status_writer.log_etl_start(etl_id, CLIENT_ID, "CNT_27", stamp)
+    table_columns = load_csv.get_column_names(BASE_TABLE)
+    TransformCSV(CLIENT_ID, stamp).cnt_27(raw_file, processed_file, table_columns)
+    timings["transform"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_csv.load_report(processed_file, BASE_TABLE, STAGING_TABLE)
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    status_writer.log_etl_success(etl_id, stamp)
+    status_writer.close()
+    timings["status"] = time.perf_counter() - start
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the CNT_27 transform and load pipeline on SQLite.")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the synthetic report")
+    parser.add_argument("--runs", type=int, default=3, help="Number of timed runs")
+    parser.add_argument("--work_dir", help="Directory for the database and files, defaults to a temporary directory")
+    parser.add_argument("--profile", action="store_true", help="Profile a single run with cProfile")
+    parser.add_argument("--format", default="csv", choices=list(PROCESSED_EXTENSIONS), help="Format of the processed file")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="afc_bench_")
+    os.environ["SQLITE_DIR"] = work_dir
+    sql = PyODBCSQL("afc_bench", backend="sqlite")
+    sql.check_and_create_table(BASE_TABLE, cnt_27_staging_table(BASE_TABLE))
+    sql.check_and_create_table(STATUS_TABLE, status_table(STATUS_TABLE))
+
+    raw_file = os.path.join(work_dir, "CNT_27_Raw.csv")
+    generate_cnt_27(raw_file, args.rows)
+    print(f"Generated {args.rows} rows in {raw_file}")
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.runcall(run_pipeline, sql, work_dir, raw_file, 0, args.format)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(30)
+        return
+
+    for run in range(args.runs):
+        timings = run_pipeline(sql, work_dir, raw_file, run, args.format)
+        loaded = sql.execute_query(f"SELECT COUNT(*) FROM {STAGING_TABLE}")[0][0]
+        summary = ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in timings.items())
+        print(f"Run {run + 1}: {summary}, {loaded} rows loaded ({args.rows / sum(timings.values()):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Sanitize Benchmark
+
+Times :meth:`TransformCSV.remove_commas_apos_from_df` on a synthetic frame with the columns of
+the wide CHT_02 table, against the previous implementation that cast every column to text, ran
+two ``replace_all`` calls and cast it back. Both are timed eagerly and inside a lazy plan, and
+their outputs are checked to be equal.
+
+Usage::
+
+    python benchmarks/bench_sanitize.py --rows 200000 --runs 5
+
+:module: bench_sanitize.py
+:platform: Unix, Windows
+:synopsis: Micro-benchmark of the comma and apostrophe sanitizer.
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+
+import polars as pl
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.etl.transform_csv import TransformCSV
+from utils.create_table_queries import cht_02_staging_table
+
+
+def legacy_remove_commas_apos(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    The sanitizer as it was before, kept here as the baseline.
+    """
+    def remove_commas_apos(series: pl.Series) -> pl.Series:
+        if series.dtype in [pl.Date, pl.Datetime, pl.Boolean]:
+            return series
+        return series.cast(pl.Utf8).str.replace_all(",", "").str.replace_all("'", "").cast(series.dtype, strict=False)
+    return df.with_columns([remove_commas_apos(df[col]).alias(col) for col in df.columns])
+
+
+def generate_frame(rows: int) -> pl.DataFrame:
+    """
+    Builds a CHT_02-shaped frame: every table column as text, plus a few numeric and date columns
+    as they look after currency and date parsing.
+    """
+    columns = re.findall(r"^\s*(\w+)\s+NVARCHAR", cht_02_staging_table(), re.MULTILINE)
+    i = pl.int_range(0, rows, eager=True)
+    values = ["Smith, John MD", "O'Brien", "J45.909 Asthma, uncomplicated", None, "plain text"]
+    text = {col: [values[(n + k) % len(values)] for n in range(rows)] for k, col in enumerate(columns)}
+    return pl.DataFrame(text).with_columns(
+        (i / 100).alias("Charge_Amt"),
+        (i % 1000).cast(pl.Int32).alias("Client_ID"),
+        pl.lit(None).alias("Missing_Col"),
+    )
+
+
+def best_of(runs: int, func) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the comma and apostrophe sanitizer on a CHT_02-shaped frame.")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the synthetic frame")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs, the best is reported")
+    args = parser.parse_args()
+
+    frame = generate_frame(args.rows)
+    transform = TransformCSV(16, "2025-01-01 00:00:00")
+    print(f"{frame.height} rows x {frame.width} columns")
+
+    if not legacy_remove_commas_apos(frame).equals(transform.remove_commas_apos_from_df(frame)):
+        raise AssertionError("The sanitizers produced different frames.")
+
+    results = {
+        "legacy, eager": best_of(args.runs, lambda: legacy_remove_commas_apos(frame)),
+        "current, eager": best_of(args.runs, lambda: transform.remove_commas_apos_from_df(frame)),
+        "current, lazy": best_of(args.runs, lambda: transform.remove_commas_apos_from_df(frame.lazy()).collect()),
+    }
+    baseline = results["legacy, eager"]
+    for name, seconds in results.items():
+        print(f"{name:<15} {seconds:.3f}s  ({baseline / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
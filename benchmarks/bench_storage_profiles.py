@@ -0,0 +1,153 @@
+"""
+Storage Profile Benchmark
+
+Compares the storage profiles of :func:`utils.create_table_queries.apply_storage_profile` on
+synthetic multi-year, multi-client revenue data. For every profile a table is created, loaded
+and queried with typical dashboard queries; load time, query times and table size are reported.
+
+Requires SQL Server. ``BULK INSERT`` reads the CSV on the server, so pass a ``--csv_dir`` that
+the server can read (a share or a local path when the server runs on this machine). Without it
+rows are loaded with ``fast_executemany`` instead.
+
+Usage::
+
+    python benchmarks/bench_storage_profiles.py --db_name afc_bench --rows 2000000 --csv_dir \\\\fileserver\\bench
+
+:module: bench_storage_profiles.py
+:platform: Unix, Windows
+:synopsis: Load and query benchmark of columnstore, compression and clustered key profiles.
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import date
+
+import polars as pl
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.pyodbc_sql import PyODBCSQL
+from utils.sql_backends import BulkInsertOptions
+from utils.create_table_queries import STORAGE_PROFILES, apply_storage_profile
+
+
+def bench_table(table_name: str) -> str:
+    """
+    Typed REV_16-like table, so every profile (including the clustered date key) applies.
+    """
+    return f"""
+    CREATE TABLE {table_name}(
+        Clinic NVARCHAR(100),
+        Rev_Type NVARCHAR(50),
+        Category NVARCHAR(100),
+        Inv_Num NVARCHAR(20),
+        Pat_Num NVARCHAR(20),
+        Svc_Date DATE,
+        Payer NVARCHAR(100),
+        Charge_Amt DECIMAL(18,2),
+        Paid_Amt DECIMAL(18,2),
+        Client_ID INT,
+        Date_Updated DATETIME
+    );
+    """
+
+
+QUERIES = {
+    "monthly revenue, all clients": """
+        SELECT Client_ID, YEAR(Svc_Date), MONTH(Svc_Date), SUM(Charge_Amt), SUM(Paid_Amt)
+        FROM {table} GROUP BY Client_ID, YEAR(Svc_Date), MONTH(Svc_Date);""",
+    "one client, one quarter": """
+        SELECT Clinic, Category, COUNT(*), SUM(Charge_Amt)
+        FROM {table} WHERE Client_ID = 7 AND Svc_Date >= '2024-01-01' AND Svc_Date < '2024-04-01'
+        GROUP BY Clinic, Category;""",
+    "payer mix, last year": """
+        SELECT Payer, SUM(Paid_Amt) FROM {table} WHERE Svc_Date >= '2024-01-01' GROUP BY Payer;""",
+}
+
+
+def generate_rows(rows: int, clients: int, seed: int = 0) -> pl.DataFrame:
+    """
+    Builds ``rows`` synthetic revenue lines spread over ``clients`` clients and three years.
+    """
+    i = pl.col("i")
+    return pl.DataFrame({"i": pl.int_range(0, rows, eager=True)}).select(
+        ("Clinic " + ((i * 31) % 40).cast(pl.Utf8)).alias("Clinic"),
+        pl.when(i % 3 == 0).then(pl.lit("Visit")).when(i % 3 == 1).then(pl.lit("Procedure")).otherwise(pl.lit("Lab")).alias("Rev_Type"),
+        ("Category " + ((i * 17) % 25).cast(pl.Utf8)).alias("Category"),
+        (i + 100000).cast(pl.Utf8).alias("Inv_Num"),
+        ((i * 13) % 250000).cast(pl.Utf8).alias("Pat_Num"),
+        (pl.lit(date(2022, 1, 1)) + pl.duration(days=(i * 7919 + seed) % (3 * 365))).alias("Svc_Date"),
+        ("Payer " + ((i * 7) % 60).cast(pl.Utf8)).alias("Payer"),
+        ((i * 7127) % 50000 / 100).round(2).alias("Charge_Amt"),
+        ((i * 5051) % 40000 / 100).round(2).alias("Paid_Amt"),
+        (i % clients + 1).cast(pl.Int32).alias("Client_ID"),
+        pl.lit("2025-01-01 00:00:00").alias("Date_Updated"),
+    )
+
+
+def load(sql: PyODBCSQL, table: str, frame: pl.DataFrame, csv_path: str | None) -> float:
+    start = time.perf_counter()
+    if csv_path:
+        sql.csv_bulk_insert(csv_path, table, BulkInsertOptions(tablock=True))
+    else:
+        placeholders = ", ".join("?" * frame.width)
+        for batch in frame.iter_slices(50000):
+            sql.execute_many(f"INSERT INTO {table} VALUES ({placeholders});", batch.rows())
+    return time.perf_counter() - start
+
+
+def table_size_mb(sql: PyODBCSQL, table: str) -> float:
+    return sql.execute_query(
+        """SELECT SUM(a.total_pages) * 8 / 1024.0 FROM sys.partitions p
+           JOIN sys.allocation_units a ON a.container_id = p.partition_id
+           WHERE p.object_id = OBJECT_ID(?);""", (table,)
+    )[0][0] or 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark table storage profiles on synthetic data.")
+    parser.add_argument("--db_name", required=True, help="Name of the database")
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows loaded per profile")
+    parser.add_argument("--clients", type=int, default=30, help="Number of synthetic clients")
+    parser.add_argument("--runs", type=int, default=5, help="Executions per query, the median is reported")
+    parser.add_argument("--profiles", nargs="+", default=list(STORAGE_PROFILES), choices=STORAGE_PROFILES)
+    parser.add_argument("--csv_dir", help="Directory readable by SQL Server, enables BULK INSERT loads")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark tables")
+    args = parser.parse_args()
+
+    sql = PyODBCSQL(args.db_name)
+    frame = generate_rows(args.rows, args.clients)
+    csv_path = None
+    if args.csv_dir:
+        csv_path = os.path.join(args.csv_dir, "bench_storage_profiles.csv")
+        frame.write_csv(csv_path)
+    print(f"Generated {args.rows} rows for {args.clients} clients.")
+
+    results = []
+    for profile in args.profiles:
+        table = f"Bench_Storage_{profile}"
+        sql.execute_query(f"DROP TABLE IF EXISTS {table};")
+        sql.execute_query(apply_storage_profile(bench_table(table), profile, "Svc_Date"))
+
+        result = {"profile": profile, "load_s": load(sql, table, frame, csv_path)}
+        result["size_mb"] = table_size_mb(sql, table)
+        for name, query in QUERIES.items():
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                sql.execute_query(query.format(table=table))
+                timings.append(time.perf_counter() - start)
+            result[name] = sorted(timings)[len(timings) // 2]
+        results.append(result)
+
+        if not args.keep:
+            sql.execute_query(f"DROP TABLE {table};")
+
+    with pl.Config(tbl_cols=-1, tbl_width_chars=200, float_precision=3):
+        print(pl.DataFrame(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,15 +13,21 @@ from utils.experity_base import ExperityBase
 from utils.experity_base import ExperityBase
 from utils.selenium_driver import SeleniumDriver
 
-from utils.etl.transform_csv import TransformCSV
+from utils.etl.transform_executor import TransformExecutor
 from utils.etl.extract_report import ExtractReports
 from utils.etl.load_sql import BulkLoadSQL
 from utils.etl import report_config
+from utils.etl.schema_cache import schema_cache
+from utils.etl.status_writer import EtlStatusWriter
+from utils.etl.run_manifest import RunManifest, file_digest
+from utils.etl.snapshot_delta import SnapshotDelta
+from utils.etl.validation import ReportValidator, RowCountHistory
 from utils.create_table_queries import status_table
 
 class ReportETL:
-    def __init__(self, db_name, client_id):
+    def __init__(self, db_name, client_id, credential=None, client_processes=1):
         self.client_id = client_id
+        self.credential = credential
         self.BROWSER = report_config.BROWSER
         self.LOG_DIR = report_config.LOG_DIR
         self.TIME_OUT = report_config.TIME_OUT
@@ -36,14 +42,26 @@ class ReportETL:
         self.RAW_DIR = os.path.join(self.DWLD_DIR, 'Raw')
         file_folder.init_directory(self.DWLD_DIR)
         self.sql = PyODBCSQL(db_name)
+        schema_cache.configure(ttl=report_config.SCHEMA_CACHE_TTL, persist_path=report_config.SCHEMA_CACHE_FILE)
         sel_driver = SeleniumDriver(self.BROWSER, self.DWLD_DIR)
         self.driver = sel_driver.setup_driver()
         self.experity = ExperityBase(self.driver, self.TIME_OUT)
         self.task_q = TaskQueue()
-        self.trns_csv = TransformCSV(self.client_id, self.DT_STAMP)
-        self.load_csv = BulkLoadSQL(self.sql, empty_table=True)
+        self.transforms = TransformExecutor(self.client_id, self.DT_STAMP, workers=report_config.TRANSFORM_WORKERS,
+                                            client_processes=client_processes,
+                                            memory_total=report_config.TRANSFORM_MEMORY_BUDGET_MB * 1024 * 1024,
+                                            chunk_threshold=report_config.TRANSFORM_CHUNK_THRESHOLD_MB * 1024 * 1024,
+                                            date_formats_file=report_config.DATE_FORMATS_FILE)
+        self.load_csv = BulkLoadSQL(self.sql, empty_table=True, load_mode=report_config.LOAD_MODE,
+                                    delete_missing=report_config.MERGE_DELETE_MISSING,
+                                    delta=SnapshotDelta(report_config.SNAPSHOT_DIR) if report_config.DELTA_LOADS else None)
         self.rpt_config = report_config.ReportConfig(self.client_id)
+        self.manifest = RunManifest(os.path.join(report_config.RUN_MANIFEST_DIR, f"{self.client_id}.json"))
+        self.validator = ReportValidator(
+            RowCountHistory(os.path.join(report_config.VALIDATION_HISTORY_DIR, f"{self.client_id}.json"))
+        ) if report_config.VALIDATE_REPORTS else None
         self.STATUS_TABLE = 'data_uploads_status'
+        self.status_writer = EtlStatusWriter(self.sql, self.STATUS_TABLE)
 
         file_folder.create_directories([self.LOG_DIR, self.DWLD_DIR, self.RAW_DIR])
         self.CLIENT_TODAY_DIR = os.path.join(self.DWLD_DIR, self.DATE_STAMP)
@@ -51,450 +69,374 @@ class ReportETL:
 
         self.sql.check_and_create_table(self.STATUS_TABLE, status_table(self.STATUS_TABLE))
 
+    def load_options(self, report_cfg):
+        return {
+            "merge_keys": report_cfg.get("merge_keys"),
+            "date_column": report_cfg.get("date_column"),
+            "window": report_config.report_window(report_cfg),
+            "bulk_options": report_cfg.get("bulk_options", report_config.BULK_INSERT_OPTIONS),
+            "client_id": self.client_id,
+        }
+
+    def submit_report(self, report, report_cfg, table_columns, etl_id):
+        """
+        Hand a downloaded report over to the transform pool and queue its load.
+
+        Runs in the extract step: the raw file is checked and submitted to the shared transform
+        pool, and the returned future is queued with the load, so the browser extracts the next
+        report while this one is transformed. Loads run one at a time on the task queue.
+
+        If the raw file is identical to the one last loaded for the same report window and table
+        columns, the report is logged as unchanged without being transformed and loaded.
+        """
+        raw_file = os.path.join(self.RAW_DIR, report_cfg['raw_file'])
+        processed_file = os.path.join(self.DWLD_DIR, report_cfg['processed_file'])
+        window = report_config.report_window(report_cfg)
+        raw_digest = file_digest(raw_file)
+        if report_config.SKIP_UNCHANGED_REPORTS and self.manifest.is_unchanged(report_cfg['report_name'], window, raw_digest, table_columns):
+            print(f"{report_cfg['report_name']} is unchanged since the last load of the same window, skipping transform and load.")
+            file_folder.delete_paths(raw_file)
+            self.status_writer.log_etl_unchanged(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            return
+
+        if self.validator is not None:
+            self.validator.check_raw(report, raw_file)
+        future = self.transforms.submit(report, raw_file, processed_file, table_columns)
+        self.task_q.add_task(self.load_transformed, future, report, report_cfg, table_columns, etl_id, raw_digest)
+
+    def load_transformed(self, future, report, report_cfg, table_columns, etl_id, raw_digest):
+        """
+        Wait for the transform of a report, then load it, archive the processed file and log the result.
+
+        The processed file is checked by the validation gate, which raises ``DataQualityException``
+        and keeps the raw file when a check fails. Errors are logged as the report's failure here,
+        so they do not stop the loads of the other reports on the task queue.
+        """
+        try:
+            raw_file = os.path.join(self.RAW_DIR, report_cfg['raw_file'])
+            processed_file = os.path.join(self.DWLD_DIR, report_cfg['processed_file'])
+            window = report_config.report_window(report_cfg)
+            future.result()
+            if self.validator is not None:
+                validation = self.validator.validate(report, processed_file, report_cfg.get('date_column'), window)
+            file_folder.delete_paths(raw_file)
+            self.load_csv.load_report(processed_file, report_cfg['base_table'], report_cfg['staging_table'], **self.load_options(report_cfg))
+            if self.validator is not None:
+                self.validator.record(report, validation.rows, window)
+            self.manifest.record(report_cfg['report_name'], window, raw_digest, file_digest(processed_file), table_columns)
+            file_folder.move_file(processed_file, self.CLIENT_TODAY_DIR)
+            self.status_writer.log_etl_success(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+        except Exception as e:
+            print(f"{report_cfg['report_name']} Error occured : {e}")
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+
     def experity_login(self):
         etl_id = f'{self.client_id}_LOGIN_{self.DATE_STAMP}_{self.TIME_STAMP}'
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, "LOGIN", f"{self.DATE_STAMP} {self.TIME_STAMP}")
-            # NOTE: It'll take only the first client credentials
-            client_id, username, password = self.sql.get_users_credentials([self.client_id])[0]
+            self.status_writer.log_etl_start(etl_id, self.client_id, "LOGIN", f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            if self.credential is not None:
+                client_id, username, password = self.credential
+            else:
+                # NOTE: It'll take only the first client credentials
+                client_id, username, password = self.sql.get_users_credentials([self.client_id])[0]
             self.experity.open_portal(self.EXRTY_URL)
             self.experity_version = self.experity.experity_version()
             self.exct_rep = ExtractReports(self.driver, self.experity, self.EXRTY_URL, self.experity_version, self.EXPORT_TYPE, self.DWLD_DIR, self.TIME_OUT)
             self.experity.login(username, password)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            if self.credential is not None:
+                self.credential.clear()
+            self.status_writer.log_etl_success(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
         except Exception as e:
             print(f"Something Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_cnt_27(self, from_date, to_date):
         cnt_27_cfg = self.rpt_config.cnt_27(from_date, to_date)
         etl_id = f"{self.client_id}_{cnt_27_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, cnt_27_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, cnt_27_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.cnt_27(cnt_27_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, cnt_27_cfg['file_name']), os.path.join(self.RAW_DIR,cnt_27_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, cnt_27_cfg['file_name']), os.path.join(self.RAW_DIR,cnt_27_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(cnt_27_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.cnt_27, os.path.join(self.RAW_DIR, cnt_27_cfg['raw_file']), os.path.join(self.DWLD_DIR, cnt_27_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,cnt_27_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, cnt_27_cfg['processed_file']), cnt_27_cfg['base_table'], cnt_27_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, cnt_27_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("cnt_27", cnt_27_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{cnt_27_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_cnt_19(self, from_date, to_date):
         cnt_19_cfg = self.rpt_config.cnt_19(from_date, to_date)
         etl_id = f"{self.client_id}_{cnt_19_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, cnt_19_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, cnt_19_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.cnt_19(cnt_19_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, cnt_19_cfg['file_name']), os.path.join(self.RAW_DIR,cnt_19_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, cnt_19_cfg['file_name']), os.path.join(self.RAW_DIR,cnt_19_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(cnt_19_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.cnt_19, os.path.join(self.RAW_DIR,cnt_19_cfg['raw_file']), os.path.join(self.DWLD_DIR,cnt_19_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,cnt_19_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report,os.path.join(self.DWLD_DIR, cnt_19_cfg['processed_file']), cnt_19_cfg['base_table'], cnt_19_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, cnt_19_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("cnt_19", cnt_19_cfg, table_columns, etl_id)
 
         except Exception as e:
             print(f"{cnt_19_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_adj_11(self, from_date, to_date):
         adj_11_cfg = self.rpt_config.adj_11(from_date, to_date)
         etl_id = f"{self.client_id}_{adj_11_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, adj_11_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, adj_11_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.adj_11(adj_11_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, adj_11_cfg['file_name']), os.path.join(self.RAW_DIR,adj_11_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, adj_11_cfg['file_name']), os.path.join(self.RAW_DIR,adj_11_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(adj_11_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.adj_11, os.path.join(self.RAW_DIR, adj_11_cfg['raw_file']), os.path.join(self.DWLD_DIR, adj_11_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,adj_11_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, adj_11_cfg['processed_file']), adj_11_cfg['base_table'], adj_11_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, adj_11_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("adj_11", adj_11_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{adj_11_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_fin_18(self, from_date, to_date):
         fin_18_cfg = self.rpt_config.fin_18(from_date, to_date)
         etl_id = f"{self.client_id}_{fin_18_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try :
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, fin_18_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, fin_18_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.fin_18(fin_18_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, fin_18_cfg['file_name']), os.path.join(self.RAW_DIR,fin_18_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, fin_18_cfg['file_name']), os.path.join(self.RAW_DIR,fin_18_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(fin_18_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.fin_18, os.path.join(self.RAW_DIR, fin_18_cfg['raw_file']), os.path.join(self.DWLD_DIR, fin_18_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,fin_18_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, fin_18_cfg['processed_file']), fin_18_cfg['base_table'], fin_18_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, fin_18_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("fin_18", fin_18_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{fin_18_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_pay_41(self, from_date, to_date):
         pay_41_cfg = self.rpt_config.pay_41(from_date, to_date)
         etl_id = f"{self.client_id}_{pay_41_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, pay_41_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, pay_41_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.pay_41(pay_41_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, pay_41_cfg['file_name']), os.path.join(self.RAW_DIR,pay_41_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, pay_41_cfg['file_name']), os.path.join(self.RAW_DIR,pay_41_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(pay_41_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.pay_41, os.path.join(self.RAW_DIR, pay_41_cfg['raw_file']), os.path.join(self.DWLD_DIR, pay_41_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,pay_41_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, pay_41_cfg['processed_file']), pay_41_cfg['base_table'], pay_41_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, pay_41_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("pay_41", pay_41_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{pay_41_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_xry_03(self, from_date, to_date):
         xry_03_cfg = self.rpt_config.xry_03(from_date, to_date)
         etl_id = f"{self.client_id}_{xry_03_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, xry_03_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, xry_03_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.xry_03(xry_03_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, xry_03_cfg['file_name']), os.path.join(self.RAW_DIR,xry_03_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, xry_03_cfg['file_name']), os.path.join(self.RAW_DIR,xry_03_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(xry_03_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.xry_03, os.path.join(self.RAW_DIR, xry_03_cfg['raw_file']), os.path.join(self.DWLD_DIR, xry_03_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,xry_03_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report,  os.path.join(self.DWLD_DIR, xry_03_cfg['processed_file']), xry_03_cfg['base_table'], xry_03_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, xry_03_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("xry_03", xry_03_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{xry_03_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def rtl_pay_10(self, from_date, to_date):
         pay_10_cfg = self.rpt_config.pay_10(from_date, to_date)
         etl_id = f"{self.client_id}_{pay_10_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, pay_10_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, pay_10_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.pay_10(pay_10_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, pay_10_cfg['file_name']), os.path.join(self.RAW_DIR,pay_10_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, pay_10_cfg['file_name']), os.path.join(self.RAW_DIR,pay_10_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(pay_10_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.pay_10, os.path.join(self.RAW_DIR, pay_10_cfg['raw_file']), os.path.join(self.DWLD_DIR, pay_10_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,pay_10_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, pay_10_cfg['processed_file']), pay_10_cfg['base_table'], pay_10_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, pay_10_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("pay_10", pay_10_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{pay_10_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_ccr_02(self, from_date, to_date):
         ccr2_cfg = self.rpt_config.ccr_2(from_date, to_date)
         etl_id = f"{self.client_id}_{ccr2_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, ccr2_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, ccr2_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.ccr_02(ccr2_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, ccr2_cfg['file_name']), os.path.join(self.RAW_DIR,ccr2_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, ccr2_cfg['file_name']), os.path.join(self.RAW_DIR,ccr2_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(ccr2_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.ccr_02, os.path.join(self.RAW_DIR, ccr2_cfg['raw_file']), os.path.join(self.DWLD_DIR, ccr2_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,ccr2_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, ccr2_cfg['processed_file']), ccr2_cfg['base_table'], ccr2_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, ccr2_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("ccr_02", ccr2_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{ccr2_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
         
 
     def etl_ccr_03(self, from_date, to_date):
         ccr3_cfg = self.rpt_config.ccr_3(from_date, to_date)
         etl_id = f"{self.client_id}_{ccr3_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, ccr3_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, ccr3_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.ccr_03(ccr3_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, ccr3_cfg['file_name']), os.path.join(self.RAW_DIR,ccr3_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, ccr3_cfg['file_name']), os.path.join(self.RAW_DIR,ccr3_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(ccr3_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.ccr_03, os.path.join(self.RAW_DIR, ccr3_cfg['raw_file']), os.path.join(self.DWLD_DIR, ccr3_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,ccr3_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, ccr3_cfg['processed_file']), ccr3_cfg['base_table'], ccr3_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, ccr3_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("ccr_03", ccr3_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{ccr3_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_per_02(self, from_date, to_date):
         per_02_cfg = self.rpt_config.per_2(from_date, to_date)
         etl_id = f"{self.client_id}_{per_02_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, per_02_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, per_02_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.per_02(per_02_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, per_02_cfg['file_name']), os.path.join(self.RAW_DIR,per_02_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, per_02_cfg['file_name']), os.path.join(self.RAW_DIR,per_02_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(per_02_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.per_02, os.path.join(self.RAW_DIR, per_02_cfg['raw_file']), os.path.join(self.DWLD_DIR, per_02_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,per_02_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, per_02_cfg['processed_file']), per_02_cfg['base_table'], per_02_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, per_02_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("per_02", per_02_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{per_02_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_med_01(self, from_date, to_date):
         med_1_cfg = self.rpt_config.med_01(from_date, to_date)
         etl_id = f"{self.client_id}_{med_1_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, med_1_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, med_1_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.med_01(med_1_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, med_1_cfg['file_name']), os.path.join(self.RAW_DIR,med_1_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, med_1_cfg['file_name']), os.path.join(self.RAW_DIR,med_1_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(med_1_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.med_01, os.path.join(self.RAW_DIR, med_1_cfg['raw_file']), os.path.join(self.DWLD_DIR, med_1_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,med_1_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, med_1_cfg['processed_file']), med_1_cfg['base_table'], med_1_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, med_1_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("med_01", med_1_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{med_1_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_pat_20(self, from_date, to_date):
         pat_20_cfg = self.rpt_config.pat_20(from_date, to_date)
         etl_id = f"{self.client_id}_{pat_20_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, pat_20_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, pat_20_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.pat_20(pat_20_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, pat_20_cfg['file_name']), os.path.join(self.RAW_DIR,pat_20_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, pat_20_cfg['file_name']), os.path.join(self.RAW_DIR,pat_20_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(pat_20_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.pat_20, os.path.join(self.RAW_DIR, pat_20_cfg['raw_file']), os.path.join(self.DWLD_DIR, pat_20_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,pat_20_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, pat_20_cfg['processed_file']), pat_20_cfg['base_table'], pat_20_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, pat_20_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("pat_20", pat_20_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{pat_20_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_lab_01(self, from_date, to_date):
         lab_1_cfg = self.rpt_config.lab_01(from_date, to_date)
         etl_id = f"{self.client_id}_{lab_1_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, lab_1_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, lab_1_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.lab_01(lab_1_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, lab_1_cfg['file_name']), os.path.join(self.RAW_DIR,lab_1_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, lab_1_cfg['file_name']), os.path.join(self.RAW_DIR,lab_1_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(lab_1_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.lab_01, os.path.join(self.RAW_DIR, lab_1_cfg['raw_file']), os.path.join(self.DWLD_DIR, lab_1_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,lab_1_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, lab_1_cfg['processed_file']), lab_1_cfg['base_table'], lab_1_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, lab_1_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("lab_01", lab_1_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{lab_1_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_cht_02(self, from_date, to_date):
         cht_2_cfg = self.rpt_config.cht_02(from_date, to_date)
         etl_id = f"{self.client_id}_{cht_2_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, cht_2_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, cht_2_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.cht_02(cht_2_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, cht_2_cfg['file_name']), os.path.join(self.RAW_DIR,cht_2_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, cht_2_cfg['file_name']), os.path.join(self.RAW_DIR,cht_2_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(cht_2_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.cht_02, os.path.join(self.RAW_DIR, cht_2_cfg['raw_file']), os.path.join(self.DWLD_DIR, cht_2_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,cht_2_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, cht_2_cfg['processed_file']), cht_2_cfg['base_table'], cht_2_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, cht_2_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("cht_02", cht_2_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{cht_2_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_pat_02(self, from_date, to_date):
         pat_2_cfg = self.rpt_config.pat_2(from_date, to_date)
         etl_id = f"{self.client_id}_{pat_2_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, pat_2_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, pat_2_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.pat_2(pat_2_cfg['report_name'], from_date, to_date)
-            self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, pat_2_cfg['file_name']), os.path.join(self.RAW_DIR,pat_2_cfg['raw_file']))
+            file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, pat_2_cfg['file_name']), os.path.join(self.RAW_DIR,pat_2_cfg['raw_file']))
             table_columns = self.load_csv.get_column_names(pat_2_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.pat_02, os.path.join(self.RAW_DIR, pat_2_cfg['raw_file']), os.path.join(self.DWLD_DIR, pat_2_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,pat_2_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, pat_2_cfg['processed_file']), pat_2_cfg['base_table'], pat_2_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, pat_2_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("pat_02", pat_2_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{pat_2_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_adj_04(self, from_month, to_month):
         adj_4_cfg = self.rpt_config.adj_4(from_month, to_month)
         etl_id = f"{self.client_id}_{adj_4_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, adj_4_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, adj_4_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.adj_4(adj_4_cfg['report_name'], from_month, to_month)
-            self.task_q.add_task(self.trns_csv.combine_csv_files, self.DWLD_DIR, os.path.join(self.RAW_DIR, adj_4_cfg['raw_file']), adj_4_cfg['report_name'])
+            self.transforms.run("combine_csv_files", self.DWLD_DIR, os.path.join(self.RAW_DIR, adj_4_cfg['raw_file']), adj_4_cfg['report_name'])
             table_columns = self.load_csv.get_column_names(adj_4_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.adj_4, os.path.join(self.RAW_DIR, adj_4_cfg['raw_file']), os.path.join(self.DWLD_DIR, adj_4_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,adj_4_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, adj_4_cfg['processed_file']), adj_4_cfg['base_table'], adj_4_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, adj_4_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("adj_4", adj_4_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{adj_4_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_pay_04(self, from_month, to_month):
         pay_4_cfg = self.rpt_config.pay_4(from_month, to_month)
         etl_id = f"{self.client_id}_{pay_4_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, pay_4_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, pay_4_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.pay_4(pay_4_cfg['report_name'], from_month, to_month)
-            self.task_q.add_task(self.trns_csv.combine_csv_files, self.DWLD_DIR, os.path.join(self.RAW_DIR,pay_4_cfg['raw_file']), pay_4_cfg['report_name'])
+            self.transforms.run("combine_csv_files", self.DWLD_DIR, os.path.join(self.RAW_DIR,pay_4_cfg['raw_file']), pay_4_cfg['report_name'])
             table_columns = self.load_csv.get_column_names(pay_4_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.pay_4, os.path.join(self.RAW_DIR, pay_4_cfg['raw_file']), os.path.join(self.DWLD_DIR, pay_4_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR, pay_4_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, pay_4_cfg['processed_file']), pay_4_cfg['base_table'], pay_4_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, pay_4_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("pay_4", pay_4_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{pay_4_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def etl_rev_16(self, from_month, to_month):
         rev_16_cfg = self.rpt_config.rev_16(from_month, to_month)
         etl_id = f"{self.client_id}_{rev_16_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
         try:
-            self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, rev_16_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.status_writer.log_etl_start(etl_id, self.client_id, rev_16_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
             self.exct_rep.rev_16(rev_16_cfg['report_name'], from_month, to_month)
-            self.task_q.add_task(self.trns_csv.combine_csv_files, self.DWLD_DIR, os.path.join(self.RAW_DIR, rev_16_cfg['raw_file']), rev_16_cfg['report_name'])
+            self.transforms.run("combine_csv_files", self.DWLD_DIR, os.path.join(self.RAW_DIR, rev_16_cfg['raw_file']), rev_16_cfg['report_name'])
             table_columns = self.load_csv.get_column_names(rev_16_cfg['base_table'])
-            self.task_q.add_task(self.trns_csv.rev_16, os.path.join(self.RAW_DIR, rev_16_cfg['raw_file']), os.path.join(self.DWLD_DIR, rev_16_cfg['processed_file']), table_columns)
-            self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,rev_16_cfg['raw_file']))
-            self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, rev_16_cfg['processed_file']), rev_16_cfg['base_table'], rev_16_cfg['staging_table'])
-            self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, rev_16_cfg['processed_file']), self.CLIENT_TODAY_DIR)
-            self.task_q.wait_for_completion()
-            error = self.task_q.check_and_raise_error()
-            if error:
-                raise Exception(error)
-            self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+            self.submit_report("rev_16", rev_16_cfg, table_columns, etl_id)
         except Exception as e:
             print(f"{rev_16_cfg['report_name']} Error occured : {e}")
-            self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+            self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     def experity_logout(self):
         self.experity.logout()
         self.driver.quit()
         self.task_q.wait_for_completion()
+        self.transforms.shutdown()
+        self.status_writer.close()
 
     # def etl_fin_25(self, from_date, to_date):
     #     fin_25_cfg = self.rpt_config.fin_25(from_date, to_date)
     #     etl_id = f"{self.client_id}_{fin_25_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
     #     try:
-    #         self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, fin_25_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+    #         self.status_writer.log_etl_start(etl_id, self.client_id, fin_25_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
     #         self.exct_rep.fin_25(fin_25_cfg['report_name'], from_date, to_date)
-    #         self.task_q.add_task(file_folder.rename_file_or_folder, os.path.join(self.DWLD_DIR, fin_25_cfg['file_name']), os.path.join(self.RAW_DIR,fin_25_cfg['raw_file']))
+    #         file_folder.rename_file_or_folder(os.path.join(self.DWLD_DIR, fin_25_cfg['file_name']), os.path.join(self.RAW_DIR,fin_25_cfg['raw_file']))
     #         table_columns = self.load_csv.get_column_names(fin_25_cfg['base_table'])
-    #         self.task_q.add_task(self.trns_csv.fin_25, os.path.join(self.RAW_DIR, fin_25_cfg['raw_file']), os.path.join(self.DWLD_DIR, fin_25_cfg['processed_file']), table_columns)
+    #         self.task_q.add_task(self.transforms.run, "fin_25", os.path.join(self.RAW_DIR, fin_25_cfg['raw_file']), os.path.join(self.DWLD_DIR, fin_25_cfg['processed_file']), table_columns)
     #         self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,fin_25_cfg['raw_file']))
-    #         self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, fin_25_cfg['processed_file']), fin_25_cfg['base_table'], fin_25_cfg['staging_table'])
+    #         self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, fin_25_cfg['processed_file']), fin_25_cfg['base_table'], fin_25_cfg['staging_table'], **self.load_options(fin_25_cfg))
     #         self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, fin_25_cfg['processed_file']), self.CLIENT_TODAY_DIR)
     #         self.task_q.wait_for_completion()
     #         error = self.task_q.check_and_raise_error()
     #         if error:
     #             raise Exception(error)
-    #         self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+    #         self.status_writer.log_etl_success(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
     #     except Exception as e:
     #         print(f"Something Error occured : {e}")
-    #         self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+    #         self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
     # def etl_rev_19(self, from_month, to_month):
     #     rev_19_cfg = self.rpt_config.rev_19(from_month, to_month)
     #     etl_id = f"{self.client_id}_{rev_19_cfg['report_name']}_{self.DATE_STAMP}_{self.TIME_STAMP}"
     #     try:
-    #         self.sql.log_etl_start(self.STATUS_TABLE, etl_id, self.client_id, rev_19_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
+    #         self.status_writer.log_etl_start(etl_id, self.client_id, rev_19_cfg['report_name'], f"{self.DATE_STAMP} {self.TIME_STAMP}")
     #         self.exct_rep.rev_19(rev_19_cfg['report_name'], from_month, to_month)
-    #         self.task_q.add_task(self.trns_csv.combine_csv_files, self.DWLD_DIR, os.path.join(self.RAW_DIR,rev_19_cfg['raw_file']), rev_19_cfg['report_name'])
+    #         self.transforms.run("combine_csv_files", self.DWLD_DIR, os.path.join(self.RAW_DIR,rev_19_cfg['raw_file']), rev_19_cfg['report_name'])
     #         table_columns = self.load_csv.get_column_names(rev_19_cfg['base_table'])
-    #         self.task_q.add_task(self.trns_csv.rev_19, os.path.join(self.RAW_DIR, rev_19_cfg['raw_file']), os.path.join(self.DWLD_DIR, rev_19_cfg['processed_file']), table_columns)
+    #         self.task_q.add_task(self.transforms.run, "rev_19", os.path.join(self.RAW_DIR, rev_19_cfg['raw_file']), os.path.join(self.DWLD_DIR, rev_19_cfg['processed_file']), table_columns)
     #         self.task_q.add_task(file_folder.delete_paths, os.path.join(self.RAW_DIR,rev_19_cfg['raw_file']))
-    #         self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, rev_19_cfg['processed_file']), rev_19_cfg['base_table'], rev_19_cfg['staging_table'])
+    #         self.task_q.add_task(self.load_csv.load_report, os.path.join(self.DWLD_DIR, rev_19_cfg['processed_file']), rev_19_cfg['base_table'], rev_19_cfg['staging_table'], **self.load_options(rev_19_cfg))
     #         self.task_q.add_task(file_folder.move_file, os.path.join(self.DWLD_DIR, rev_19_cfg['processed_file']), self.CLIENT_TODAY_DIR)
     #         self.task_q.wait_for_completion()
     #         error = self.task_q.check_and_raise_error()
     #         if error:
     #             raise Exception(error)
-    #         self.sql.log_etl_success(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
+    #         self.status_writer.log_etl_success(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}")
     #     except Exception as e:
     #         print(f"Something Error occured : {e}")
-    #         self.sql.log_etl_failure(self.STATUS_TABLE, etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
+    #         self.status_writer.log_etl_failure(etl_id, f"{self.DATE_STAMP} {self.TIME_STAMP}", e)
 
 
-def execute_report_functions(client_id, mode, function_list, function_args=None):
+def execute_report_functions(client_id, mode, function_list, function_args=None, credential=None, client_processes=1):
     all_report_function_names = [
         "etl_cnt_27",
         "etl_cnt_19",
@@ -525,7 +467,7 @@ def execute_report_functions(client_id, mode, function_list, function_args=None)
 
     normalized_args = {key.lower(): value for key, value in function_args.items()}
 
-    etl_reports = ReportETL("BI_AFC_Experity", client_id)
+    etl_reports = ReportETL("BI_AFC_Experity", client_id, credential=credential, client_processes=client_processes)
     etl_reports.experity_login()
 
     def execute_func(short_name):
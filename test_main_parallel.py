@@ -1,10 +1,12 @@
-import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from download_reports import execute_report_functions
+from utils.pyodbc_sql import PyODBCSQL
+from utils.credentials import CredentialProvider
 from utils.report_date import get_past_date
 from utils.etl.report_config import CURRENT_DATE
 
 
-def run_reports_for_client(client_id):
+def run_reports_for_client(client_id, credential=None, client_processes=1):
     mode = "include"
     report_list = ["REV_16"]
 
@@ -29,7 +31,8 @@ def run_reports_for_client(client_id):
         "REV_16": {"from_month": "January 2022", "to_month": "March 2025"},
     }
 
-    execute_report_functions(client_id, mode, report_list, function_args=function_args)
+    execute_report_functions(client_id, mode, report_list, function_args=function_args, credential=credential,
+                             client_processes=client_processes)
 
 
 if __name__ == "__main__":
@@ -38,5 +41,9 @@ if __name__ == "__main__":
     client_ids = [3622]
     num_workers = min(MAX_WORKERS, len(client_ids))  # Set max workers to 8 or number of clients
 
-    with multiprocessing.Pool(processes=num_workers) as pool:
-        pool.map(run_reports_for_client, client_ids)
+    # Credentials of all active clients are loaded once; each worker only receives its own client's entry.
+    with CredentialProvider(PyODBCSQL("BI_AFC_Experity")) as credentials:
+        # client_ids = credentials.client_ids()   # For all clients
+        # Client processes start their own transform workers, which the daemonic multiprocessing.Pool workers cannot do.
+        with ProcessPoolExecutor(max_workers=num_workers) as pool:
+            list(pool.map(run_reports_for_client, client_ids, credentials.for_clients(client_ids), [num_workers] * len(client_ids)))
@@ -1,11 +1,13 @@
 """
 Selenium Exception Module
 
-This module defines a custom exception class for handling Selenium-related errors.
+This module defines custom exception classes for handling Selenium-related errors and
+reports that fail the data-quality checks before they are loaded.
 It ensures a clear error message is provided while suppressing the stack trace.
 
 Modules:
     SeleniumException: Custom exception for Selenium errors.
+    DataQualityException: Custom exception for reports rejected by the validation gate.
 """
 
 import os
@@ -45,6 +47,40 @@ class SeleniumException(Exception):
         return self.message
 
 
+class DataQualityException(Exception):
+    """
+    Custom exception for a report that failed its data-quality checks, carrying the structured
+    validation report.
+
+    :param message: Error message associated with the exception.
+    :type message: str
+    :param report: The validation report, see :class:`utils.etl.validation.ValidationReport`.
+    :type report: ValidationReport
+    """
+
+    def __init__(self, message, report=None):
+        """
+        Initializes the DataQualityException with a message and the validation report.
+
+        :param message: Error message describing the exception.
+        :type message: str
+        :param report: The validation report with the failed checks.
+        :type report: ValidationReport
+        """
+        self.message = message
+        self.report = report
+        super().__init__(self.message)
+
+    def __str__(self):
+        """
+        Returns the string representation of the exception.
+
+        :returns: The error message.
+        :rtype: str
+        """
+        return self.message
+
+
 if __name__ == "__main__":
     # Example usage
     try:
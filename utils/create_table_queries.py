@@ -11,9 +11,11 @@ Functions:
     - cnt_19_staging_table: Generates SQL for the `CNT_19_Staging_Base` table.
     - ccr_03_staging_table: Generates SQL for the `CCR_03_Staging_Base` table.
     - ccr_02_staging_table: Generates SQL for the `CCR_02_Staging_Base` table.
+    - apply_storage_profile: Adds a columnstore, compression or clustered key storage profile to a statement.
     - 
 """
 import os
+import re
 import sys
 import argparse
 import functools
@@ -613,9 +615,67 @@ def status_table(table_name = 'data_uploads_status'):
     """
 
 
+# "heap" keeps the plain table, the other profiles target scan-heavy BI queries over the base tables.
+STORAGE_PROFILES = ("heap", "columnstore", "page", "row", "clustered")
+
+
+def apply_storage_profile(create_table_query: str, profile: str = "heap", date_column: str = None) -> str:
+    """
+    Adds a storage profile to a `CREATE TABLE` statement.
+
+    - ``columnstore``: a clustered columnstore index, best for large scans and aggregations.
+    - ``page`` / ``row``: PAGE or ROW data compression of the rowstore heap. ``NVARCHAR(MAX)``
+      values stored off-row are not compressed.
+    - ``clustered``: a clustered rowstore index on ``(Client_ID, date_column)``, best for per-client
+      date range queries. The date column must have an indexable type (not ``NVARCHAR(MAX)``),
+      see :mod:`utils.etl.schema_profiler` to generate typed DDL.
+
+    Staging tables copied with ``SELECT TOP 0 * INTO`` stay heaps, the profile applies to the table created here.
+
+    :param create_table_query: The SQL statement, as returned by the ``*_staging_table`` functions.
+    :type create_table_query: str
+    :param profile: One of ``STORAGE_PROFILES``.
+    :type profile: str
+    :param date_column: The date column of the clustered key, only used by the ``clustered`` profile.
+    :type date_column: str
+    :returns: SQL table string, followed by the index statement where the profile needs one.
+    :rtype: str
+
+    :raises ValueError: If the profile is unknown or the date column cannot be an index key.
+    """
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile '{profile}', expected one of {STORAGE_PROFILES}.")
+    if profile == "heap":
+        return create_table_query
+
+    table_name = re.search(r"CREATE\s+TABLE\s+([\w.\[\]]+)", create_table_query, re.I).group(1)
+    # Index names are unqualified identifiers, e.g. CCI_CNT_27_Staging_Base for [dbo].[CNT_27_Staging_Base]
+    index_suffix = table_name.split(".")[-1].strip("[]")
+    body = create_table_query[:create_table_query.rindex(")") + 1]
+
+    if profile in ("page", "row"):
+        return f"{body} WITH (DATA_COMPRESSION = {profile.upper()});\n"
+    if profile == "columnstore":
+        return f"{body};\n    CREATE CLUSTERED COLUMNSTORE INDEX CCI_{index_suffix} ON {table_name};\n"
+
+    key = ["Client_ID"]
+    if date_column:
+        declared = re.search(rf"^\s*{date_column}\s+([^,\n]+)", body, re.I | re.M)
+        if declared is None:
+            raise ValueError(f"Table '{table_name}' has no column '{date_column}'.")
+        if "MAX" in declared.group(1).upper():
+            raise ValueError(f"Column '{date_column}' of '{table_name}' is {declared.group(1).strip()} and cannot be an index key.")
+        key.append(date_column)
+    return f"{body};\n    CREATE CLUSTERED INDEX CIX_{index_suffix}_{'_'.join(key)} ON {table_name} ({', '.join(key)});\n"
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Execute a SQL query on a specified database.")
     parser.add_argument("--db_name", required=True, help="Name of the database")
+    parser.add_argument("--report", default="rev_16", help="Report whose staging base table is created, e.g. pat_20")
+    parser.add_argument("--storage_profile", default="heap", choices=STORAGE_PROFILES, help="Storage profile of the table")
+    parser.add_argument("--date_column", help="Date column of the clustered key for the 'clustered' profile")
     args = parser.parse_args()
     sql = PyODBCSQL(args.db_name)
-    sql.execute_query(rev_16_staging_table())
\ No newline at end of file
+    create_table = globals()[f"{args.report.lower()}_staging_table"]
+    sql.execute_query(apply_storage_profile(create_table(), args.storage_profile, args.date_column))
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Credential Provider
+
+This module loads the Experity credentials of all active clients with a single query when the
+scheduler starts and keeps them in memory for the run, so the workers do not each query
+``afc_password_tbl``. Entries expire after a TTL, and passwords are kept in mutable buffers that
+are zeroed when they expire or the provider is closed. Each worker is handed only the
+:class:`ClientCredential` of its own client.
+
+Passwords read from the database arrive as ``str`` objects, which cannot be wiped; they are
+copied into a ``bytearray`` straight away and the row is dropped, so only the buffer outlives
+the load.
+
+:module: credentials.py
+:platform: Unix, Windows
+:synopsis: In-memory, expiring cache of client credentials and the active client list.
+"""
+
+import time
+import atexit
+import logging
+import threading
+
+
+DEFAULT_TTL = 3600
+
+
+class CredentialExpired(Exception):
+    """
+    Raised when the password of an expired or cleared credential is requested.
+    """
+
+
+class ClientCredential:
+    """
+    The Experity username and password of one client.
+
+    The password is held in a ``bytearray`` and zeroed by :meth:`clear`, which also happens
+    automatically once the credential has expired. Instances are picklable, so a credential
+    can be passed to a worker process on its own.
+
+    Methods:
+        password(self):
+            Returns the password, unless the credential has expired or been cleared.
+        is_expired(self):
+            Returns whether the credential is past its expiry time.
+        clear(self):
+            Zeroes the password buffer.
+    """
+
+    def __init__(self, client_id: int, username: str, password: str, expires_at: float | None = None) -> None:
+        """
+        :param client_id: The client ID.
+        :type client_id: int
+        :param username: The Experity username.
+        :type username: str
+        :param password: The Experity password.
+        :type password: str
+        :param expires_at: Wall clock time (``time.time()``) after which the credential expires, None for never.
+        :type expires_at: float | None
+        """
+        self.client_id = client_id
+        self.username = username
+        self.expires_at = expires_at
+        self._password = bytearray(password.encode("utf-8")) if password is not None else bytearray()
+
+    @property
+    def password(self) -> str:
+        """
+        :returns: The password.
+        :rtype: str
+        :raises CredentialExpired: If the credential has expired or been cleared.
+        """
+        if self.is_expired():
+            self.clear()
+        if not self._password:
+            raise CredentialExpired(f"Credentials of client {self.client_id} have expired or been cleared.")
+        return self._password.decode("utf-8")
+
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def clear(self) -> None:
+        """
+        Zeroes the password buffer in place and empties it.
+        """
+        for i in range(len(self._password)):
+            self._password[i] = 0
+        self._password.clear()
+
+    def __iter__(self):
+        """
+        Unpacks as ``client_id, username, password``, like the rows of
+        :meth:`PyODBCSQL.get_users_credentials`.
+        """
+        return iter((self.client_id, self.username, self.password))
+
+    def __repr__(self) -> str:
+        return f"ClientCredential(client_id={self.client_id!r}, username={self.username!r}, password='***')"
+
+
+class CredentialProvider:
+    """
+    Loads and caches the credentials of all active clients.
+
+    The first access loads every active client with one query; the entries are reused until the
+    TTL passes, at which point the old passwords are zeroed and the next access reloads them.
+
+    Methods:
+        load(self):
+            Loads the credentials of all active clients, replacing and clearing any held entries.
+        client_ids(self):
+            Returns the IDs of all active clients.
+        get(self, client_id):
+            Returns the credential of one client.
+        for_clients(self, client_ids):
+            Returns the credentials of the given clients, in order.
+        close(self):
+            Zeroes and drops all held credentials.
+    """
+
+    def __init__(self, sql, ttl: float | None = DEFAULT_TTL) -> None:
+        """
+        :param sql: The database connection used to load the credentials.
+        :type sql: PyODBCSQL
+        :param ttl: Seconds the credentials are held before they expire, None to keep them for the run.
+        :type ttl: float | None
+        """
+        self.sql = sql
+        self.ttl = ttl
+        self._entries = {}
+        self._expires_at = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def load(self) -> None:
+        with self._lock:
+            self._load()
+
+    def _load(self) -> None:
+        self._clear()
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        entries = {}
+        rows = self.sql.get_all_active_credentials()
+        for client_id, username, password in rows:
+            entries[client_id] = ClientCredential(client_id, username, password, expires_at)
+        rows.clear()
+        self._entries = entries
+        self._expires_at = expires_at
+        self._loaded = True
+        logging.info("Loaded credentials of %d active clients.", len(entries))
+
+    def _ensure_loaded(self) -> None:
+        expired = self._expires_at is not None and time.time() >= self._expires_at
+        if not self._loaded or expired:
+            if expired:
+                logging.info("Client credentials expired, reloading.")
+            self._load()
+
+    def client_ids(self) -> list[int]:
+        """
+        :returns: The IDs of all active clients, from the same load as the credentials.
+        :rtype: list[int]
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return sorted(self._entries)
+
+    def get(self, client_id: int) -> ClientCredential:
+        """
+        :param client_id: The client ID.
+        :type client_id: int
+        :returns: The credential of the client.
+        :rtype: ClientCredential
+        :raises KeyError: If the client is not active.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            try:
+                return self._entries[client_id]
+            except KeyError:
+                raise KeyError(f"No active credentials for client {client_id}.") from None
+
+    def for_clients(self, client_ids: list[int]) -> list[ClientCredential]:
+        """
+        :param client_ids: The client IDs.
+        :type client_ids: list[int]
+        :returns: The credential of each client, in the order of ``client_ids``.
+        :rtype: list[ClientCredential]
+        """
+        return [self.get(client_id) for client_id in client_ids]
+
+    def close(self) -> None:
+        with self._lock:
+            self._clear()
+            self._loaded = False
+
+    def _clear(self) -> None:
+        for credential in self._entries.values():
+            credential.clear()
+        self._entries = {}
+        self._expires_at = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
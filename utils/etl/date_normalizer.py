@@ -0,0 +1,242 @@
+"""
+Date Normalizer
+
+This module turns the date columns listed in the report specs into native ``Date`` and
+``Datetime`` columns. The format of a column is the candidate format below that parses the most
+values of a sample of the column, and the whole column is parsed with one vectorized ``strptime``
+in that format. Values that do not match are loaded as null and captured as rejects, like
+unparseable currency values.
+
+A format that parses at least :data:`MIN_MATCH_RATIO` of the sample is kept per report and column
+in a JSON file next to the table schema cache. The next files of the report are checked against
+it and the candidates are only searched again when a file no longer matches it.
+
+Processed CSV files hold the parsed values in ISO format, Parquet and Arrow IPC files as typed
+columns; :mod:`utils.etl.schema_profiler` proposes the matching ``DATE``/``DATETIME2`` columns.
+
+:module: date_normalizer.py
+:platform: Unix, Windows
+:synopsis: Shared date format detection and parsing of report columns.
+"""
+
+import os
+import json
+import logging
+import threading
+
+import polars as pl
+
+
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y"]
+DATETIME_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M:%S%.f", "%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M"]
+
+SAMPLE_ROWS = 1000
+
+# Share of the sampled values a format must parse to be kept for the next files of the report.
+MIN_MATCH_RATIO = 0.9
+
+# How dates are written to processed CSV files, so that SQL Server converts them unambiguously.
+CSV_DATE_FORMAT = "%Y-%m-%d"
+CSV_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+DTYPES = {"date": pl.Date, "datetime": pl.Datetime}
+
+
+def _non_empty(values: pl.Series) -> pl.Series:
+    values = values.cast(pl.Utf8).str.strip_chars()
+    return values.filter(values.is_not_null() & (values != ""))
+
+
+def match_ratio(values: pl.Series, fmt: str, dtype: pl.DataType) -> float:
+    """
+    :param values: Sample text values of a column; nulls and blanks are ignored.
+    :type values: pl.Series
+    :param fmt: A ``strptime`` format.
+    :type fmt: str
+    :param dtype: ``pl.Date`` or ``pl.Datetime``.
+    :type dtype: pl.DataType
+    :returns: The share of the values the format parses, 1.0 for an empty sample.
+    :rtype: float
+    """
+    values = _non_empty(values)
+    if not values.len():
+        return 1.0
+    return 1 - values.str.strptime(dtype, fmt, strict=False).null_count() / values.len()
+
+
+def detect_format(values: pl.Series) -> tuple[str, pl.DataType, float] | None:
+    """
+    Finds the candidate format that parses the most values of a sample. Dates are tried before
+    datetimes and earlier candidates win ties.
+
+    :param values: Sample text values of a column; nulls and blanks are ignored.
+    :type values: pl.Series
+    :returns: The ``strptime`` format, its type, ``pl.Date`` or ``pl.Datetime``, and the share of
+        the sample it parses, or None if the sample is empty.
+    :rtype: tuple[str, pl.DataType, float] | None
+    """
+    values = _non_empty(values)
+    if not values.len():
+        return None
+    best = None
+    for formats, dtype in ((DATE_FORMATS, pl.Date), (DATETIME_FORMATS, pl.Datetime)):
+        for fmt in formats:
+            ratio = match_ratio(values, fmt, dtype)
+            if best is None or ratio > best[2]:
+                best = (fmt, dtype, ratio)
+    return best
+
+
+def parse_expr(column: str, fmt: str, dtype: pl.DataType) -> pl.Expr:
+    """
+    :param column: The text column.
+    :type column: str
+    :param fmt: The ``strptime`` format of its values.
+    :type fmt: str
+    :param dtype: ``pl.Date`` or ``pl.Datetime``.
+    :type dtype: pl.DataType
+    :returns: The parsing expression, aliased to the column; values that do not match become null.
+    :rtype: pl.Expr
+    """
+    return pl.col(column).str.strip_chars().str.strptime(dtype, fmt, strict=False).alias(column)
+
+
+def reject_expr(column: str, fmt: str, dtype: pl.DataType) -> pl.Expr:
+    """
+    :returns: A boolean expression, true for the non-empty raw values that :func:`parse_expr` nulls.
+    :rtype: pl.Expr
+    """
+    return (pl.col(column).str.strip_chars() != "") & parse_expr(column, fmt, dtype).is_null()
+
+
+class DateNormalizer:
+    """
+    Detects the date format of report columns and keeps the formats that match.
+
+    Methods:
+        formats(self, report, frame, columns):
+            Returns the format of each date column of a frame.
+        forget(self, report):
+            Drops the kept formats of a report.
+        save(self):
+            Writes the kept formats to ``persist_path``.
+    """
+
+    def __init__(self, sample_rows: int = SAMPLE_ROWS, min_match: float = MIN_MATCH_RATIO, persist_path: str = None) -> None:
+        """
+        :param sample_rows: Number of rows a format is detected from.
+        :type sample_rows: int
+        :param min_match: Share of the sample a format must parse to be kept.
+        :type min_match: float
+        :param persist_path: Optional JSON file used to keep the formats between runs.
+        :type persist_path: str
+        """
+        self.sample_rows = sample_rows
+        self.min_match = min_match
+        self.persist_path = persist_path
+        self._formats = {}
+        self._forgotten = set()
+        self._lock = threading.Lock()
+        if persist_path:
+            self._formats = self._load()
+
+    @staticmethod
+    def _key(report: str, column: str) -> str:
+        return f"{report}|{column}".lower()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.persist_path):
+            return {}
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable date format cache '%s': %s", self.persist_path, e)
+            return {}
+        return {key: (fmt, DTYPES[dtype]) for key, (fmt, dtype) in stored.items() if dtype in DTYPES}
+
+    def save(self) -> None:
+        """
+        Writes the kept formats to ``persist_path``, merged with the formats other processes saved
+        since they were loaded, except the ones forgotten here. Does nothing when persistence is disabled.
+
+        :returns: None
+        """
+        with self._lock:
+            if not self.persist_path:
+                return
+            saved = self._load()
+            for key in self._forgotten:
+                saved.pop(key, None)
+            formats = {**saved, **self._formats}
+            stored = {key: [fmt, "date" if dtype == pl.Date else "datetime"] for key, (fmt, dtype) in formats.items()}
+            os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+            tmp_path = f"{self.persist_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stored, f, indent=2)
+            os.replace(tmp_path, self.persist_path)
+
+    def formats(self, report: str, frame: pl.DataFrame | pl.LazyFrame,
+                columns: list[str]) -> dict[str, tuple[str, pl.DataType]]:
+        """
+        Returns the format of the given date columns of a frame, from the first rows of the frame,
+        read with slice pushdown on a lazy scan, or its first non-empty values if those are blank.
+
+        The kept format of a column is used while it parses at least ``min_match`` of the sample,
+        otherwise the format that parses the most of the sample is used and the values it does not
+        parse are rejected. A column without any values is parsed with its kept format, or the
+        first candidate, so it still has a date type.
+
+        :param report: The report key, e.g. ``"pay_10"``.
+        :type report: str
+        :param frame: The raw report, or a chunk of it.
+        :type frame: pl.DataFrame | pl.LazyFrame
+        :param columns: The date columns of the report; columns the frame does not have as text are skipped.
+        :type columns: list[str]
+        :returns: Column to ``(format, dtype)``.
+        :rtype: dict[str, tuple[str, pl.DataType]]
+        """
+        schema = frame.collect_schema()
+        columns = [col for col in columns if col in schema and schema[col] == pl.Utf8]
+        if not columns:
+            return {}
+        frame = frame.lazy()
+        sample = frame.select(columns).head(self.sample_rows).collect()
+        result, detected = {}, {}
+        for col in columns:
+            values = sample[col]
+            if not (values.str.strip_chars() != "").any():
+                # Blank at the top of the file, sample the first values it has instead
+                values = frame.select(col).filter(pl.col(col).str.strip_chars() != "").head(self.sample_rows).collect()[col]
+            with self._lock:
+                kept = self._formats.get(self._key(report, col))
+            if kept is not None and match_ratio(values, *kept) >= self.min_match:
+                result[col] = kept
+                continue
+            best = detect_format(values)
+            if best is None:
+                result[col] = kept or (DATE_FORMATS[0], pl.Date)
+                continue
+            fmt, dtype, ratio = best
+            result[col] = (fmt, dtype)
+            if ratio >= self.min_match:
+                detected[self._key(report, col)] = (fmt, dtype)
+            else:
+                logging.warning(f"The best date format of {report} '{col}', {fmt}, parses {ratio:.0%} of the sample; "
+                                f"the other values are rejected.")
+        if detected:
+            with self._lock:
+                self._formats.update(detected)
+                self._forgotten.difference_update(detected)
+            self.save()
+        return result
+
+    def forget(self, report: str) -> None:
+        prefix = self._key(report, "")
+        with self._lock:
+            stored = self._load() if self.persist_path else {}
+            forgotten = {key for key in [*self._formats, *stored] if key.startswith(prefix)}
+            for key in forgotten:
+                self._formats.pop(key, None)
+            self._forgotten.update(forgotten)
+        self.save()
@@ -1,15 +1,57 @@
 import os
 import sys
+import logging
+import contextlib
+from datetime import date
+
+import polars as pl
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from utils.pyodbc_sql import PyODBCSQL
+from utils.pyodbc_sql import PyODBCSQL, DELETE_BATCH_SIZE
+from utils.sql_backends import BulkInsertOptions
+from utils.etl.schema_cache import SchemaCache, TableSchema, schema_cache as default_schema_cache
+from utils.etl.snapshot_delta import SnapshotDelta, scan_processed
+
+
+LOAD_MODES = ("replace", "merge", "partition")
+
+# Typed processed files, loaded in record batches instead of BULK INSERT.
+COLUMNAR_SCANNERS = {".parquet": pl.scan_parquet, ".arrow": pl.scan_ipc, ".ipc": pl.scan_ipc}
+COLUMNAR_BATCH_SIZE = 50000
+
+# Partition function and scheme shared by every client-partitioned base table.
+PARTITION_FUNCTION = "pf_Client_ID"
+PARTITION_SCHEME = "ps_Client_ID"
 
 
 class BulkLoadSQL:
-    def __init__(self, sql: PyODBCSQL, empty_table: bool = False) -> None:
+    def __init__(self, sql: PyODBCSQL, empty_table: bool = False, schema_cache: SchemaCache = None,
+                 load_mode: str = "replace", delete_missing: bool = False, delta: SnapshotDelta = None) -> None:
+        """
+        :param sql: The database wrapper used to run the load statements.
+        :param empty_table: Truncate the staging table after it is recreated.
+        :param schema_cache: Cache used for table metadata, defaults to the process-wide cache.
+        :param load_mode: ``replace`` drops and recreates the staging table on every load, ``merge``
+            upserts into a persistent staging table on the report's business key, ``partition``
+            switches the client's data into its partition of the base table.
+        :param delete_missing: In ``merge`` mode, delete target rows that are missing from the file
+            but fall inside the extracted date window.
+        :param delta: In ``merge`` mode, merge only the rows that changed since the last load of the
+            client's report, see :meth:`merge_delta`.
+        """
+        if load_mode not in LOAD_MODES:
+            raise ValueError(f"Unsupported load mode '{load_mode}', expected one of {LOAD_MODES}.")
+        if load_mode == "merge" and not sql.backend.supports_merge:
+            raise ValueError(f"The '{sql.backend.name}' SQL backend does not support the merge load mode.")
+        if load_mode == "partition" and not sql.backend.supports_partitions:
+            raise ValueError(f"The '{sql.backend.name}' SQL backend does not support the partition load mode.")
         self.sql = sql
         self.empty_table = empty_table
+        self.schema_cache = schema_cache or default_schema_cache
+        self.load_mode = load_mode
+        self.delete_missing = delete_missing
+        self.delta = delta
 
     def clear_table(self, table: str) -> None:
         """
@@ -17,11 +59,13 @@ class BulkLoadSQL:
         """
         self.sql.execute_query("TRUNCATE TABLE {}".format(table))
 
-    def clear_client_data(self, client_id: int, table_name: int) -> None:
+    def clear_client_data(self, client_id: int, table_name: str, batch_size: int = DELETE_BATCH_SIZE,
+                          pause: float = 0.0) -> int:
         """
         Clear the client data.
+        Rows are deleted in batches, or by truncating the client's partition when the table is partitioned by client.
         """
-        self.sql.execute_query("DELETE FROM {table_name} WHERE ClientID = {client_id}".format(table_name, client_id))
+        return self.sql.delete_table_data(table_name, client_id, batch_size=batch_size, pause=pause)
 
     def prepare_staging_table(self, base_table: str, staging_table: str) -> None:
         """
@@ -29,21 +73,392 @@ class BulkLoadSQL:
         Check if the table exists, if not create the table.
         Clear the table if `clear_table` is set to True.
         """
-        try:
-            self.sql.execute_query("DROP TABLE {}".format(staging_table))
-            self.sql.execute_query("SELECT TOP 0 * INTO {} FROM {}".format(staging_table, base_table))
-        except:
-            self.sql.execute_query("SELECT TOP 0 * INTO {} FROM {}".format(staging_table, base_table))
+        # A failed DROP would abort the load session, so only drop a table that exists.
+        self.sql.execute_query("DROP TABLE IF EXISTS {}".format(staging_table))
+        self.sql.execute_query("SELECT TOP 0 * INTO {} FROM {}".format(staging_table, base_table))
 
         if self.empty_table:
             self.clear_table(staging_table)
 
-    def load_report(self, processed_file: str, base_table, staging_table: str) -> None:
+    def insert_file(self, processed_file: str, table_name: str, bulk_options: BulkInsertOptions = None) -> int:
+        """
+        Load a processed file into a table: CSV files with ``BULK INSERT``, Parquet and Arrow IPC
+        files with :meth:`insert_columnar`.
+
+        :returns: The number of rows loaded.
+        """
+        if os.path.splitext(processed_file)[1].lower() in COLUMNAR_SCANNERS:
+            return self.insert_columnar(processed_file, table_name)
+        return self.sql.csv_bulk_insert(processed_file, table_name, bulk_options)
+
+    def insert_columnar(self, processed_file: str, table_name: str, batch_size: int = COLUMNAR_BATCH_SIZE) -> int:
+        """
+        Load a Parquet or Arrow IPC file into a table in record batches.
+
+        Each batch is read with slice pushdown, so only one batch is held in memory, and sent with
+        ``fast_executemany`` as typed parameters; the server does not parse any text. The file's
+        columns are inserted by name.
+
+        :returns: The number of rows loaded.
+        """
+        scan = COLUMNAR_SCANNERS[os.path.splitext(processed_file)[1].lower()](processed_file)
+        columns = scan.collect_schema().names()
+        query = "INSERT INTO {} ({}) VALUES ({});".format(table_name, ", ".join(columns), ", ".join("?" * len(columns)))
+        loaded = 0
+        while True:
+            batch = scan.slice(loaded, batch_size).collect()
+            if not batch.height:
+                break
+            self.sql.execute_many(query, batch.rows())
+            loaded += batch.height
+        logging.info("Inserted %s records from '%s' into '%s'.", loaded, processed_file, table_name)
+        return loaded
+
+    @contextlib.contextmanager
+    def load_session(self):
+        """
+        Run the enclosed load steps on one connection inside one transaction.
+
+        Prepare, bulk insert and merge statements issued from this thread (including status writes
+        made directly through ``self.sql``) are committed together when the block exits, so readers
+        never see a dropped or half-loaded staging table. On error everything is rolled back. A
+        nested session becomes a savepoint, so one failed report does not undo the reports loaded
+        before it in an outer session.
+        """
+        with self.sql.transaction():
+            yield self
+
+    def load_report(self, processed_file: str, base_table, staging_table: str, merge_keys: list[str] = None,
+                    date_column: str = None, window: tuple[date, date] = None,
+                    bulk_options: BulkInsertOptions = None, client_id: int = None) -> dict | int:
         """
         Bulk load the report into the database.
+
+        In ``merge`` mode, reports that define ``merge_keys`` are merged into the staging table
+        instead of replacing it, see :meth:`merge_report`, or only their changed rows are merged when
+        a ``delta`` store is set, see :meth:`merge_delta`. Other reports always use ``replace``.
+        In ``partition`` mode every report replaces the client's partition of the base table, see
+        :meth:`partition_report`.
+
+        :param bulk_options: ``BULK INSERT`` tuning options of the report, unused for columnar files.
+        :param client_id: The client being loaded, required in ``partition`` mode.
+        :returns: The number of rows loaded, or the merge counts in ``merge`` mode.
         """
-        self.prepare_staging_table(base_table, staging_table)
-        self.sql.csv_bulk_insert(processed_file, staging_table)
+        if self.load_mode == "partition":
+            if client_id is None:
+                raise ValueError("The partition load mode requires the client_id of the report.")
+            return self.partition_report(processed_file, base_table, client_id, bulk_options)
+
+        if self.load_mode == "merge" and merge_keys:
+            if self.delta is not None and client_id is not None:
+                return self.merge_delta(processed_file, base_table, staging_table, merge_keys, client_id, date_column,
+                                        window, bulk_options)
+            return self.merge_report(processed_file, base_table, staging_table, merge_keys, date_column, window,
+                                     bulk_options)
+
+        with self.load_session():
+            self.prepare_staging_table(base_table, staging_table)
+            return self.insert_file(processed_file, staging_table, bulk_options)
+
+    def ensure_table(self, base_table: str, table: str) -> None:
+        """
+        Create an empty copy of the base table, unless the table already exists.
+        """
+        self.sql.execute_query(
+            "IF OBJECT_ID(N'{0}', N'U') IS NULL SELECT TOP 0 * INTO {0} FROM {1}".format(table, base_table)
+        )
+
+    def prepare_work_table(self, base_table: str, work_table: str) -> None:
+        """
+        Prepare the persistent work table used by merge loads.
+        The table is created once and only truncated afterwards, so no DDL runs per load.
+        """
+        self.ensure_table(base_table, work_table)
+        self.clear_table(work_table)
+
+    def check_merge_keys(self, table: str, merge_keys: list[str]) -> None:
+        """
+        Make sure the business key is unique and not null in the loaded file,
+        otherwise the MERGE would fail or silently duplicate rows.
+        """
+        keys = ", ".join(merge_keys)
+        key_nulls = " OR ".join(f"{key} IS NULL" for key in merge_keys)
+        duplicates, nulls = self.sql.execute_query(
+            f"""SELECT (SELECT COUNT(*) FROM (SELECT {keys} FROM {table} GROUP BY {keys} HAVING COUNT(*) > 1) AS dup),
+                       (SELECT COUNT(*) FROM {table} WHERE {key_nulls});"""
+        )[0]
+        if duplicates or nulls:
+            raise ValueError(
+                f"Merge key ({keys}) of '{table}' is not usable: {duplicates} duplicated keys, {nulls} rows with null keys."
+            )
+
+    def merge_report(self, processed_file: str, base_table: str, target_table: str, merge_keys: list[str],
+                     date_column: str = None, window: tuple[date, date] = None,
+                     bulk_options: BulkInsertOptions = None, deleted_keys: pl.DataFrame = None) -> dict:
+        """
+        Incrementally load the report into a persistent target table.
+
+        The file is bulk loaded into the truncated ``{target_table}_Work`` table and merged into the
+        target on the business key: new rows are inserted and rows whose values changed are updated.
+        With ``delete_missing`` enabled, target rows that are not in the file and whose
+        ``date_column`` falls inside ``window`` are deleted. All steps run in one load session.
+
+        If the file is a delta that holds only the changed rows, the rows to delete cannot be
+        derived from it and are passed as ``deleted_keys`` instead, see :meth:`delete_keys`.
+
+        :returns: The number of ``loaded`` file rows and of ``inserted``, ``updated`` and ``deleted`` rows.
+        """
+        with self.load_session():
+            work_table = f"{target_table}_Work"
+            self.ensure_table(base_table, target_table)
+            self.prepare_work_table(base_table, work_table)
+            loaded = self.insert_file(processed_file, work_table, bulk_options)
+            self.check_merge_keys(work_table, merge_keys)
+
+            columns = self.get_table_schema(base_table).names
+            keys_lower = {key.lower() for key in merge_keys}
+            non_key_columns = [col for col in columns if col.lower() not in keys_lower]
+            compare_columns = [col for col in non_key_columns if col.lower() != "date_updated"]
+
+            on_clause = " AND ".join(f"t.{key} = s.{key}" for key in merge_keys)
+            changed = "EXISTS (SELECT {} EXCEPT SELECT {})".format(
+                ", ".join(f"s.{col}" for col in compare_columns), ", ".join(f"t.{col}" for col in compare_columns)
+            )
+            update_set = ", ".join(f"{col} = s.{col}" for col in non_key_columns)
+            insert_columns = ", ".join(columns)
+            insert_values = ", ".join(f"s.{col}" for col in columns)
+
+            params = []
+            delete_clause = ""
+            if self.delete_missing and date_column and window and deleted_keys is None:
+                delete_clause = f"WHEN NOT MATCHED BY SOURCE AND TRY_CONVERT(date, t.{date_column}) BETWEEN ? AND ? THEN DELETE"
+                params = list(window)
+
+            query = f"""SET NOCOUNT ON;
+                DECLARE @actions TABLE (merge_action NVARCHAR(10));
+                MERGE {target_table} WITH (HOLDLOCK) AS t
+                USING {work_table} AS s
+                ON {on_clause}
+                WHEN MATCHED AND {changed} THEN UPDATE SET {update_set}
+                WHEN NOT MATCHED BY TARGET THEN INSERT ({insert_columns}) VALUES ({insert_values})
+                {delete_clause}
+                OUTPUT $action INTO @actions;
+                SELECT COALESCE(SUM(CASE WHEN merge_action = 'INSERT' THEN 1 ELSE 0 END), 0),
+                       COALESCE(SUM(CASE WHEN merge_action = 'UPDATE' THEN 1 ELSE 0 END), 0),
+                       COALESCE(SUM(CASE WHEN merge_action = 'DELETE' THEN 1 ELSE 0 END), 0)
+                FROM @actions;"""
+            inserted, updated, deleted = self.sql.execute_query(query, params or None)[0]
+            if self.delete_missing and date_column and window and deleted_keys is not None and deleted_keys.height:
+                deleted = self.delete_keys(base_table, target_table, merge_keys, deleted_keys, date_column, window)
+            counts = {"loaded": loaded, "inserted": inserted, "updated": updated, "deleted": deleted}
+            logging.info("Merged '%s' into '%s': %s", processed_file, target_table, counts)
+            return counts
+
+    def delete_keys(self, base_table: str, target_table: str, merge_keys: list[str], keys: pl.DataFrame,
+                    date_column: str, window: tuple[date, date]) -> int:
+        """
+        Delete the target rows with the given business keys whose ``date_column`` falls inside ``window``.
+
+        The keys are inserted into the persistent ``{target_table}_Keys`` table and the target is
+        deleted with a join on it.
+
+        :returns: The number of rows deleted.
+        """
+        keys_table = f"{target_table}_Keys"
+        key_columns = ", ".join(merge_keys)
+        self.sql.execute_query(
+            "IF OBJECT_ID(N'{0}', N'U') IS NULL SELECT TOP 0 {1} INTO {0} FROM {2}".format(keys_table, key_columns, base_table)
+        )
+        self.clear_table(keys_table)
+        self.sql.execute_many(
+            "INSERT INTO {} ({}) VALUES ({});".format(keys_table, key_columns, ", ".join("?" * len(merge_keys))),
+            keys.rows(),
+        )
+        on_clause = " AND ".join(f"t.{key} = k.{key}" for key in merge_keys)
+        return self.sql.execute_query(
+            f"""SET NOCOUNT ON;
+                DELETE t FROM {target_table} AS t
+                JOIN {keys_table} AS k ON {on_clause}
+                WHERE TRY_CONVERT(date, t.{date_column}) BETWEEN ? AND ?;
+                SELECT @@ROWCOUNT;""",
+            list(window),
+        )[0][0]
+
+    def merge_delta(self, processed_file: str, base_table: str, target_table: str, merge_keys: list[str],
+                    client_id: int, date_column: str = None, window: tuple[date, date] = None,
+                    bulk_options: BulkInsertOptions = None) -> dict:
+        """
+        Merge only the rows of the report that changed since the client's last load.
+
+        The processed file is compared with the snapshot of the last load by :class:`SnapshotDelta`:
+        new and changed rows are merged with :meth:`merge_report`, and the keys that disappeared are
+        deleted inside the window. Without a snapshot the whole file is merged. Nothing is sent to
+        the server when no row changed. The new snapshot is saved once the merge has committed, which
+        inside an outer :meth:`load_session` is when that session commits; it is discarded on rollback.
+
+        The snapshot must match the target table, so reset it with :meth:`SnapshotDelta.forget`
+        after changing the target outside of these loads.
+
+        :returns: The merge counts, with the number of ``unchanged`` rows that were not sent.
+        """
+        delta = self.delta.compute(processed_file, client_id, base_table, merge_keys)
+        if delta.is_empty:
+            counts = {"loaded": 0, "inserted": 0, "updated": 0, "deleted": 0}
+            logging.info("'%s' has no changed rows, nothing to merge into '%s'.", processed_file, target_table)
+        else:
+            try:
+                counts = self.merge_report(delta.upsert_file, base_table, target_table, merge_keys, date_column, window,
+                                           bulk_options, deleted_keys=delta.deleted_keys)
+            except Exception:
+                self.delta.discard(delta)
+                raise
+        # Inside an outer load session the merge is only committed with it
+        self.sql.after_commit(lambda: self.delta.commit(delta), lambda: self.delta.discard(delta))
+        counts["unchanged"] = delta.unchanged
+        return counts
+
+    def is_partitioned(self, table: str) -> bool:
+        """
+        Check whether the table (its heap or clustered index) is on the client partition scheme.
+        """
+        return bool(self.sql.execute_query(
+            """SELECT COUNT(*) FROM sys.indexes i
+               JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+               WHERE i.object_id = OBJECT_ID(?) AND i.index_id IN (0, 1) AND ps.name = ?;""",
+            (table, PARTITION_SCHEME),
+        )[0][0])
+
+    def ensure_partition_scheme(self) -> None:
+        """
+        Create the partition function and scheme on ``Client_ID`` if they do not exist yet.
+        The function starts without boundaries, clients are added by :meth:`ensure_client_partition`.
+        """
+        self.sql.execute_query(
+            f"""IF NOT EXISTS (SELECT 1 FROM sys.partition_functions WHERE name = '{PARTITION_FUNCTION}')
+                    CREATE PARTITION FUNCTION {PARTITION_FUNCTION} (INT) AS RANGE RIGHT FOR VALUES ();"""
+        )
+        self.sql.execute_query(
+            f"""IF NOT EXISTS (SELECT 1 FROM sys.partition_schemes WHERE name = '{PARTITION_SCHEME}')
+                    CREATE PARTITION SCHEME {PARTITION_SCHEME} AS PARTITION {PARTITION_FUNCTION} ALL TO ([PRIMARY]);"""
+        )
+
+    def ensure_client_partition(self, client_id: int) -> int:
+        """
+        Make sure the client has a partition of its own, splitting the range at ``client_id`` and
+        ``client_id + 1`` when needed, and return its partition number.
+
+        Splits run once per client. They are cheap while the client has no rows yet, because the
+        split range is empty.
+        """
+        for boundary in (int(client_id), int(client_id) + 1):
+            self.sql.execute_query(
+                f"""IF NOT EXISTS (SELECT 1 FROM sys.partition_range_values rv
+                                   JOIN sys.partition_functions pf ON pf.function_id = rv.function_id
+                                   WHERE pf.name = '{PARTITION_FUNCTION}' AND CAST(rv.value AS INT) = {boundary})
+                    BEGIN
+                        ALTER PARTITION SCHEME {PARTITION_SCHEME} NEXT USED [PRIMARY];
+                        ALTER PARTITION FUNCTION {PARTITION_FUNCTION}() SPLIT RANGE ({boundary});
+                    END"""
+            )
+        return self.sql.execute_query(f"SELECT $PARTITION.{PARTITION_FUNCTION}({int(client_id)});")[0][0]
+
+    def partition_base_table(self, base_table: str) -> None:
+        """
+        Convert a base table into a client-partitioned table.
+
+        A clustered index on ``Client_ID`` is built on the client partition scheme, which moves the
+        existing rows into their client's partition. Nonclustered indexes of the base table must
+        be aligned and created on the switch table as well, otherwise ``SWITCH`` fails.
+
+        :raises ValueError: If the table already has a clustered index that is not partitioned by client.
+        """
+        self.ensure_partition_scheme()
+        if self.is_partitioned(base_table):
+            logging.info("Table '%s' is already partitioned by Client_ID.", base_table)
+            return
+
+        clustered = self.sql.execute_query(
+            "SELECT COUNT(*) FROM sys.indexes WHERE object_id = OBJECT_ID(?) AND index_id = 1;", (base_table,)
+        )[0][0]
+        if clustered:
+            raise ValueError(f"Table '{base_table}' has a clustered index, rebuild it on {PARTITION_SCHEME}(Client_ID) manually.")
+
+        for (client_id,) in self.sql.execute_query(f"SELECT DISTINCT Client_ID FROM {base_table} WHERE Client_ID IS NOT NULL;"):
+            self.ensure_client_partition(client_id)
+        self.sql.execute_query(
+            f"CREATE CLUSTERED INDEX CIX_{base_table}_Client_ID ON {base_table} (Client_ID) ON {PARTITION_SCHEME} (Client_ID);"
+        )
+        self.schema_cache.invalidate(base_table, self.sql.database)
+        logging.info("Partitioned table '%s' by Client_ID.", base_table)
+
+    def ensure_switch_table(self, base_table: str, switch_table: str) -> None:
+        """
+        Create the work table used to switch data into the base table, aligned with it: same
+        columns and the same clustered index on the client partition scheme.
+        """
+        if self.sql.execute_query(*self.sql.backend.table_exists_query(switch_table))[0][0]:
+            return
+        with self.load_session():
+            self.sql.execute_query(f"SELECT TOP 0 * INTO {switch_table} FROM {base_table}")
+            self.sql.execute_query(
+                f"CREATE CLUSTERED INDEX CIX_{switch_table}_Client_ID ON {switch_table} (Client_ID) ON {PARTITION_SCHEME} (Client_ID);"
+            )
+
+    def check_client_rows(self, processed_file: str, client_id: int) -> None:
+        """
+        Check that every row of a processed file belongs to the client, before anything is loaded.
+
+        :raises ValueError: If the file has no ``Client_ID`` column, or rows of another or no client.
+        """
+        frame = scan_processed(processed_file)
+        column = next((col for col in frame.collect_schema().names() if col.lower() == "client_id"), None)
+        if column is None:
+            raise ValueError(f"'{processed_file}' has no Client_ID column.")
+        others = frame.filter(
+            pl.col(column).cast(pl.Utf8).str.strip_chars().fill_null("") != str(client_id)
+        ).select(pl.len()).collect().item()
+        if others:
+            raise ValueError(f"'{processed_file}' has {others} rows that do not belong to client {client_id}.")
+
+    def partition_report(self, processed_file: str, base_table: str, client_id: int,
+                         bulk_options: BulkInsertOptions = None) -> int:
+        """
+        Replace the client's partition of the base table with the report.
+
+        The file is bulk loaded into the client's own ``{base_table}_Switch_{client_id}`` table,
+        aligned with the base table and used by no reader. The client's partition of the base table
+        is then truncated and the loaded partition is switched in. Both are metadata-only operations,
+        so readers of this client see either the old or the new data. Each client has its own switch
+        table, so concurrent loads never share its partitions or its schema locks.
+
+        :returns: The number of rows loaded.
+
+        :raises ValueError: If the base table is not partitioned, or the file holds rows of other clients.
+        """
+        if not self.is_partitioned(base_table):
+            raise ValueError(f"Table '{base_table}' is not partitioned by Client_ID, run partition_base_table first.")
+        self.check_client_rows(processed_file, client_id)
+
+        switch_table = f"{base_table}_Switch_{client_id}"
+        partition = self.ensure_client_partition(client_id)
+        self.ensure_switch_table(base_table, switch_table)
+
+        self.sql.execute_query(f"TRUNCATE TABLE {switch_table};")
+        loaded = self.insert_file(processed_file, switch_table, bulk_options)
+
+        in_partition = self.sql.execute_query(
+            f"SELECT COUNT_BIG(*) FROM {switch_table} WHERE $PARTITION.{PARTITION_FUNCTION}(Client_ID) = ?;", (partition,)
+        )[0][0]
+        if in_partition != loaded:
+            raise ValueError(
+                f"'{processed_file}' has {loaded - in_partition} rows that do not belong to client {client_id}."
+            )
+
+        with self.load_session():
+            self.sql.execute_query(f"TRUNCATE TABLE {base_table} WITH (PARTITIONS ({partition}));")
+            self.sql.execute_query(f"ALTER TABLE {switch_table} SWITCH PARTITION {partition} TO {base_table} PARTITION {partition};")
+        logging.info("Switched %s rows of client %s into partition %s of '%s'.", loaded, client_id, partition, base_table)
+        return loaded
 
     def load_report_pay_10(self):
         """
@@ -51,5 +466,14 @@ class BulkLoadSQL:
         """
         pass
 
-    def get_column_names(self, table_name: str) -> list[tuple[str, str]]:
-        return self.sql.get_column_names(table_name)
+    def get_table_schema(self, table_name: str) -> TableSchema:
+        """
+        Get the cached column metadata of a table.
+        """
+        return self.schema_cache.get(self.sql, table_name)
+
+    def get_column_names(self, table_name: str) -> list[tuple[str]]:
+        """
+        Get the column names of a table from the schema cache.
+        """
+        return self.get_table_schema(table_name).column_tuples
@@ -1,6 +1,9 @@
 import os
 import time
+import calendar
+from datetime import date, datetime
 from utils.general import get_past_date
+from utils.sql_backends import BulkInsertOptions
 
 # Browser Configuration
 TIME_OUT = 1800
@@ -12,6 +15,12 @@ DWLD_DIR = os.path.join(C_DIR, "downloads")
 # Logging Configuration
 LOG_DIR = os.path.join(C_DIR, "logs/")
 
+# Table Schema Cache Configuration
+SCHEMA_CACHE_TTL = 24 * 3600
+SCHEMA_CACHE_FILE = os.path.join(C_DIR, "cache", "table_schemas.json")
+# Date formats detected per report and column (see utils.etl.date_normalizer).
+DATE_FORMATS_FILE = os.path.join(C_DIR, "cache", "date_formats.json")
+
 # Date and Time Configuration
 DATE_TIME_STAMP = time.strftime("%Y-%m-%d %H:%M:%S")
 DATE_STAMP = DATE_TIME_STAMP.split()[0]
@@ -22,6 +31,52 @@ LOG_DT_STAMP = DATE_STAMP.replace(' ', '_').replace(':', '-')
 # Experity Configuration
 EXPERITY_URL = "https://pvpm.practicevelocity.com"
 
+# Load Configuration
+# "replace" recreates the staging table on every run, "merge" upserts reports that define `merge_keys`,
+# "partition" switches the client's data into its partition of the base table (see BulkLoadSQL.partition_base_table).
+LOAD_MODE = "replace"
+MERGE_DELETE_MISSING = True
+# In "merge" mode, only the rows that changed since the client's last load of a report are merged,
+# found by hashing the processed file against a snapshot of the last load (see utils.etl.snapshot_delta).
+DELTA_LOADS = True
+SNAPSHOT_DIR = os.path.join(C_DIR, "cache", "snapshots")
+
+# BULK INSERT options, overridden per report with the `bulk_options` key.
+# Staging tables are per client, so a table lock is safe and allows minimally logged loads.
+BULK_INSERT_OPTIONS = BulkInsertOptions(tablock=True)
+# Large reports commit in batches to keep the transaction log small.
+LARGE_REPORT_BULK_OPTIONS = BulkInsertOptions(tablock=True, batch_size=100000)
+
+# Run Manifest Configuration
+# Reports whose raw download is identical to the last loaded one for the same window are not
+# transformed and loaded again, and are logged as UNCHANGED (see utils.etl.run_manifest).
+SKIP_UNCHANGED_REPORTS = True
+RUN_MANIFEST_DIR = os.path.join(C_DIR, "cache", "run_manifest")
+
+# Validation Configuration
+# Raw downloads and processed files are checked before they are loaded; a failed check marks the
+# report as failed with the structured report of utils.etl.validation. Row counts are compared with
+# the history of the client's previous loads.
+VALIDATE_REPORTS = True
+VALIDATION_HISTORY_DIR = os.path.join(C_DIR, "cache", "validation_history")
+
+# Transform Configuration
+# Transforms run in a shared pool of this many worker processes per client process, away from the
+# browser, while the next report is extracted; 0 runs them inline. Each worker gets an equal share
+# of the cores as POLARS_MAX_THREADS (see TransformExecutor).
+TRANSFORM_WORKERS = 2
+# Raw files above the threshold are transformed in row batches. The memory budget is shared by the
+# transform workers of all clients running at once, so parallel clients cannot exhaust the machine.
+TRANSFORM_CHUNK_THRESHOLD_MB = 512
+TRANSFORM_MEMORY_BUDGET_MB = 8192
+
+# Processed File Configuration
+# "csv" files are loaded with BULK INSERT. "parquet" and "ipc" write typed, compressed columnar files
+# that are loaded in record batches with fast_executemany, without re-parsing text (see BulkLoadSQL.insert_file).
+PROCESSED_FORMAT = "csv"
+PROCESSED_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "ipc": ".arrow"}
+PROCESSED_EXT = PROCESSED_EXTENSIONS[PROCESSED_FORMAT]
+
 # SQL Queries
 CREDENTIALS_QUERY = "SELECT client_id, client_name, username, password FROM BI_AFC..AFC_Password_Tbl WHERE active = 1 AND Client_ID IN ({client_id})"
 
@@ -52,8 +107,10 @@ class ReportConfig:
             "file_name": "CNT_27_LogBookVisits.csv",
             "base_table": "CNT_27_Staging_Base",
             "staging_table": f"CNT_27_Staging_{self.client_id}",
+            "merge_keys": ["Log_Num"],
+            "date_column": "Svc_Date",
             "raw_file":f"CNT_27_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"CNT_27_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv"
+            "processed_file": f"CNT_27_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}"
         }
 
     def cnt_19(self, from_date, to_date) -> dict:
@@ -65,7 +122,7 @@ class ReportConfig:
             "base_table": "CNT_19_Staging_Base",
             "staging_table": f"CNT_19_Staging_{self.client_id}",
             "raw_file":f"CNT_19_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"CNT_19_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv"
+            "processed_file": f"CNT_19_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}"
         }
 
     def fin_25(self, from_date, to_date) -> dict:
@@ -77,7 +134,7 @@ class ReportConfig:
             "base_table": "FIN_25_Staging_Base",
             "staging_table": f"FIN_25_Staging_{self.client_id}",
             "raw_file":f"FIN_25_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"FIN_25_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv"
+            "processed_file": f"FIN_25_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}"
         }
 
     def adj_11(self, from_date, to_date) -> dict:
@@ -89,7 +146,7 @@ class ReportConfig:
             "base_table": "ADJ_11_Staging_Base",
             "staging_table": f"ADJ_11_Staging_{self.client_id}",
             "raw_file":f"ADJ_11_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"ADJ_11_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"ADJ_11_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def fin_18(self, from_date, to_date) -> dict:
@@ -100,8 +157,10 @@ class ReportConfig:
             "file_name": "FIN_18_RebillsBySvcDate.csv",
             "base_table": "FIN_18_Staging_Base",
             "staging_table": f"FIN_18_Staging_{self.client_id}",
+            "merge_keys": ["Inv_Num", "New_Inv_Num"],
+            "date_column": "Svc_Date",
             "raw_file":f"FIN_18_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"FIN_18_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"FIN_18_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def pay_41(self, from_date, to_date) -> dict:
@@ -113,7 +172,7 @@ class ReportConfig:
             "base_table": "PAY_41_Staging_Base",
             "staging_table": f"PAY_41_Staging_{self.client_id}",
             "raw_file":f"PAY_41_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"PAY_41_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"PAY_41_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def pat_2(self, from_date, to_date) -> dict:
@@ -124,8 +183,9 @@ class ReportConfig:
             "file_name": "PAT_2_PatientDemographicsByPractice.csv",
             "base_table": "PAT_2_Staging_Base",
             "staging_table": f"PAT_2_Staging_{self.client_id}",
+            "merge_keys": ["Patient_Number"],
             "raw_file":f"PAT_2_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"PAT_2_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"PAT_2_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def lab_01(self, from_date, to_date) -> dict:
@@ -137,7 +197,7 @@ class ReportConfig:
             "base_table": "LAB_01_Staging_Base",
             "staging_table": f"LAB_01_Staging_{self.client_id}",
             "raw_file":f"LAB_01_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"LAB_01_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"LAB_01_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def xry_03(self, from_date, to_date) -> dict:
@@ -149,7 +209,7 @@ class ReportConfig:
             "base_table": "XRY_03_Staging_Base",
             "staging_table": f"XRY_03_Staging_{self.client_id}",
             "raw_file":f"XRY_03_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"XRY_03_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"XRY_03_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def cht_02(self, from_date, to_date) -> dict:
@@ -161,7 +221,7 @@ class ReportConfig:
             "base_table": "CHT_02_Staging_Base",
             "staging_table": f"CHT_02_Staging_{self.client_id}",
             "raw_file":f"CHT_02_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"CHT_02_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"CHT_02_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def med_01(self, from_date, to_date) -> dict:
@@ -173,7 +233,7 @@ class ReportConfig:
             "base_table": "MED_01_Staging_Base",
             "staging_table": f"MED_01_Staging_{self.client_id}",
             "raw_file":f"MED_01_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"MED_01_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"MED_01_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def per_2(self, from_date, to_date) -> dict:
@@ -185,7 +245,7 @@ class ReportConfig:
             "base_table": "PER_2_Staging_Base",
             "staging_table": f"PER_2_Staging_{self.client_id}",
             "raw_file":f"PER_2_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"PER_2_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"PER_2_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def pat_20(self, from_date, to_date) -> dict:
@@ -196,8 +256,9 @@ class ReportConfig:
             "file_name": "PAT_20_PatContactByProvider.csv",
             "base_table": "PAT_20_Staging_Base",
             "staging_table": f"PAT_20_Staging_{self.client_id}",
+            "bulk_options": LARGE_REPORT_BULK_OPTIONS,
             "raw_file":f"PAT_20_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"PAT_20_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"PAT_20_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def ccr_2(self, from_date, to_date) -> dict:
@@ -209,7 +270,7 @@ class ReportConfig:
             "base_table": "CCR_02_Staging_Base",
             "staging_table": f"CCR_02_Staging_{self.client_id}",
             "raw_file":f"CCR_02_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"CCR_2_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"CCR_2_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def ccr_3(self, from_date, to_date) -> dict:
@@ -221,7 +282,7 @@ class ReportConfig:
             "base_table": "CCR_03_Staging_Base",
             "staging_table": f"CCR_03_Staging_{self.client_id}",
             "raw_file":f"CCR_03_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"CCR_3_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"CCR_3_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def rev_16(self, from_month, to_month) -> dict:
@@ -233,7 +294,7 @@ class ReportConfig:
             "base_table": "REV_16_Staging_Base",
             "staging_table": f"REV_16_Staging_{self.client_id}",
             "raw_file":f"REV_16_Raw_{from_month.replace(' ', '-')}_{to_month.replace(' ', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"REV_16_Processed_{from_month.replace(' ', '-')}_{to_month.replace(' ', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"REV_16_Processed_{from_month.replace(' ', '-')}_{to_month.replace(' ', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def pay_4(self, from_date, to_date) -> dict:
@@ -246,7 +307,7 @@ class ReportConfig:
             "base_table": "PAY_4_Staging_Base",
             "staging_table": f"PAY_4_Staging_{self.client_id}",
             "raw_file":f"PAY_04_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"PAY_04_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"PAY_04_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def adj_4(self, from_month, to_month) -> dict:
@@ -258,7 +319,7 @@ class ReportConfig:
             "base_table": "ADJ_4_Staging_Base",
             "staging_table": f"ADJ_4_Staging_{self.client_id}",
             "raw_file":f"ADJ_4_Raw_{from_month.replace(' ', '-')}_{to_month.replace(' ', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"ADJ_4_Processed_{from_month.replace(' ', '-')}_{to_month.replace(' ', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"ADJ_4_Processed_{from_month.replace(' ', '-')}_{to_month.replace(' ', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def pay_10(self, from_date, to_date) -> dict:
@@ -269,8 +330,9 @@ class ReportConfig:
             "file_name": "PAY_10_PayerPatientPaidAdjustedByPayerClass.csv",
             "base_table": "PAY_10_Staging_Base",
             "staging_table": f"PAY_10_Staging_{self.client_id}",
+            "bulk_options": LARGE_REPORT_BULK_OPTIONS,
             "raw_file":f"PAY_10_Raw_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"PAY_10_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"PAY_10_Processed_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
     def rev_19(self, from_month, to_month) -> dict:
@@ -282,10 +344,41 @@ class ReportConfig:
             "base_table": "REV_19_Staging_Base",
             "staging_table": f"REV_19_Staging_{self.client_id}",
             "raw_file":f"REV_19_Raw_{from_month.replace(' ', '-')}_{to_month.replace(' ', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
-            "processed_file": f"REV_19_Processed_{from_month.replace(' ', '-')}_{to_month.replace(' ', '-')}_{TIME_STAMP.replace(':', '-')}.csv",
+            "processed_file": f"REV_19_Processed_{from_month.replace(' ', '-')}_{to_month.replace(' ', '-')}_{TIME_STAMP.replace(':', '-')}{PROCESSED_EXT}",
         }
 
 
+def _window_day(value: str, last: bool = False) -> date:
+    """
+    Parses a report window bound given either as MM/DD/YYYY or as a month (e.g. "January 2022").
+    Months resolve to their first day, or to their last day when ``last`` is set.
+    """
+    try:
+        return datetime.strptime(value, "%m/%d/%Y").date()
+    except ValueError:
+        month = datetime.strptime(value, "%B %Y").date()
+        return month.replace(day=calendar.monthrange(month.year, month.month)[1]) if last else month
+
+
+def report_window(report_cfg: dict) -> tuple[date, date] | None:
+    """
+    Returns the first and last day covered by a report configuration.
+
+    Date based reports use ``from_date``/``to_date`` (MM/DD/YYYY), month based reports use
+    ``from_month``/``to_month`` (e.g. "January 2022") and cover the whole months.
+
+    :param report_cfg: A report configuration returned by :class:`ReportConfig`.
+    :type report_cfg: dict
+    :returns: The ``(first_day, last_day)`` window, or None if the report has no window.
+    :rtype: tuple[date, date] | None
+
+    :raises ValueError: If a window bound is in neither supported format.
+    """
+    for start, end in (("from_date", "to_date"), ("from_month", "to_month")):
+        if start in report_cfg and end in report_cfg:
+            return _window_day(report_cfg[start]), _window_day(report_cfg[end], last=True)
+    return None
+
 if __name__ == "__main__":
     rep_cfg = ReportConfig(3622)
     print(rep_cfg.cnt_27()['processed_file'])
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Run Manifest
+
+This module remembers, per client, report and extracted window, the SHA-256 of the last raw file
+that was transformed and loaded, and of its processed output. Scheduled runs re-pull the same
+closed windows (``REV_16`` from January 2022, ``PAT_20`` from 01/01/2022), so when a new download
+is byte-identical to the one already loaded, the transform and load are skipped and the report is
+marked ``UNCHANGED`` in the status table.
+
+An entry also records the table columns it was loaded with, so a changed table schema forces a
+reload even if the raw file did not change.
+
+:module: run_manifest.py
+:platform: Unix, Windows
+:synopsis: Content-hash manifest used to skip unchanged raw downloads.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from datetime import date
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Computes the SHA-256 of a file, reading it in chunks.
+
+    :param path: Path of the file.
+    :type path: str
+    :param chunk_size: Bytes read at a time.
+    :type chunk_size: int
+    :returns: The hex digest.
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """
+    The hashes of the last loaded raw and processed file of every report and window of a client,
+    kept in a JSON file.
+
+    Methods:
+        is_unchanged(self, report_name, window, raw_digest, table_columns):
+            Returns whether the raw file was already loaded for this window and table layout.
+        record(self, report_name, window, raw_digest, processed_digest, table_columns):
+            Records a successful load and saves the manifest.
+        forget(self, report_name, window):
+            Drops an entry, so the next run reloads the report.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: The JSON file of the manifest, created on the first record.
+        :type path: str
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning("Ignoring unreadable run manifest '%s': %s", path, e)
+
+    @staticmethod
+    def _key(report_name: str, window: tuple[date, date] | None) -> str:
+        if window is None:
+            return report_name
+        return f"{report_name}|{window[0].isoformat()}|{window[1].isoformat()}"
+
+    @staticmethod
+    def _columns(table_columns: list[tuple[str]] | list[str]) -> list[str]:
+        return [col if isinstance(col, str) else col[0] for col in table_columns]
+
+    def is_unchanged(self, report_name: str, window: tuple[date, date] | None, raw_digest: str, table_columns: list[tuple[str]]) -> bool:
+        """
+        :param report_name: The report name, e.g. ``REV_16``.
+        :type report_name: str
+        :param window: The extracted window, see :func:`report_config.report_window`.
+        :type window: tuple[date, date] | None
+        :param raw_digest: The SHA-256 of the new raw file.
+        :type raw_digest: str
+        :param table_columns: The columns of the base table the report is loaded into.
+        :type table_columns: list[tuple[str]]
+        :returns: True if the same raw file was loaded for the window with the same table columns.
+        :rtype: bool
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(report_name, window))
+        return bool(entry) and entry["raw_sha256"] == raw_digest and entry["columns"] == self._columns(table_columns)
+
+    def record(self, report_name: str, window: tuple[date, date] | None, raw_digest: str, processed_digest: str,
+               table_columns: list[tuple[str]]) -> None:
+        """
+        Records a successful load of the window and saves the manifest.
+
+        :param report_name: The report name.
+        :type report_name: str
+        :param window: The extracted window.
+        :type window: tuple[date, date] | None
+        :param raw_digest: The SHA-256 of the loaded raw file.
+        :type raw_digest: str
+        :param processed_digest: The SHA-256 of the processed file that was loaded.
+        :type processed_digest: str
+        :param table_columns: The columns of the base table.
+        :type table_columns: list[tuple[str]]
+        :returns: None
+        """
+        with self._lock:
+            self._entries[self._key(report_name, window)] = {
+                "raw_sha256": raw_digest,
+                "processed_sha256": processed_digest,
+                "columns": self._columns(table_columns),
+                "loaded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            self._save()
+
+    def forget(self, report_name: str, window: tuple[date, date] | None) -> None:
+        with self._lock:
+            if self._entries.pop(self._key(report_name, window), None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=1)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,307 @@
+"""
+Schema Cache
+
+This module keeps the column metadata of the report base tables in memory, so the ETL does not
+query ``INFORMATION_SCHEMA.COLUMNS`` for every report of every client. Entries expire after a TTL,
+can be invalidated explicitly and can optionally be persisted to a JSON file between runs.
+
+:module: schema_cache.py
+:platform: Unix, Windows
+:synopsis: Process-wide cache of table column names, ordinals and SQL types.
+"""
+
+import os
+import json
+import time
+import logging
+import functools
+import threading
+
+import polars as pl
+
+
+class ColumnMapper:
+    """
+    A precompiled, case-insensitive mapping from DataFrame columns to the columns of a table.
+
+    The rename/missing plan is computed once per distinct set of frame columns and reused, so
+    transforms of the same report layout do not rebuild the lookup dictionaries every time.
+
+    Methods:
+        plan(self, frame_columns):
+            Returns the rename mapping and missing columns for a set of frame columns.
+        apply(self, frame):
+            Renames, adds and orders columns so the frame matches the table.
+    """
+
+    def __init__(self, table_columns: list[str]) -> None:
+        self.columns = list(table_columns)
+        self._lookup = {col.lower(): col for col in self.columns}
+        self._plans = {}
+
+    def plan(self, frame_columns: list[str]) -> tuple[dict[str, str], list[str]]:
+        """
+        Returns the rename mapping and missing columns for a set of frame columns.
+
+        :param frame_columns: Column names of the DataFrame to align.
+        :type frame_columns: list[str]
+        :returns: A ``(rename, missing)`` tuple. ``rename`` maps frame columns to table columns,
+            ``missing`` lists the table columns that are absent from the frame.
+        :rtype: tuple[dict[str, str], list[str]]
+        """
+        key = tuple(frame_columns)
+        plan = self._plans.get(key)
+        if plan is None:
+            rename = {col: self._lookup[col.lower()] for col in key if col.lower() in self._lookup}
+            present = {col.lower() for col in key}
+            missing = [col for col in self.columns if col.lower() not in present]
+            plan = self._plans[key] = (rename, missing)
+        return plan
+
+    def apply(self, frame: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
+        """
+        Renames, adds and orders columns so the frame matches the table.
+
+        :param frame: The DataFrame or LazyFrame to align.
+        :type frame: pl.DataFrame | pl.LazyFrame
+        :returns: The aligned frame.
+        :rtype: pl.DataFrame | pl.LazyFrame
+        """
+        frame_columns = frame.collect_schema().names() if isinstance(frame, pl.LazyFrame) else frame.columns
+        rename, missing = self.plan(frame_columns)
+        if missing:
+            frame = frame.with_columns([pl.lit(None).alias(col) for col in missing])
+        return frame.rename(rename).select(self.columns)
+
+
+@functools.lru_cache(maxsize=256)
+def _column_mapper(table_columns: tuple[str, ...]) -> ColumnMapper:
+    return ColumnMapper(table_columns)
+
+
+def column_mapper(table_columns: list[tuple[str]] | list[str]) -> ColumnMapper:
+    """
+    Returns the shared :class:`ColumnMapper` for a table column list.
+
+    :param table_columns: Table columns, either as names or as the single-element rows returned by
+        ``get_column_names``.
+    :type table_columns: list[tuple[str]] | list[str]
+    :returns: The cached column mapper.
+    :rtype: ColumnMapper
+    """
+    names = tuple(col if isinstance(col, str) else col[0] for col in table_columns)
+    return _column_mapper(names)
+
+
+class TableSchema:
+    """
+    Column metadata of a single table.
+
+    Attributes:
+        :table_name: The name of the table.
+
+        :columns: One dict per column with ``name``, ``ordinal``, ``data_type``, ``max_length``,
+            ``precision`` and ``scale`` keys, ordered by ordinal position.
+
+        :fetched_at: Epoch seconds when the metadata was read from the database.
+    """
+
+    def __init__(self, table_name: str, columns: list[dict], fetched_at: float = None) -> None:
+        self.table_name = table_name
+        self.columns = sorted(columns, key=lambda col: col["ordinal"])
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    @classmethod
+    def from_rows(cls, table_name: str, rows: list[tuple]) -> "TableSchema":
+        """
+        Builds a schema from ``get_table_schema`` rows.
+
+        :param table_name: The name of the table.
+        :type table_name: str
+        :param rows: ``(name, ordinal, data_type, max_length, precision, scale)`` rows.
+        :type rows: list[tuple]
+        :returns: The table schema.
+        :rtype: TableSchema
+        """
+        keys = ("name", "ordinal", "data_type", "max_length", "precision", "scale")
+        return cls(table_name, [dict(zip(keys, row)) for row in rows])
+
+    @property
+    def names(self) -> list[str]:
+        return [col["name"] for col in self.columns]
+
+    @property
+    def column_tuples(self) -> list[tuple[str]]:
+        """
+        The column names in the ``list[tuple[str]]`` shape returned by ``get_column_names``.
+        """
+        return [(name,) for name in self.names]
+
+    @property
+    def sql_types(self) -> dict[str, str]:
+        """
+        The SQL type of every column, rendered as it would appear in a ``CREATE TABLE`` statement.
+        """
+        types = {}
+        for col in self.columns:
+            data_type = col["data_type"].upper()
+            if data_type in ("NVARCHAR", "VARCHAR", "NCHAR", "CHAR", "VARBINARY", "BINARY"):
+                length = col["max_length"]
+                data_type = f"{data_type}({'MAX' if length in (None, -1) else length})"
+            elif data_type in ("DECIMAL", "NUMERIC"):
+                data_type = f"{data_type}({col['precision']},{col['scale']})"
+            types[col["name"]] = data_type
+        return types
+
+    @property
+    def mapper(self) -> ColumnMapper:
+        return column_mapper(self.names)
+
+    def is_expired(self, ttl: float) -> bool:
+        return ttl is not None and time.time() - self.fetched_at > ttl
+
+    def to_dict(self) -> dict:
+        return {"table_name": self.table_name, "columns": self.columns, "fetched_at": self.fetched_at}
+
+
+class SchemaCache:
+    """
+    A thread-safe, process-wide cache of :class:`TableSchema` objects.
+
+    Methods:
+        get(self, sql, table_name):
+            Returns the schema of a table, reading it from the database on a miss.
+        invalidate(self, table_name=None):
+            Drops one table (or every table) from the cache.
+        configure(self, ttl=None, persist_path=None):
+            Changes the TTL and the optional on-disk location of the cache.
+        save(self):
+            Writes the cache to ``persist_path``.
+    """
+
+    def __init__(self, ttl: float = 24 * 3600, persist_path: str = None) -> None:
+        """
+        Initializes the SchemaCache class.
+
+        :param ttl: Seconds a schema stays valid. ``None`` keeps entries until invalidated.
+        :type ttl: float
+        :param persist_path: Optional JSON file used to keep the cache between runs.
+        :type persist_path: str
+        :returns: None
+        """
+        self.ttl = ttl
+        self.persist_path = None
+        self._schemas = {}
+        self._lock = threading.Lock()
+        if persist_path:
+            self.configure(persist_path=persist_path)
+
+    @staticmethod
+    def _key(database: str, table_name: str) -> str:
+        return f"{database}.{table_name}".lower()
+
+    def configure(self, ttl: float = None, persist_path: str = None) -> None:
+        """
+        Changes the TTL and the optional on-disk location of the cache.
+
+        Entries already stored in ``persist_path`` are loaded unless they have expired.
+
+        :param ttl: Seconds a schema stays valid.
+        :type ttl: float
+        :param persist_path: JSON file used to keep the cache between runs.
+        :type persist_path: str
+        :returns: None
+        """
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if persist_path:
+                self.persist_path = persist_path
+                self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable schema cache '%s': %s", self.persist_path, e)
+            return
+        for key, entry in stored.items():
+            schema = TableSchema(entry["table_name"], entry["columns"], entry["fetched_at"])
+            if not schema.is_expired(self.ttl) and key not in self._schemas:
+                self._schemas[key] = schema
+        logging.info("Loaded %d table schemas from '%s'.", len(self._schemas), self.persist_path)
+
+    def save(self) -> None:
+        """
+        Writes the cache to ``persist_path``. Does nothing when persistence is disabled.
+
+        :returns: None
+        """
+        with self._lock:
+            if not self.persist_path:
+                return
+            stored = {key: schema.to_dict() for key, schema in self._schemas.items()}
+            os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+            tmp_path = f"{self.persist_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.persist_path)
+
+    def get(self, sql, table_name: str) -> TableSchema:
+        """
+        Returns the schema of a table, reading it from the database on a miss or after expiry.
+
+        :param sql: The database wrapper used to read the metadata.
+        :type sql: PyODBCSQL
+        :param table_name: The name of the table.
+        :type table_name: str
+        :returns: The table schema.
+        :rtype: TableSchema
+
+        :raises ValueError: If the table does not exist or has no columns.
+        """
+        key = self._key(sql.database, table_name)
+        with self._lock:
+            schema = self._schemas.get(key)
+            if schema is not None and not schema.is_expired(self.ttl):
+                return schema
+
+        rows = sql.get_table_schema(table_name)
+        if not rows:
+            raise ValueError(f"Table '{table_name}' does not exist or has no columns.")
+        schema = TableSchema.from_rows(table_name, rows)
+        logging.info("Cached schema of table '%s' (%d columns).", table_name, len(schema.columns))
+
+        with self._lock:
+            self._schemas[key] = schema
+        if self.persist_path:
+            self.save()
+        return schema
+
+    def invalidate(self, table_name: str = None, database: str = None) -> None:
+        """
+        Drops one table, or every table, from the cache.
+
+        :param table_name: The table to drop. Drops everything when omitted.
+        :type table_name: str
+        :param database: Restricts ``table_name`` to one database. Matches every database when omitted.
+        :type database: str
+        :returns: None
+        """
+        with self._lock:
+            if table_name is None:
+                self._schemas.clear()
+            elif database is not None:
+                self._schemas.pop(self._key(database, table_name), None)
+            else:
+                suffix = f".{table_name}".lower()
+                for key in [key for key in self._schemas if key.endswith(suffix)]:
+                    del self._schemas[key]
+        if self.persist_path:
+            self.save()
+
+
+schema_cache = SchemaCache()
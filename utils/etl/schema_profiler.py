@@ -0,0 +1,329 @@
+"""
+Schema Profiler
+
+This module scans processed report files and proposes narrow SQL types for the columns of a
+report base table (dates, DECIMAL money, INT ids and bounded NVARCHAR lengths) instead of the
+``NVARCHAR(MAX)`` columns generated by :mod:`utils.create_table_queries`. It emits a versioned
+``CREATE TABLE`` script and a migration script that converts an existing table in place.
+
+Usage::
+
+    python -m utils.etl.schema_profiler --report CNT_27 --files "downloads/*/*/CNT_27_Processed_*.csv" --out_dir sql
+
+:module: schema_profiler.py
+:platform: Unix, Windows
+:synopsis: Profiles processed report files and generates typed DDL and migrations.
+"""
+
+import os
+import re
+import glob
+import logging
+import argparse
+from datetime import datetime
+
+import polars as pl
+
+from utils import create_table_queries
+from utils.etl.date_normalizer import DATE_FORMATS, DATETIME_FORMATS
+
+NVARCHAR_LENGTHS = [10, 20, 50, 100, 255, 500, 1000, 2000, 4000]
+LENGTH_HEADROOM = 1.5
+INT_RANGE = (-2**31, 2**31 - 1)
+
+# Types that are already narrow are kept as they are, everything else is re-profiled.
+WIDE_TYPES = ("NVARCHAR(MAX)", "VARCHAR(MAX)", "FLOAT", "REAL")
+
+
+def parse_create_table(create_table_query: str) -> dict[str, str]:
+    """
+    Extracts the column names and types from a ``CREATE TABLE`` statement.
+
+    :param create_table_query: The SQL statement, as returned by the ``create_table_queries`` functions.
+    :type create_table_query: str
+    :returns: Column name to upper-cased SQL type, in declaration order.
+    :rtype: dict[str, str]
+    """
+    body = create_table_query[create_table_query.index("(") + 1:create_table_query.rindex(")")]
+    columns = {}
+    for line in body.split(","):
+        match = re.match(r"\s*(\w+)\s+(\w+(?:\s*\(\s*\w+\s*(?:,\s*\w+\s*)?\))?)", line)
+        if match:
+            columns[match.group(1)] = re.sub(r"\s+", "", match.group(2)).upper()
+    return columns
+
+
+def _profile_expressions(source: str, column: str) -> list[pl.Expr]:
+    """
+    Builds the aggregation expressions profiling one string column of the files.
+    Results are named ``<column>|<statistic>`` after the table column.
+    """
+    value = pl.col(source).str.strip_chars()
+    value = pl.when(value == "").then(None).otherwise(value)
+    as_int = value.cast(pl.Int64, strict=False)
+    is_decimal = value.str.contains(r"^-?\d+(\.\d+)?$")
+    exprs = [
+        value.count().alias(f"{column}|non_null"),
+        value.str.len_chars().max().alias(f"{column}|max_length"),
+        value.str.contains(r"^-?0\d").any().alias(f"{column}|leading_zero"),
+        as_int.count().alias(f"{column}|ints"),
+        as_int.min().alias(f"{column}|int_min"),
+        as_int.max().alias(f"{column}|int_max"),
+        is_decimal.sum().alias(f"{column}|decimals"),
+        value.str.extract(r"\.(\d+)$").str.len_chars().max().alias(f"{column}|scale"),
+        value.str.extract(r"^-?(\d+)").str.len_chars().max().alias(f"{column}|int_digits"),
+    ]
+    # A column may mix formats across clients, so a value counts if any format parses it.
+    exprs.append(pl.coalesce([value.str.to_date(fmt, strict=False) for fmt in DATE_FORMATS])
+                 .count().alias(f"{column}|dates"))
+    exprs.append(pl.coalesce([value.str.to_datetime(fmt, strict=False) for fmt in DATETIME_FORMATS])
+                 .count().alias(f"{column}|datetimes"))
+    return exprs
+
+
+def _nvarchar(max_length: int | None) -> str:
+    wanted = int((max_length or 1) * LENGTH_HEADROOM)
+    for length in NVARCHAR_LENGTHS:
+        if wanted <= length:
+            return f"NVARCHAR({length})"
+    return "NVARCHAR(MAX)"
+
+
+def _propose_type(stats: dict) -> str | None:
+    """
+    Picks the narrowest SQL type that holds every profiled value of a column.
+
+    :returns: The proposed type, or None if the column holds no values.
+    """
+    non_null = stats["non_null"]
+    if not non_null:
+        return None
+
+    if stats["dates"] == non_null:
+        return "DATE"
+    if stats["datetimes"] == non_null:
+        return "DATETIME2(0)"
+    # Leading zeros (zip codes, patient numbers) would be lost in a numeric column.
+    if stats["leading_zero"]:
+        return _nvarchar(stats["max_length"])
+    if stats["ints"] == non_null:
+        if INT_RANGE[0] <= stats["int_min"] and stats["int_max"] <= INT_RANGE[1]:
+            return "INT"
+        return "BIGINT"
+    if stats["decimals"] == non_null:
+        scale = max(stats["scale"] or 0, 2)
+        precision = min(38, max(18, (stats["int_digits"] or 0) + scale))
+        return f"DECIMAL({precision},{scale})"
+    return _nvarchar(stats["max_length"])
+
+
+def profile_files(files: list[str], columns: list[str]) -> dict[str, dict]:
+    """
+    Profiles the given columns over all files in a single pass.
+
+    :param files: Paths of processed report CSV files.
+    :type files: list[str]
+    :param columns: Table columns to profile. Columns missing from a file count as null.
+    :type columns: list[str]
+    :returns: Per-column statistics, including the ``rows`` profiled.
+    :rtype: dict[str, dict]
+    """
+    frames = [pl.scan_csv(file, infer_schema=False) for file in files]
+    frame = pl.concat(frames, how="diagonal")
+    present = frame.collect_schema().names()
+    lookup = {col.lower(): col for col in present}
+
+    exprs = [pl.len().alias("rows")]
+    for column in columns:
+        source = lookup.get(column.lower())
+        if source is not None:
+            exprs += _profile_expressions(source, column)
+    result = frame.select(exprs).collect().row(0, named=True)
+
+    profile = {}
+    for column in columns:
+        stats = {"rows": result["rows"], "non_null": 0}
+        for key, value in result.items():
+            if key.startswith(f"{column}|"):
+                stats[key.split("|", 1)[1]] = value
+        profile[column] = stats
+    return profile
+
+
+def propose_types(current_types: dict[str, str], profile: dict[str, dict]) -> dict[str, str]:
+    """
+    Proposes a SQL type for every column, keeping columns that are already narrow.
+
+    :param current_types: Current column types, as returned by :func:`parse_create_table`.
+    :type current_types: dict[str, str]
+    :param profile: Column statistics, as returned by :func:`profile_files`.
+    :type profile: dict[str, dict]
+    :returns: Column name to proposed SQL type.
+    :rtype: dict[str, str]
+    """
+    proposed = {}
+    for column, current in current_types.items():
+        if current not in WIDE_TYPES:
+            proposed[column] = current
+            continue
+        proposed[column] = _propose_type(profile.get(column, {"non_null": 0})) or current
+    return proposed
+
+
+def create_table_ddl(table_name: str, types: dict[str, str], profile: dict[str, dict] = None) -> str:
+    """
+    Generates a typed ``CREATE TABLE`` statement.
+
+    :param table_name: The name of the table to be created.
+    :type table_name: str
+    :param types: Column name to SQL type.
+    :type types: dict[str, str]
+    :param profile: Optional statistics, written as comments next to each column.
+    :type profile: dict[str, dict]
+    :returns: SQL table string.
+    :rtype: str
+    """
+    lines = []
+    for index, (column, sql_type) in enumerate(types.items()):
+        separator = "," if index < len(types) - 1 else ""
+        comment = ""
+        if profile and column in profile and profile[column].get("non_null"):
+            comment = f" -- non-null: {profile[column]['non_null']}, max length: {profile[column].get('max_length')}"
+        lines.append(f"        {column} {sql_type}{separator}{comment}")
+    columns = "\n".join(lines)
+    return f"CREATE TABLE {table_name}(\n{columns}\n    );\n"
+
+
+def migration_script(table_name: str, current_types: dict[str, str], proposed_types: dict[str, str]) -> str:
+    """
+    Generates a script converting an existing table to the proposed types in place.
+
+    Every changed column is checked first: the script aborts without changing anything if an
+    existing value would not convert. Blank strings are turned into NULL before non-text columns
+    are altered, so they do not silently become ``0`` or ``1900-01-01``.
+
+    :param table_name: The table to migrate.
+    :type table_name: str
+    :param current_types: Current column types.
+    :type current_types: dict[str, str]
+    :param proposed_types: Target column types.
+    :type proposed_types: dict[str, str]
+    :returns: The migration SQL script.
+    :rtype: str
+    """
+    changed = {col: sql_type for col, sql_type in proposed_types.items() if current_types.get(col) != sql_type}
+    if not changed:
+        return f"-- {table_name}: all columns already have the proposed types.\n"
+
+    checks, blanks, alters = [], [], []
+    for column, sql_type in changed.items():
+        checks.append(
+            f"IF EXISTS (SELECT 1 FROM {table_name} WHERE NULLIF(LTRIM(RTRIM({column})), '') IS NOT NULL "
+            f"AND TRY_CONVERT({sql_type}, {column}) IS NULL)\n"
+            f"    THROW 50001, '{table_name}.{column} has values that do not convert to {sql_type}.', 1;"
+        )
+        if not sql_type.startswith(("NVARCHAR", "VARCHAR")) and current_types.get(column, "").startswith(("NVARCHAR", "VARCHAR")):
+            blanks.append(f"    UPDATE {table_name} SET {column} = NULL WHERE LTRIM(RTRIM({column})) = '';")
+        alters.append(f"    ALTER TABLE {table_name} ALTER COLUMN {column} {sql_type} NULL;")
+
+    return "\n".join([
+        "SET XACT_ABORT ON;",
+        *checks,
+        "BEGIN TRY",
+        "    BEGIN TRANSACTION;",
+        *blanks,
+        *alters,
+        "    COMMIT TRANSACTION;",
+        "END TRY",
+        "BEGIN CATCH",
+        "    IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION;",
+        "    THROW;",
+        "END CATCH;",
+        "",
+    ])
+
+
+def next_version(out_dir: str, table_name: str) -> int:
+    """
+    Returns the next script version for a table, based on the scripts already in ``out_dir``.
+    """
+    versions = [
+        int(match.group(1)) for name in os.listdir(out_dir)
+        if (match := re.match(rf"V(\d+)__{re.escape(table_name)}_", name))
+    ] if os.path.isdir(out_dir) else []
+    return max(versions, default=0) + 1
+
+
+def base_table_name(report: str) -> str:
+    """
+    Returns the default base table of a report, as declared in ``create_table_queries``.
+    """
+    return getattr(create_table_queries, f"{report.lower()}_staging_table").__defaults__[0]
+
+
+def write_scripts(report: str, files: list[str], out_dir: str, table_name: str = None) -> tuple[str, str]:
+    """
+    Profiles the processed files of a report and writes versioned DDL and migration scripts.
+
+    :param report: Report name, e.g. ``CNT_27``. Selects ``<report>_staging_table`` in ``create_table_queries``.
+    :type report: str
+    :param files: Processed report files to profile.
+    :type files: list[str]
+    :param out_dir: Directory receiving the scripts.
+    :type out_dir: str
+    :param table_name: Table to migrate, defaults to the report's base table.
+    :type table_name: str
+    :returns: Paths of the DDL and the migration script.
+    :rtype: tuple[str, str]
+    """
+    create_table = getattr(create_table_queries, f"{report.lower()}_staging_table")
+    table_name = table_name or base_table_name(report)
+    current_types = parse_create_table(create_table(table_name))
+
+    profile = profile_files(files, list(current_types))
+    proposed = propose_types(current_types, profile)
+
+    os.makedirs(out_dir, exist_ok=True)
+    version = next_version(out_dir, table_name)
+    rows = next(iter(profile.values()))["rows"] if profile else 0
+    header = (f"-- {table_name} V{version:03d}, generated {datetime.now():%Y-%m-%d %H:%M:%S}\n"
+              f"-- Profiled {rows} rows from {len(files)} files.\n")
+
+    ddl_path = os.path.join(out_dir, f"V{version:03d}__{table_name}_create.sql")
+    migration_path = os.path.join(out_dir, f"V{version:03d}__{table_name}_migrate.sql")
+    with open(ddl_path, "w", encoding="utf-8") as f:
+        f.write(header + create_table_ddl(table_name, proposed, profile))
+    with open(migration_path, "w", encoding="utf-8") as f:
+        f.write(header + migration_script(table_name, current_types, proposed))
+
+    logging.info("Wrote typed DDL '%s' and migration '%s'.", ddl_path, migration_path)
+    return ddl_path, migration_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile processed report files and propose typed DDL.")
+    parser.add_argument("--report", required=True, help="Report name, e.g. CNT_27")
+    parser.add_argument("--files", required=True, help="Glob matching the processed report files")
+    parser.add_argument("--out_dir", default="sql", help="Directory receiving the versioned scripts")
+    parser.add_argument("--table", default=None, help="Table to migrate, defaults to the base table")
+    parser.add_argument("--apply", action="store_true", help="Run the migration against --db_name")
+    parser.add_argument("--db_name", default=None, help="Database used with --apply")
+    args = parser.parse_args()
+
+    matched = sorted(glob.glob(args.files))
+    if not matched:
+        raise FileNotFoundError(f"No files match '{args.files}'.")
+    ddl_file, migration_file = write_scripts(args.report, matched, args.out_dir, args.table)
+    print(f"DDL: {ddl_file}\nMigration: {migration_file}")
+
+    if args.apply:
+        from utils.pyodbc_sql import PyODBCSQL
+        from utils.etl.schema_cache import schema_cache
+        from utils.etl import report_config
+
+        sql = PyODBCSQL(args.db_name)
+        with open(migration_file, "r", encoding="utf-8") as f:
+            sql.execute_query(f.read())
+        schema_cache.configure(persist_path=report_config.SCHEMA_CACHE_FILE)
+        schema_cache.invalidate(args.table or base_table_name(args.report), args.db_name)
+        print("Migration applied.")
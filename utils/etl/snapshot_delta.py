@@ -0,0 +1,254 @@
+"""
+Snapshot Delta
+
+This module reduces a processed report to the rows that changed since the last successful load.
+After each load the business key and a hash of the other columns of every row are kept in a
+small Parquet snapshot per client and report. The next processed file is hashed the same way and
+anti-joined with the snapshot, so only new and changed rows are written to a delta file and
+merged, and the keys that disappeared are returned for deletion.
+
+Row hashes are computed with Polars and are only stable within one Polars version, so the
+version is part of the snapshot file name; after an upgrade the first load of every report is a
+full merge.
+
+:module: snapshot_delta.py
+:platform: Unix, Windows
+:synopsis: Row-level delta of processed reports against the previously loaded snapshot.
+"""
+
+import os
+import logging
+
+import polars as pl
+
+
+ROW_HASH_COLUMN = "Row_Hash"
+
+# Columns that change on every run and do not make a row different.
+IGNORED_COLUMNS = ("Date_Updated",)
+
+# Delta files are written in this folder next to the processed file.
+DELTA_FOLDER = "Delta"
+
+SCANNERS = {".parquet": pl.scan_parquet, ".arrow": pl.scan_ipc, ".ipc": pl.scan_ipc}
+
+
+def scan_processed(path: str) -> pl.LazyFrame:
+    """
+    :param path: A processed CSV, Parquet or Arrow IPC file.
+    :type path: str
+    :returns: The lazy scan of the file, CSV columns read as text.
+    :rtype: pl.LazyFrame
+    """
+    scanner = SCANNERS.get(os.path.splitext(path)[1].lower())
+    return scanner(path) if scanner else pl.scan_csv(path, infer_schema=False)
+
+
+def sink_processed(frame: pl.LazyFrame, path: str) -> pl.LazyFrame:
+    """
+    :param frame: The frame to write.
+    :type frame: pl.LazyFrame
+    :param path: The output file, its extension selects the format like for processed files.
+    :type path: str
+    :returns: The lazy sink, to be run with ``pl.collect_all``.
+    :rtype: pl.LazyFrame
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        return frame.sink_parquet(path, compression="zstd", lazy=True)
+    if extension in (".arrow", ".ipc"):
+        return frame.sink_ipc(path, compression="zstd", lazy=True)
+    return frame.sink_csv(path, lazy=True)
+
+
+def row_hash_expr(columns: list[str]) -> pl.Expr:
+    """
+    :param columns: The columns compared between loads.
+    :type columns: list[str]
+    :returns: A 64-bit hash of the columns of each row.
+    :rtype: pl.Expr
+    """
+    return pl.struct(columns).hash(seed=0).alias(ROW_HASH_COLUMN)
+
+
+class ReportDelta:
+    """
+    The delta of one processed file, computed by :meth:`SnapshotDelta.compute`.
+
+    Attributes:
+        :processed_file: The full processed file.
+
+        :upsert_file: The file holding the new and changed rows, or the processed file itself if
+            there was no usable snapshot.
+
+        :deleted_keys: The keys of the snapshot missing from the file, None if there was no snapshot.
+
+        :inserted, updated, deleted, unchanged: Row counts against the snapshot.
+
+        :snapshot: The keys and row hashes of the processed file, saved on commit.
+
+        :snapshot_file: Where the snapshot is saved.
+    """
+
+    def __init__(self, processed_file: str, upsert_file: str, deleted_keys: pl.DataFrame | None,
+                 snapshot: pl.DataFrame, snapshot_file: str, inserted: int, updated: int, deleted: int,
+                 unchanged: int) -> None:
+        self.processed_file = processed_file
+        self.upsert_file = upsert_file
+        self.deleted_keys = deleted_keys
+        self.snapshot = snapshot
+        self.snapshot_file = snapshot_file
+        self.inserted = inserted
+        self.updated = updated
+        self.deleted = deleted
+        self.unchanged = unchanged
+
+    @property
+    def is_full(self) -> bool:
+        """
+        Whether the whole file has to be loaded, because no snapshot was available.
+        """
+        return self.deleted_keys is None
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.is_full and not (self.inserted or self.updated or self.deleted)
+
+    def counts(self) -> dict:
+        return {"inserted": self.inserted, "updated": self.updated, "deleted": self.deleted, "unchanged": self.unchanged}
+
+    def __repr__(self) -> str:
+        return f"ReportDelta({self.processed_file!r}, {self.counts()})"
+
+
+class SnapshotDelta:
+    """
+    Keeps the snapshot of the last loaded rows per client and report, and computes deltas against it.
+
+    Methods:
+        snapshot_file(self, client_id, report_name):
+            Returns the path of a snapshot.
+        compute(self, processed_file, client_id, report_name, merge_keys):
+            Hashes the processed file and writes the delta file.
+        commit(self, delta):
+            Saves the new snapshot once the delta is loaded and removes the delta file.
+        discard(self, delta):
+            Removes the delta file and keeps the old snapshot.
+        forget(self, client_id, report_name):
+            Deletes a snapshot, so the next load of the report is a full merge.
+    """
+
+    def __init__(self, snapshot_dir: str) -> None:
+        """
+        :param snapshot_dir: The folder holding one subfolder of snapshots per client.
+        :type snapshot_dir: str
+        """
+        self.snapshot_dir = snapshot_dir
+
+    def snapshot_file(self, client_id: int, report_name: str) -> str:
+        return os.path.join(self.snapshot_dir, str(client_id), f"{report_name}.polars-{pl.__version__}.parquet")
+
+    @staticmethod
+    def delta_file(processed_file: str) -> str:
+        folder, name = os.path.split(processed_file)
+        stem, extension = os.path.splitext(name)
+        return os.path.join(folder, DELTA_FOLDER, f"{stem}_Delta{extension}")
+
+    def _previous(self, snapshot_file: str, schema: pl.Schema) -> pl.DataFrame | None:
+        if not os.path.exists(snapshot_file):
+            return None
+        try:
+            previous = pl.read_parquet(snapshot_file)
+        except Exception as e:
+            logging.warning("Ignoring unreadable snapshot '%s': %s", snapshot_file, e)
+            return None
+        if previous.schema != schema:
+            logging.info("Snapshot '%s' has a different layout, loading the full file.", snapshot_file)
+            return None
+        return previous
+
+    def compute(self, processed_file: str, client_id: int, report_name: str, merge_keys: list[str]) -> ReportDelta:
+        """
+        Computes the delta of a processed file against the snapshot of the report.
+
+        New and changed rows are the rows whose key and row hash pair is not in the snapshot; they
+        are written to the delta file in the format of the processed file. Deleted rows are the
+        snapshot keys that are missing from the file.
+
+        :param processed_file: The processed file about to be loaded.
+        :type processed_file: str
+        :param client_id: The client of the report.
+        :type client_id: int
+        :param report_name: The report, e.g. its base table.
+        :type report_name: str
+        :param merge_keys: The business key of the report.
+        :type merge_keys: list[str]
+        :returns: The delta.
+        :rtype: ReportDelta
+
+        :raises ValueError: If the business key is missing, null or duplicated in the file.
+        """
+        current = scan_processed(processed_file)
+        columns = current.collect_schema().names()
+        by_lower = {col.lower(): col for col in columns}
+        missing = [key for key in merge_keys if key.lower() not in by_lower]
+        if missing:
+            raise ValueError(f"Merge key columns {missing} are missing from '{processed_file}'.")
+        keys = [by_lower[key.lower()] for key in merge_keys]
+        skipped = {col.lower() for col in (*keys, *IGNORED_COLUMNS)}
+        hashed = current.with_columns(row_hash_expr([col for col in columns if col.lower() not in skipped]))
+
+        snapshot = hashed.select(*keys, ROW_HASH_COLUMN).collect(engine="streaming")
+        duplicates, nulls = snapshot.select(
+            pl.struct(keys).is_duplicated().sum().alias("duplicates"),
+            pl.any_horizontal(pl.col(keys).is_null()).sum().alias("nulls"),
+        ).row(0)
+        if duplicates or nulls:
+            raise ValueError(
+                f"Merge key ({', '.join(keys)}) of '{processed_file}' is not usable: "
+                f"{duplicates} rows with duplicated keys, {nulls} rows with null keys."
+            )
+
+        snapshot_file = self.snapshot_file(client_id, report_name)
+        previous = self._previous(snapshot_file, snapshot.schema)
+        if previous is None:
+            return ReportDelta(processed_file, processed_file, None, snapshot, snapshot_file,
+                               inserted=snapshot.height, updated=0, deleted=0, unchanged=0)
+
+        changed = snapshot.join(previous, on=[*keys, ROW_HASH_COLUMN], how="anti")
+        inserted = changed.join(previous, on=keys, how="anti").height
+        deleted_keys = previous.join(snapshot, on=keys, how="anti").select(keys)
+
+        upsert_file = self.delta_file(processed_file)
+        os.makedirs(os.path.dirname(upsert_file), exist_ok=True)
+        upsert = hashed.join(changed.lazy().select(keys), on=keys, how="semi").drop(ROW_HASH_COLUMN)
+        pl.collect_all([sink_processed(upsert, upsert_file)], engine="streaming")
+
+        delta = ReportDelta(processed_file, upsert_file, deleted_keys, snapshot, snapshot_file,
+                            inserted=inserted, updated=changed.height - inserted, deleted=deleted_keys.height,
+                            unchanged=snapshot.height - changed.height)
+        logging.info("Delta of '%s' against its snapshot: %s", processed_file, delta.counts())
+        return delta
+
+    def commit(self, delta: ReportDelta) -> None:
+        """
+        Saves the snapshot of a loaded delta, replacing the previous one, and removes the delta file.
+
+        :param delta: The delta that was loaded.
+        :type delta: ReportDelta
+        :returns: None
+        """
+        os.makedirs(os.path.dirname(delta.snapshot_file), exist_ok=True)
+        tmp_file = f"{delta.snapshot_file}.{os.getpid()}.tmp"
+        delta.snapshot.write_parquet(tmp_file, compression="zstd")
+        os.replace(tmp_file, delta.snapshot_file)
+        self.discard(delta)
+
+    def discard(self, delta: ReportDelta) -> None:
+        if delta.upsert_file != delta.processed_file and os.path.exists(delta.upsert_file):
+            os.remove(delta.upsert_file)
+
+    def forget(self, client_id: int, report_name: str) -> None:
+        snapshot_file = self.snapshot_file(client_id, report_name)
+        if os.path.exists(snapshot_file):
+            os.remove(snapshot_file)
@@ -0,0 +1,193 @@
+"""
+ETL Status Writer
+
+This module contains the EtlStatusWriter class, which buffers ETL status events for the
+``data_uploads_status`` table in memory and writes them to the database in batches from a
+background thread, so status bookkeeping never blocks the Selenium session.
+
+:module: status_writer.py
+:platform: Unix, Windows
+:synopsis: Buffered, batched writer for ETL status rows.
+"""
+
+import atexit
+import logging
+import threading
+
+from utils.pyodbc_sql import PyODBCSQL
+
+
+class EtlStatusWriter:
+    """
+    Queues ETL status events and flushes them to the status table in batches.
+
+    Events for the same ``etl_id`` are coalesced, so a start immediately followed by a success is
+    written as a single row. Pending events are flushed when ``batch_size`` ETL ids are waiting,
+    every ``flush_interval`` seconds, and on :meth:`close` (also registered with ``atexit``).
+
+    Methods:
+        log_etl_start(self, etl_log_id, client_id, report_name, date_updated):
+            Queues the start of an ETL process.
+        log_etl_success(self, etl_log_id, date_updated):
+            Queues the successful completion of an ETL process.
+        log_etl_unchanged(self, etl_log_id, date_updated):
+            Queues an ETL process skipped because its data did not change.
+        log_etl_failure(self, etl_log_id, date_updated, error_msg):
+            Queues a failed ETL process along with the error message.
+        flush(self):
+            Writes all pending events to the database.
+        close(self):
+            Stops the background thread and flushes the remaining events.
+    """
+
+    def __init__(self, sql: PyODBCSQL, table_name: str, batch_size: int = 50, flush_interval: float = 5.0) -> None:
+        """
+        Initializes the EtlStatusWriter class.
+
+        :param sql: The database wrapper used to write the status rows.
+        :type sql: PyODBCSQL
+        :param table_name: Name of the ETL log table in the database.
+        :type table_name: str
+        :param batch_size: Number of pending ETL ids that triggers an immediate flush.
+        :type batch_size: int
+        :param flush_interval: Maximum number of seconds an event waits before being written.
+        :type flush_interval: float
+        :returns: None
+        """
+        self.sql = sql
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="EtlStatusWriter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _enqueue(self, etl_log_id: str, **fields) -> None:
+        """
+        Merges an event into the pending row of its ETL id.
+        """
+        with self._lock:
+            row = self._pending.setdefault(etl_log_id, {"client_id": None, "report_name": None, "error_msg": None})
+            row.update(fields)
+            pending = len(self._pending)
+
+        if self._closed:
+            self.flush()
+        elif pending >= self.batch_size:
+            self._wake.set()
+
+    def log_etl_start(self, etl_log_id: str, client_id, report_name: str, date_updated: str) -> None:
+        """
+        Queues the start of an ETL process for a given report.
+
+        :param etl_log_id: Unique identifier for the ETL process.
+        :type etl_log_id: str
+        :param client_id: Identifier for the client associated with this ETL run.
+        :type client_id: str
+        :param report_name: Name of the report being processed.
+        :type report_name: str
+        :param date_updated: Timestamp string when the ETL process started.
+        :type date_updated: str
+        :returns: None
+        """
+        self._enqueue(etl_log_id, client_id=str(client_id), report_name=report_name, status="IN_PROGRESS", date_updated=date_updated)
+
+    def log_etl_success(self, etl_log_id: str, date_updated: str) -> None:
+        """
+        Queues the successful completion of an ETL process.
+
+        :param etl_log_id: Unique identifier for the ETL process.
+        :type etl_log_id: str
+        :param date_updated: Timestamp string when the ETL process finished successfully.
+        :type date_updated: str
+        :returns: None
+        """
+        self._enqueue(etl_log_id, status="SUCCESS", date_updated=date_updated, error_msg=None)
+
+    def log_etl_unchanged(self, etl_log_id: str, date_updated: str) -> None:
+        """
+        Queues an ETL process that was skipped because the downloaded data was identical to the last load.
+
+        :param etl_log_id: Unique identifier for the ETL process.
+        :type etl_log_id: str
+        :param date_updated: Timestamp string when the ETL process finished.
+        :type date_updated: str
+        :returns: None
+        """
+        self._enqueue(etl_log_id, status="UNCHANGED", date_updated=date_updated, error_msg=None)
+
+    def log_etl_failure(self, etl_log_id: str, date_updated: str, error_msg) -> None:
+        """
+        Queues a failed ETL process along with the error message.
+
+        :param etl_log_id: Unique identifier for the ETL process.
+        :type etl_log_id: str
+        :param date_updated: Timestamp string when the ETL process failed.
+        :type date_updated: str
+        :param error_msg: Error message (or exception) describing the failure reason.
+        :type error_msg: str | Exception
+        :returns: None
+        """
+        self._enqueue(etl_log_id, status="FAILED", date_updated=date_updated, error_msg=str(error_msg))
+
+    def flush(self) -> None:
+        """
+        Writes all pending events to the database.
+
+        If the write fails the events are put back in the queue, without overwriting newer events
+        that arrived in the meantime, and retried on the next flush.
+
+        :returns: None
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+
+            rows = [
+                (etl_id, row["client_id"], row["report_name"], row["status"], row["date_updated"], row["error_msg"])
+                for etl_id, row in batch.items()
+            ]
+            try:
+                self.sql.upsert_etl_status(self.table_name, rows)
+                logging.info("Wrote %d ETL status rows to '%s'.", len(rows), self.table_name)
+            except Exception as e:
+                logging.error("Failed to write %d ETL status rows to '%s': %s", len(rows), self.table_name, e)
+                with self._lock:
+                    for etl_id, row in batch.items():
+                        newer = self._pending.get(etl_id)
+                        if newer is None:
+                            self._pending[etl_id] = row
+                            continue
+                        for key in ("client_id", "report_name"):
+                            if newer[key] is None:
+                                newer[key] = row[key]
+
+    def _run(self) -> None:
+        """
+        Background loop flushing on interval, or earlier when the batch size is reached.
+        """
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self) -> None:
+        """
+        Stops the background thread and flushes the remaining events.
+
+        Events queued after closing are written immediately.
+
+        :returns: None
+        """
+        if not self._closed:
+            self._closed = True
+            self._wake.set()
+            self._thread.join(timeout=self.flush_interval + 30)
+        self.flush()
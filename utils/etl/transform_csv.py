@@ -1,32 +1,211 @@
 import os
+import glob
+import time
 import logging
 import polars as pl
 
+from utils.etl.schema_cache import column_mapper
+from utils.etl.transform_specs import TransformSpec, currency_expr, currency_reject_expr, get_spec
+from utils.etl.date_normalizer import DateNormalizer, CSV_DATE_FORMAT, CSV_DATETIME_FORMAT, parse_expr, reject_expr
+
+# Engine used by sink_csv / sink_parquet. The streaming engine processes the scan in batches, so
+# multi-year extracts are transformed in bounded memory.
+SINK_ENGINE = "streaming"
+
+# Characters removed from every text column before the processed file is written
+SANITIZE_PATTERN = r"[,']"
+
+# Raw files larger than this are transformed in row batches (see TransformCSV.transform_chunked),
+# each batch sized to stay under the memory limit of the transformer.
+CHUNK_THRESHOLD_BYTES = 512 * 1024 * 1024
+CHUNK_MEMORY_LIMIT = 1024 * 1024 * 1024
+# A batch takes about this many times its CSV size in memory: the raw batch, the transformed copy
+# and the Arrow buffers.
+CHUNK_MEMORY_FACTOR = 4
+CHUNK_SAMPLE_BYTES = 1024 * 1024
+MIN_CHUNK_ROWS = 10000
+
+SCANNERS = {".parquet": pl.scan_parquet, ".arrow": pl.scan_ipc, ".ipc": pl.scan_ipc}
+
+
+def combine_csv(sources: str | list[str], output_file: str) -> int:
+    """
+    Streams several CSV files into a single file.
+
+    Every file is scanned lazily with all columns read as text and the scans are concatenated
+    diagonally, so files whose columns differ or are ordered differently (e.g. months of a report
+    before and after Experity added a column) combine with nulls for the missing columns. The
+    result is sunk with the streaming engine, as Parquet or Arrow IPC if ``output_file`` has that
+    extension and as CSV otherwise, so each input byte is read once and memory stays constant.
+
+    :param sources: A glob pattern or a list of CSV file paths.
+    :type sources: str | list[str]
+    :param output_file: Path where the combined file will be saved.
+    :type output_file: str
+    :returns: The number of files combined.
+    :rtype: int
+
+    :raises FileNotFoundError: If no CSV files match.
+    """
+    files = sorted(glob.glob(sources)) if isinstance(sources, str) else list(sources)
+    if not files:
+        raise FileNotFoundError("No matching CSV files found.")
+
+    frame = pl.concat([pl.scan_csv(file, infer_schema=False) for file in files], how="diagonal")
+    extension = os.path.splitext(output_file)[1].lower()
+    if extension == ".parquet":
+        frame.sink_parquet(output_file, engine=SINK_ENGINE)
+    elif extension in (".arrow", ".ipc"):
+        frame.sink_ipc(output_file, engine=SINK_ENGINE)
+    else:
+        frame.sink_csv(output_file, engine=SINK_ENGINE)
+    logging.info(f"Combined {len(files)} CSV files into {output_file}.")
+    return len(files)
+
+
+def combine_csv_files(folder_path: str, output_file: str, start_with: str = None) -> int:
+    """
+    Combines the CSV files of a folder, optionally only those starting with a prefix, with
+    :func:`combine_csv`. Files are combined in name order.
+
+    :param folder_path: Path to the folder containing CSV files.
+    :type folder_path: str
+    :param output_file: Path where the combined file will be saved.
+    :type output_file: str
+    :param start_with: If provided, only files that start with this prefix will be combined.
+    :type start_with: str, optional
+    :returns: The number of files combined.
+    :rtype: int
+
+    :raises FileNotFoundError: If no matching CSV files are found in the folder.
+    """
+    files = sorted(
+        os.path.join(folder_path, f) for f in os.listdir(folder_path)
+        if f.endswith('.csv') and (start_with is None or f.startswith(start_with))
+    )
+    return combine_csv(files, output_file)
+
+
 class TransformCSV:
-    def __init__(self, client_id: int, date_time_stamp: str) -> None:
+    def __init__(self, client_id: int, date_time_stamp: str, chunk_threshold: int | None = CHUNK_THRESHOLD_BYTES,
+                 memory_limit: int = CHUNK_MEMORY_LIMIT, date_formats_file: str = None) -> None:
+        """
+        :param client_id: The client whose reports are transformed.
+        :type client_id: int
+        :param date_time_stamp: The ``Date_Updated`` stamp of the run.
+        :type date_time_stamp: str
+        :param chunk_threshold: Raw files larger than this many bytes are transformed in row batches, None never does.
+        :type chunk_threshold: int | None
+        :param memory_limit: Approximate bytes a row batch may use.
+        :type memory_limit: int
+        :param date_formats_file: Optional JSON file keeping the detected date formats between runs.
+        :type date_formats_file: str, optional
+        """
         self.client_id = client_id
         self.date_stamp = date_time_stamp.split()[0]
         self.time_stamp = date_time_stamp.split()[1]
         self.date_time_stamp = date_time_stamp
+        self.chunk_threshold = chunk_threshold
+        self.memory_limit = memory_limit
+        self.dates = DateNormalizer(persist_path=date_formats_file)
+
+    def read_frame(self, file_path: str, columns: list[str] = None) -> pl.LazyFrame:
+        """
+        Lazily scans a raw report CSV with every column read as text.
+
+        Nothing is read until the plan is sunk by :meth:`write_frame`; columns that do not reach
+        the table are pruned from the scan by projection pushdown.
+
+        :param file_path: Path to the input CSV file.
+        :type file_path: str
+        :param columns: If provided, only these columns are read.
+        :type columns: list[str], optional
+        :returns: The LazyFrame of the raw report.
+        :rtype: pl.LazyFrame
+        """
+        frame = pl.scan_csv(file_path, infer_schema=False)
+        if columns:
+            frame = frame.select(columns)
+        return frame
+
+    def write_frame(self, frame: pl.DataFrame | pl.LazyFrame, processed_file: str, rejects: pl.LazyFrame = None) -> None:
+        """
+        Writes a transformed frame to the processed file, using the streaming engine. The format
+        follows the file extension: ``.parquet`` and ``.arrow``/``.ipc`` files are written as
+        zstd-compressed Parquet and Arrow IPC, which keep the column types; anything else as CSV.
 
-    def clean_currency_column(self, df: pl.DataFrame, column_names: str | list[str], decimals: int = 2) -> pl.DataFrame:
+        If ``rejects`` is given it is evaluated in the same run as the processed file, sharing the
+        scan, and any rejected values are written to the ``Quarantine`` folder next to it.
+
+        :param frame: The transformed DataFrame or LazyFrame.
+        :type frame: pl.DataFrame | pl.LazyFrame
+        :param processed_file: Path to save the processed file.
+        :type processed_file: str
+        :param rejects: The quarantine built by :meth:`currency_rejects`.
+        :type rejects: pl.LazyFrame, optional
+        :returns: None
+        """
+        frame = frame.lazy()
+        extension = os.path.splitext(processed_file)[1].lower()
+        if extension == ".parquet":
+            sink = frame.sink_parquet(processed_file, compression="zstd", lazy=True)
+        elif extension in (".arrow", ".ipc"):
+            sink = frame.sink_ipc(processed_file, compression="zstd", lazy=True)
+        else:
+            sink = frame.sink_csv(processed_file, date_format=CSV_DATE_FORMAT, datetime_format=CSV_DATETIME_FORMAT, lazy=True)
+        if rejects is None:
+            pl.collect_all([sink], engine=SINK_ENGINE)
+            return
+
+        _, rejected = pl.collect_all([sink, rejects], engine=SINK_ENGINE)
+        self.write_rejects(rejected, processed_file)
+
+    def write_rejects(self, rejected: pl.DataFrame, processed_file: str) -> None:
+        """
+        Writes the rejected currency and date values of a processed file to its quarantine, if there are any.
+
+        :param rejected: The collected :meth:`currency_rejects` and :meth:`normalize_dates` rejects.
+        :type rejected: pl.DataFrame
+        :param processed_file: Path of the processed file.
+        :type processed_file: str
+        :returns: None
+        """
+        if rejected.height:
+            quarantine_file = self.quarantine_file(processed_file)
+            os.makedirs(os.path.dirname(quarantine_file), exist_ok=True)
+            rejected.write_csv(quarantine_file)
+            logging.warning(f"{rejected.height} currency or date values could not be parsed, loaded as NULL and quarantined in {quarantine_file}")
+
+    def quarantine_file(self, processed_file: str) -> str:
+        """
+        :param processed_file: Path of the processed file.
+        :type processed_file: str
+        :returns: Path of the quarantine CSV of the processed file.
+        :rtype: str
+        """
+        folder, name = os.path.split(processed_file)
+        return os.path.join(folder, "Quarantine", f"{os.path.splitext(name)[0]}_{self.client_id}.csv")
+
+    def clean_currency_column(self, df: pl.DataFrame | pl.LazyFrame, column_names: str | list[str], decimals: int = 2) -> pl.DataFrame | pl.LazyFrame:
         """
         Cleans and converts currency columns in a Polars DataFrame to numeric values.
 
-        This function performs the following transformations:
+        This function performs the following transformations, on all columns in one pass:
             1. Strips leading and trailing whitespace.
             2. Removes dollar signs (``$``) and commas (`,``).
             3. Converts values enclosed in parentheses (e.g., ``(123.45)``) to negative numbers (``-123.45``).
-            4. Casts the column to ``Float64`` and rounds to the specified number of decimal places.
+            4. Casts the column to ``Decimal(18, decimals)``; values that cannot be parsed become null.
 
-        :param df: The Polars DataFrame containing the currency columns.
-        :type df: pl.DataFrame
+        Use :meth:`currency_rejects` on the uncleaned frame to capture the values that were nulled.
+
+        :param df: The Polars DataFrame or LazyFrame containing the currency columns.
+        :type df: pl.DataFrame | pl.LazyFrame
         :param column_names: The name(s) of the column(s) to clean. Can be a single column name (string) or a list of column names.
         :type column_names: str | list[str]
-        :param decimals: The number of decimal places to round the cleaned values. Defaults to 2.
+        :param decimals: The number of decimal places kept. Defaults to 2.
         :type decimals: int, optional
-        :returns: A new DataFrame with cleaned currency columns.
-        :rtype: pl.DataFrame
+        :returns: A new DataFrame or LazyFrame with cleaned currency columns.
+        :rtype: pl.DataFrame | pl.LazyFrame
         """
         logging.info("Starting currency column cleaning...")
 
@@ -34,17 +213,8 @@ class TransformCSV:
             column_names = [column_names]
 
         try:
-            for column in column_names:
-                logging.info(f"Cleaning column: {column}")
-                df = df.with_columns(
-                    pl.col(column)
-                    .str.strip_chars()
-                    .str.replace_all(r"[\$,]", "")
-                    .str.replace_all(r"^\((.*)\)$", r"-$1")
-                    .cast(pl.Float64)
-                    .round(decimals)
-                    .alias(column)
-                )
+            logging.info(f"Cleaning columns: {column_names}")
+            df = df.with_columns([currency_expr(column, decimals) for column in column_names])
             logging.info("Currency column cleaning completed successfully.")
         except Exception as e:
             logging.error("An error occurred while cleaning currency columns.")
@@ -52,17 +222,84 @@ class TransformCSV:
 
         return df
 
-    def add_client_id_date_updated_columns(self, df: pl.DataFrame) -> pl.DataFrame:
+    def currency_rejects(self, df: pl.DataFrame | pl.LazyFrame, column_names: str | list[str], decimals: int = 2,
+                         row_offset: int = 0) -> pl.LazyFrame:
+        """
+        Builds the quarantine of a report: the raw values of its currency columns that cannot be
+        parsed, one row per value with its ``Column``, data ``Row_Num`` and ``Raw_Value``.
+
+        :param df: The frame before :meth:`clean_currency_column`.
+        :type df: pl.DataFrame | pl.LazyFrame
+        :param column_names: The currency column(s).
+        :type column_names: str | list[str]
+        :param decimals: The number of decimal places kept. Defaults to 2.
+        :type decimals: int, optional
+        :param row_offset: The ``Row_Num`` of the first row, when ``df`` is a chunk of the report.
+        :type row_offset: int, optional
+        :returns: The LazyFrame of rejected values, meant for :meth:`write_frame`.
+        :rtype: pl.LazyFrame
+        """
+        if isinstance(column_names, str):
+            column_names = [column_names]
+        return self.value_rejects(df, {column: currency_reject_expr(column, decimals) for column in column_names}, row_offset)
+
+    def value_rejects(self, df: pl.DataFrame | pl.LazyFrame, reject_exprs: dict[str, pl.Expr], row_offset: int = 0) -> pl.LazyFrame:
+        """
+        Builds a quarantine frame, one row per rejected value with its ``Column``, data ``Row_Num``
+        and ``Raw_Value``.
+
+        :param df: The frame holding the raw values.
+        :type df: pl.DataFrame | pl.LazyFrame
+        :param reject_exprs: Column to the boolean expression flagging its rejected values.
+        :type reject_exprs: dict[str, pl.Expr]
+        :param row_offset: The ``Row_Num`` of the first row.
+        :type row_offset: int, optional
+        :returns: The LazyFrame of rejected values.
+        :rtype: pl.LazyFrame
+        """
+        numbered = df.lazy().with_row_index("Row_Num", offset=row_offset)
+        return pl.concat([
+            numbered.filter(expr).select(
+                pl.lit(column).alias("Column"), pl.col("Row_Num"), pl.col(column).alias("Raw_Value")
+            )
+            for column, expr in reject_exprs.items()
+        ])
+
+    def normalize_dates(self, report: str, df: pl.DataFrame | pl.LazyFrame, columns: list[str],
+                        row_offset: int = 0) -> tuple[pl.LazyFrame, pl.LazyFrame | None]:
+        """
+        Parses the date columns of a report into ``Date`` or ``Datetime`` columns, in the format
+        the :class:`DateNormalizer` detected for the report and column.
+
+        :param report: The report key, e.g. ``"pay_10"``.
+        :type report: str
+        :param df: The raw report, after its columns are renamed.
+        :type df: pl.DataFrame | pl.LazyFrame
+        :param columns: The date columns of the report.
+        :type columns: list[str]
+        :param row_offset: The ``Row_Num`` of the first row in the quarantine, for chunks.
+        :type row_offset: int, optional
+        :returns: The frame with parsed dates, and the values that did not match their format,
+            None if the frame has none of the date columns.
+        :rtype: tuple[pl.LazyFrame, pl.LazyFrame | None]
+        """
+        formats = self.dates.formats(report, df, columns)
+        if not formats:
+            return df.lazy(), None
+        rejects = self.value_rejects(df, {col: reject_expr(col, *fmt) for col, fmt in formats.items()}, row_offset)
+        return df.lazy().with_columns([parse_expr(col, *fmt) for col, fmt in formats.items()]), rejects
+
+    def add_client_id_date_updated_columns(self, df: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
         """
         Add 'Client_ID' and 'Date_Updated' columns to the DataFrame.
 
-        :param df: Input DataFrame.
-        :type df: pl.DataFrame
-        :returns: Updated DataFrame with the new columns.
-        :rtype: pl.DataFrame
+        :param df: Input DataFrame or LazyFrame.
+        :type df: pl.DataFrame | pl.LazyFrame
+        :returns: Updated frame with the new columns.
+        :rtype: pl.DataFrame | pl.LazyFrame
 
         """
-        if "Client_ID" not in df.columns:
+        if "Client_ID" not in df.collect_schema().names():
             df = df.with_columns([
                 pl.lit(self.client_id).alias("Client_ID"),
                 pl.lit(self.date_stamp).alias("Date_Updated")
@@ -90,32 +327,22 @@ class TransformCSV:
 
         return frame.filter(~pl.all_horizontal(pl.all().is_null()))
 
-    def sync_dataframe_with_table(self, table_columns: list[tuple[str]], df: pl.DataFrame) -> pl.DataFrame:
+    def sync_dataframe_with_table(self, table_columns: list[tuple[str]], df: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
         """
         Aligns a Polars DataFrame with a database table by ensuring it has the same columns.
         Any extra columns in the DataFrame are removed, and missing columns are added with NULL values.
+        On a LazyFrame the final select also lets the scan skip the columns the table does not have.
 
         :param table_columns: The column names of the database table.
         :type table_columns: list[tuple[str]]
-        :param df: The Polars DataFrame to align.
-        :type df: pl.DataFrame
-        :returns: A modified DataFrame that matches the database table schema.
-        :rtype: pl.DataFrame
+        :param df: The Polars DataFrame or LazyFrame to align.
+        :type df: pl.DataFrame | pl.LazyFrame
+        :returns: A modified frame that matches the database table schema.
+        :rtype: pl.DataFrame | pl.LazyFrame
         """
         try:
-            df = self.remove_commas_apos_from_df(df)            
-            table_columns_lower = {col.lower(): col for sublist in table_columns for col in sublist}
-            df_columns_lower = {col.lower(): col for col in df.columns}
-
-            missing_columns = set(table_columns_lower.keys()) - set(df_columns_lower.keys())
-
-            for col_lower in missing_columns:
-                df = df.with_columns(pl.lit(None).alias(table_columns_lower[col_lower]))
-
-            df = df.rename({df_columns_lower[col_lower]: table_columns_lower[col_lower] for col_lower in df_columns_lower if col_lower in table_columns_lower})
-
-            flat_table_columns = [col for sublist in table_columns for col in sublist]
-            df = df.select(flat_table_columns)
+            df = self.remove_commas_apos_from_df(df)
+            df = column_mapper(table_columns).apply(df)
 
             logging.info("Aligned DataFrame to match database table and dataframe columns")
             return df
@@ -124,26 +351,26 @@ class TransformCSV:
             logging.error(f"Error while aligning DataFrame with database table: {e}")
             raise
 
-    def drop_textbox_columns(self, df: pl.DataFrame, skip_columns: list[str] = []) -> pl.DataFrame:
+    def drop_textbox_columns(self, df: pl.DataFrame | pl.LazyFrame, skip_columns: list[str] = []) -> pl.DataFrame | pl.LazyFrame:
         """
         Drop the columns which start with textbox or Textbox.
 
-        :param df: Input DataFrame.
-        :type df: pl.DataFrame
-        :returns: DataFrame with text columns dropped.
-        :rtype: pl.DataFrame
+        :param df: Input DataFrame or LazyFrame.
+        :type df: pl.DataFrame | pl.LazyFrame
+        :returns: Frame with text columns dropped.
+        :rtype: pl.DataFrame | pl.LazyFrame
         """
         return df.drop(
-            [col for col in df.columns if col.lower().startswith("textbox") and col not in skip_columns]
+            [col for col in df.collect_schema().names() if col.lower().startswith("textbox") and col not in skip_columns]
         )
     
     def combine_csv_files(self, folder_path: str, output_file: str, start_with: str = None) -> None:
         """
-        Combines multiple CSV files in a given folder into a single CSV file.
+        Combines multiple CSV files in a given folder into a single file, see :func:`combine_csv_files`.
 
         :param folder_path: Path to the folder containing CSV files.
         :type folder_path: str
-        :param output_file: Path where the combined CSV file will be saved.
+        :param output_file: Path where the combined file will be saved.
         :type output_file: str
         :param start_with: If provided, only files that start with this prefix will be combined.
         :type start_with: str, optional
@@ -152,30 +379,196 @@ class TransformCSV:
         :raises FileNotFoundError: If no matching CSV files are found in the folder.
 
         """
-        all_files = [
-            os.path.join(folder_path, f) for f in os.listdir(folder_path)
-            if f.endswith('.csv') and (start_with is None or f.startswith(start_with))
-        ]
-        
-        if not all_files:
-            raise FileNotFoundError("No matching CSV files found.")
-        
-        df_list = [
-            pl.read_csv(file, infer_schema_length=0).with_columns([pl.col(col).cast(pl.Utf8) for col in pl.read_csv(file, n_rows=1, infer_schema_length=0).columns])
-            for file in all_files
-        ]
-        combined_df = pl.concat(df_list)
-        combined_df.write_csv(output_file)
-        
-        logging.info(f" Combined {len(all_files)} CSV files.")
-
-    def remove_commas_apos_from_df(self, df: pl.DataFrame) -> pl.DataFrame:
-        def remove_commas_apos(series: pl.Series) -> pl.Series:
-            if series.dtype in [pl.Date, pl.Datetime, pl.Boolean]:
-                return series # Skip modification for these types
-            return series.cast(pl.Utf8).str.replace_all(",", "").str.replace_all("'", "").cast(series.dtype, strict=False)
-        return df.with_columns([remove_commas_apos(df[col]).alias(col) for col in df.columns])
-        
+        combine_csv_files(folder_path, output_file, start_with)
+
+    def remove_commas_apos_from_df(self, df: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
+        """
+        Removes commas and apostrophes from the text columns, which would otherwise break the
+        comma separated bulk load.
+
+        Only string columns are touched, with a single regex per column; numeric, date and null
+        columns cannot contain either character and are left as they are.
+
+        :param df: Input DataFrame or LazyFrame.
+        :type df: pl.DataFrame | pl.LazyFrame
+        :returns: Frame with the characters removed from its text columns.
+        :rtype: pl.DataFrame | pl.LazyFrame
+        """
+        return df.with_columns(pl.col(pl.Utf8).str.replace_all(SANITIZE_PATTERN, ""))
+
+    def transform(self, report: str, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> None:
+        """
+        Transforms a report described by a :class:`TransformSpec` of ``TRANSFORM_SPECS``.
+
+        The spec's column steps are compiled once per report and applied in a single
+        ``with_columns`` of the lazy plan, which is then sunk to the processed file. Raw files
+        above ``chunk_threshold`` are transformed in row batches by :meth:`transform_chunked`.
+
+        :param report: The report key, e.g. ``"cnt_27"``.
+        :type report: str
+        :param file_path: Path to the input CSV file.
+        :type file_path: str
+        :param processed_file: Path to save the processed file.
+        :type processed_file: str
+        :param table_columns: The column names of the specified table.
+        :type table_columns: list[tuple[str]]
+        :returns: None, or the stats of each batch of a chunked transformation.
+
+        :raises KeyError: If no spec is registered for the report.
+        """
+        spec = get_spec(report)
+        if self.chunk_threshold is not None and os.path.getsize(file_path) > self.chunk_threshold:
+            return self.transform_chunked(report, file_path, processed_file, table_columns)
+        try:
+            logging.info(f"{report} data transformation process started.")
+            df, rejects = self.apply_spec(spec, self.read_frame(file_path, spec.columns), table_columns)
+            self.write_frame(df, processed_file, rejects)
+            logging.info(f"{report} data transformation process completed.")
+        except Exception as e:
+            logging.error(f"Error occurred during {report} data transformation.")
+            raise
+
+    def apply_spec(self, spec: TransformSpec, df: pl.DataFrame | pl.LazyFrame, table_columns: list[tuple[str]],
+                   row_offset: int = 0) -> tuple[pl.LazyFrame, pl.LazyFrame | None]:
+        """
+        Builds the lazy plan of a spec over a raw frame.
+
+        :param spec: The report spec.
+        :type spec: TransformSpec
+        :param df: The raw report, or a chunk of it.
+        :type df: pl.DataFrame | pl.LazyFrame
+        :param table_columns: The column names of the specified table.
+        :type table_columns: list[tuple[str]]
+        :param row_offset: The ``Row_Num`` of the first row in the quarantine, for chunks.
+        :type row_offset: int
+        :returns: The transformed frame and its currency and date rejects, None if it has neither.
+        :rtype: tuple[pl.LazyFrame, pl.LazyFrame | None]
+        """
+        column_exprs, fill_null_exprs = spec.compile()
+        df = df.lazy()
+        if spec.drop_textbox_first:
+            df = self.drop_textbox_columns(df, spec.keep_textbox)
+        df = self.drop_all_null_rows(df)
+        if spec.drop_textbox and not spec.drop_textbox_first:
+            df = self.drop_textbox_columns(df, spec.keep_textbox)
+        if spec.rename:
+            df = df.rename(spec.rename)
+        rejects = [self.currency_rejects(df, spec.currency, row_offset=row_offset)] if spec.currency else []
+        df, date_rejects = self.normalize_dates(spec.report, df, spec.dates, row_offset)
+        if date_rejects is not None:
+            rejects.append(date_rejects)
+        rejects = pl.concat(rejects) if rejects else None
+        if column_exprs:
+            df = df.with_columns(column_exprs)
+        df = self.add_client_id_date_updated_columns(df)
+        df = self.sync_dataframe_with_table(table_columns, df)
+        if fill_null_exprs:
+            df = df.with_columns(fill_null_exprs)
+        return df, rejects
+
+    def chunk_rows(self, file_path: str) -> int:
+        """
+        Sizes the row batches of :meth:`transform_chunked` so that a batch stays under the memory
+        limit, from the average row width of the start of the file.
+
+        :param file_path: Path to the input CSV file.
+        :type file_path: str
+        :returns: The number of rows per batch.
+        :rtype: int
+        """
+        with open(file_path, "rb") as f:
+            sample = f.read(CHUNK_SAMPLE_BYTES)
+        row_bytes = max(1, len(sample) // max(1, sample.count(b"\n")))
+        return max(MIN_CHUNK_ROWS, int(self.memory_limit // (row_bytes * CHUNK_MEMORY_FACTOR)))
+
+    def transform_chunked(self, report: str, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> list[dict]:
+        """
+        Transforms a large report described by a :class:`TransformSpec` in row batches.
+
+        The raw CSV is read in batches sized by :meth:`chunk_rows`, each batch runs through the same
+        plan as :meth:`transform` and is written out before the next one is read, so memory is
+        bounded by the batch size instead of the file size. CSV output is appended to the processed
+        file; Parquet and Arrow IPC batches are written as parts and streamed into the processed
+        file at the end. Currency rejects of all batches are quarantined together.
+
+        :param report: The report key, e.g. ``"pat_20"``.
+        :type report: str
+        :param file_path: Path to the input CSV file.
+        :type file_path: str
+        :param processed_file: Path to save the processed file.
+        :type processed_file: str
+        :param table_columns: The column names of the specified table.
+        :type table_columns: list[tuple[str]]
+        :returns: The stats of each batch: ``chunk``, ``rows_read``, ``rows_written``, ``rejects``, ``mb`` and ``seconds``.
+        :rtype: list[dict]
+
+        :raises KeyError: If no spec is registered for the report.
+        """
+        spec = get_spec(report)
+        batch_rows = self.chunk_rows(file_path)
+        # Detect the date formats from the start of the file, so every chunk is checked against the same formats
+        scan = self.read_frame(file_path, spec.columns)
+        self.dates.formats(report, scan.rename(spec.rename) if spec.rename else scan, spec.dates)
+        logging.info(f"{report} chunked transformation started, {batch_rows} rows per chunk.")
+        extension = os.path.splitext(processed_file)[1].lower()
+        columnar = extension in (".parquet", ".arrow", ".ipc")
+        parts_dir = os.path.join(os.path.dirname(processed_file), "Chunks")
+        parts, stats, rejected = [], [], []
+        written = 0
+        try:
+            reader = pl.read_csv_batched(file_path, infer_schema_length=0, columns=spec.columns, batch_size=batch_rows)
+            while True:
+                batches = reader.next_batches(1)
+                if not batches:
+                    break
+                start = time.perf_counter()
+                batch = batches[0]
+                df, rejects = self.apply_spec(spec, batch, table_columns, row_offset=written)
+                if rejects is None:
+                    df = df.collect()
+                else:
+                    df, rejects = pl.collect_all([df, rejects])
+                    rejected.append(rejects)
+
+                if columnar:
+                    os.makedirs(parts_dir, exist_ok=True)
+                    part = os.path.join(parts_dir, f"{os.path.basename(processed_file)}.{len(parts)}{extension}")
+                    self.write_frame(df, part)
+                    parts.append(part)
+                else:
+                    with open(processed_file, "wb" if not stats else "ab") as f:
+                        df.write_csv(f, include_header=not stats, date_format=CSV_DATE_FORMAT,
+                                     datetime_format=CSV_DATETIME_FORMAT)
+
+                written += df.height
+                stats.append({
+                    "chunk": len(stats), "rows_read": batch.height, "rows_written": df.height,
+                    "rejects": rejects.height if rejects is not None else 0,
+                    "mb": round(batch.estimated_size("mb") + df.estimated_size("mb"), 1),
+                    "seconds": round(time.perf_counter() - start, 3),
+                })
+                logging.info(f"{report} chunk {stats[-1]}")
+                del batch, df
+
+            if not stats:
+                # No data rows, write the empty processed file with the table's columns
+                df, _ = self.apply_spec(spec, self.read_frame(file_path, spec.columns), table_columns)
+                self.write_frame(df, processed_file)
+            elif columnar:
+                self.write_frame(pl.concat([SCANNERS[extension](part) for part in parts]), processed_file)
+            if rejected:
+                self.write_rejects(pl.concat(rejected), processed_file)
+            logging.info(f"{report} chunked transformation completed: {len(stats)} chunks, {written} rows.")
+            return stats
+        except Exception as e:
+            logging.error(f"Error occurred during {report} chunked data transformation.")
+            raise
+        finally:
+            for part in parts:
+                if os.path.exists(part):
+                    os.remove(part)
+            if parts and not os.listdir(parts_dir):
+                os.rmdir(parts_dir)
 
     def cnt_27(self, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -189,25 +582,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        columns_to_rename = {
-            "Svc_Date": "Service_Date",
-            "Status_Name": "Status",
-            "ArrivalStatus": "Arrival_Status",
-            "Class": "Financial_Class",
-            "Pat_Num": "Patient_Num",
-            "Pat_Name": "Patient_Name",
-            "Rendering_Phy": "Rendering_Physician",
-            "SignOffSealedDate": "Chart_Signed_Date",
-            "Inv_Num": "Invoice_Num",
-        }
-
-        # df = df.rename(columns_to_rename)
-        df = self.clean_currency_column(df, "Total_Charge")
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("cnt_27", file_path, processed_file, table_columns)
 
     def cnt_19(self, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -221,18 +596,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        # TODO: Add column renaming and other transformations
-        columns_to_rename = {
-
-        }
-
-        # df = df.rename(columns_to_rename)
-        df = self.drop_textbox_columns(df)
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("cnt_19", file_path, processed_file, table_columns)
 
     def adj_4(self, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -246,15 +610,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        df = self.drop_textbox_columns(df, ['textbox20'])
-        df = self.clean_currency_column(df, ["textbox20", "Adj_Amt"])
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        # df = df.with_columns([pl.col("rebilled_status").fill_null(0)])
-        df.write_csv(processed_file)
+        self.transform("adj_4", file_path, processed_file, table_columns)
 
     def adj_11(self, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -268,19 +624,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        columns_to_rename = {
-
-        }
-
-        # df = df.rename(columns_to_rename)
-        df = self.drop_textbox_columns(df)
-        df = self.clean_currency_column(df, "Adj_Amt")
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df = df.with_columns([pl.col("rebilled_status").fill_null(0)])
-        df.write_csv(processed_file)
+        self.transform("adj_11", file_path, processed_file, table_columns)
 
     def fin_18(self, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -294,17 +638,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        columns_to_rename = {
-
-        }
-
-        # df = df.rename(columns_to_rename)
-        df = self.clean_currency_column(df, ["Total_Charge", "Rebilled_Total_Charge"])
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("fin_18", file_path, processed_file, table_columns)
 
     def pay_41(self, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -318,19 +652,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        columns_to_rename = {
-
-        }
-
-        # df = df.rename(columns_to_rename)
-        df = self.drop_textbox_columns(df)
-        df = self.clean_currency_column(df, ["Payment"])
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df = df.with_columns([pl.col("rebilled_status").fill_null(0)])
-        df.write_csv(processed_file)
+        self.transform("pay_41", file_path, processed_file, table_columns)
 
     def xry_03(self, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -344,14 +666,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        columns_to_rename = {
-
-        }
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("xry_03", file_path, processed_file, table_columns)
 
     def fin_25(self, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -367,16 +682,16 @@ class TransformCSV:
         """
         try:
             logging.info("Fin_25 Data transformation process started.")
-            df = pl.read_csv(file_path, infer_schema=False)
+            df = self.read_frame(file_path)
             df = self.drop_all_null_rows(df)
 
             df = df.rename({"Textbox2":"Svc_Date"})
-            df = df.with_columns(pl.col("Svc_Date").str.to_date(format="%m/%d/%Y", strict=False))
+            df, date_rejects = self.normalize_dates("fin_25", df, ["Svc_Date"])
 
-            df = df.with_columns(df["Proc_Code"].str.split(" | ").alias("split_data"))
+            df = df.with_columns(pl.col("Proc_Code").str.split(" | ").alias("split_data"))
             df = df.explode("split_data")
             df = df.with_columns(
-                df["split_data"].str.split(": ").alias("split_key_value")
+                pl.col("split_data").str.split(": ").alias("split_key_value")
             ).select(
                 pl.all().exclude("split_data"),
                 pl.col("split_key_value").list.get(0).alias("new_proc_code"),
@@ -386,7 +701,11 @@ class TransformCSV:
             df = df.drop(["split_key_value", "Proc_Code"])
             df = df.rename({"new_proc_code": "Proc_Code"})
 
-            df = self.clean_currency_column(df, ["Total_Charge", "Copay_Paid", "Curr_Pay_Amt", "Other_Paid", "Total_Adj", "Crg_Balance", "Proc_Amount"])
+            currency_columns = ["Total_Charge", "Copay_Paid", "Curr_Pay_Amt", "Other_Paid", "Total_Adj", "Crg_Balance", "Proc_Amount"]
+            rejects = self.currency_rejects(df, currency_columns)
+            if date_rejects is not None:
+                rejects = pl.concat([date_rejects, rejects])
+            df = self.clean_currency_column(df, currency_columns)
 
             df = df.with_columns(
                 pl.col("Pat_Name").str.replace_all(",", "").alias("Pat_Name"),
@@ -396,7 +715,7 @@ class TransformCSV:
             df = self.add_client_id_date_updated_columns(df)
             df = self.sync_dataframe_with_table(table_columns, df)
 
-            df.write_csv(processed_file)
+            self.write_frame(df, processed_file, rejects)
             logging.info("Fin_25 Data transformation process completed.")
         except Exception as e:
             logging.error("Error occurred during Fin_25 data transformation.")
@@ -414,14 +733,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        df = self.drop_textbox_columns(df, ["textbox13"])
-        df = self.clean_currency_column(df, ["textbox13", "Payment"])
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        # df = df.with_columns([pl.col("rebilled_status").fill_null(0)])
-        df.write_csv(processed_file)
+        self.transform("pay_4", file_path, processed_file, table_columns)
 
     def pay_10(self, file_path:str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -445,28 +757,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        try:
-            logging.info("Pay_10 Data transformation process started.")
-            df = pl.read_csv(file_path, columns=["Payer_Class", "Payer_Name", "Pat_Name", "Svc_Date", "CPT_Code", "textbox18", "Paid_Amt", "Adj_Amt", "textbox22"], infer_schema=False)
-            df = self.drop_all_null_rows(df)
-
-            df = df.rename({"textbox18":"Charge_Amt", "textbox22":"Net_AR"})
-            df = self.clean_currency_column(df, ["Charge_Amt", "Paid_Amt", "Adj_Amt", "Net_AR"])
-
-            df = df.with_columns(
-                pl.col("Payer_Name").str.replace_all(",", "").alias("Payer_Name"),
-                pl.col("Pat_Name").str.replace_all(",", "").alias("Pat_Name")
-            )
-
-            df = df.with_columns(pl.col("Svc_Date").str.to_date(format="%m/%d/%Y", strict=False))
-            df = self.add_client_id_date_updated_columns(df)
-
-            df = self.sync_dataframe_with_table(table_columns, df)
-            df.write_csv(processed_file)
-            logging.info("Pay_10 Data transformation process completed.")
-        except Exception as e:
-            logging.error("Error occurred during Pay_10 data transformation.")
-            raise
+        self.transform("pay_10", file_path, processed_file, table_columns)
 
     def rev_16(self, file_path: str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -480,18 +771,8 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        try:
-            df = pl.read_csv(file_path, infer_schema=False)
-            df = self.drop_all_null_rows(df)
-            df = self.drop_textbox_columns(df, ["textbox33", "textbox34"])
-            df = self.clean_currency_column(df, ["textbox33", "textbox34", "Charge_Amt", "Rebilled_Amt"])
-            df = self.add_client_id_date_updated_columns(df)
-            df = self.sync_dataframe_with_table(table_columns, df)
-            df.write_csv(processed_file)
-        except Exception as e:
-            logging.error("Error occurred during rev_16 data transformation.")
-            raise
-            
+        self.transform("rev_16", file_path, processed_file, table_columns)
+
     def rev_19(self, file_path:str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
         Transform the REV_19 report.
@@ -513,22 +794,8 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        try:
-            logging.info("Rev_19 Data transformation process started.")
-            df = pl.read_csv(file_path, columns=["Phy_Name", "Rev_Type", "Proc_Code", "Description", "Charge_Amt"], infer_schema=False)
-            df = self.drop_all_null_rows(df)
+        self.transform("rev_19", file_path, processed_file, table_columns)
 
-            df = df.with_columns(pl.col("Phy_Name").str.replace_all(",", "").alias("Phy_Name"))
-            df = self.clean_currency_column(df, ['Charge_Amt'])
-            df = self.add_client_id_date_updated_columns(df)
-
-            df = self.sync_dataframe_with_table(table_columns, df)
-            df.write_csv(processed_file)
-            logging.info("Rev_19 Data transformation process completed.")
-        except Exception as e:
-            logging.error("Error occurred during Rev_19 data transformation.")
-            raise
-    
     def ccr_03(self, file_path:str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
         Transform CCR_03 Report
@@ -541,18 +808,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        columns_to_rename = {
-
-        }
-
-        # df = df.rename(columns_to_rename)
-        df = self.drop_textbox_columns(df)
-        df = self.clean_currency_column(df, 'ReserveAmt')
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("ccr_03", file_path, processed_file, table_columns)
 
     def ccr_02(self, file_path:str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -566,18 +822,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        columns_to_rename = {
-
-        }
-
-        # df = df.rename(columns_to_rename)
-        df = self.drop_textbox_columns(df)
-        df = self.clean_currency_column(df, 'Payment_Amt')
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("ccr_02", file_path, processed_file, table_columns)
 
     def per_02(self, file_path:str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -591,12 +836,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        df = df.rename({"textbox5": "Provider"})
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("per_02", file_path, processed_file, table_columns)
 
     def med_01(self, file_path:str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -610,22 +850,18 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
+        df = self.read_frame(file_path)
         columns = ["SignedOffBy", "textbox13", "textbox19", "textbox42", "textbox20", "textbox52", "textbox21", "textbox56", "Clinic", "Svc_Date", "Pat_Name", "PrescribedDate", "PrescribedBy", "DrugName", "Strength", "StrengthUOM", "DispenseQuantity", "IsDispensed"]
         target_values = ["textbox1", "textbox18", "textbox22", "textbox23", "Pat_Name1", "PrescribedDate1", "PrescribedBy1", "textbox24", "textbox25", "textbox26", "textbox27", "textbox28", "textbox29", "textbox30", "textbox15", "textbox46", "textbox47", "textbox48"]
 
-        mask = df.select([df[col] == val for col, val in zip(columns, target_values)]).with_columns(
-            match_row=pl.fold(acc=True, function=lambda acc, col: acc & col, exprs=pl.all())
-        )["match_row"]
-        row_index = mask.arg_true().min()
-
-        if row_index is not None:
-            df = df.slice(0, row_index)
+        # Keep the rows before the first repeated header row, which starts the second page of the export
+        match_row = pl.all_horizontal([(pl.col(col) == val).fill_null(False) for col, val in zip(columns, target_values)])
+        df = df.filter(match_row.cum_sum() == 0)
         df = self.drop_textbox_columns(df)
         df = self.drop_all_null_rows(df)
         df = self.add_client_id_date_updated_columns(df)
         df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.write_frame(df, processed_file)
 
     def pat_20(self, file_path:str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -639,12 +875,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        df = df.rename({"Textbox32": "Last_Clinic"})
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("pat_20", file_path, processed_file, table_columns)
 
     def cht_02(self, file_path:str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -658,11 +889,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("cht_02", file_path, processed_file, table_columns)
 
     def lab_01(self, file_path:str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -676,11 +903,7 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_all_null_rows(df)
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("lab_01", file_path, processed_file, table_columns)
 
     def pat_02(self, file_path:str, processed_file: str, table_columns: list[tuple[str]]) -> None:
         """
@@ -694,9 +917,4 @@ class TransformCSV:
         :type table_columns: list[tuple[str]]
         :returns: None
         """
-        df = pl.read_csv(file_path, infer_schema=False)
-        df = self.drop_textbox_columns(df)
-        df = self.drop_all_null_rows(df)
-        df = self.add_client_id_date_updated_columns(df)
-        df = self.sync_dataframe_with_table(table_columns, df)
-        df.write_csv(processed_file)
+        self.transform("pat_02", file_path, processed_file, table_columns)
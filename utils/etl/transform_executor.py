@@ -0,0 +1,219 @@
+"""
+Transform Executor
+
+This module runs the :class:`TransformCSV` steps in a pool of worker processes, away from the
+process that drives the Selenium browser. The pool is shared by every :class:`TransformExecutor`
+of the process and started once; the extract step of each report submits its raw file and gets
+a future back, so the browser moves on to the next report while the transform runs.
+
+Each worker's Polars thread pool is sized with ``POLARS_MAX_THREADS`` from an explicit core
+budget, set by the pool initializer before the worker runs any Polars code, so the transforms
+running at the same time share the machine instead of each starting one Polars thread per core.
+A memory budget is split the same way and bounds the row batches of large raw files (see
+:meth:`TransformCSV.transform_chunked`).
+
+:module: transform_executor.py
+:platform: Unix, Windows
+:synopsis: Shared process pool for CPU-heavy report transforms with a Polars thread budget.
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+
+
+DEFAULT_WORKERS = 2
+
+_pool = None
+_pool_settings = None
+_pool_users = 0
+_pool_lock = threading.Lock()
+
+_worker_transforms = {}
+
+
+def concurrent_transforms(workers: int, client_processes: int = 1) -> int:
+    """
+    :param workers: Transform workers per client process.
+    :type workers: int
+    :param client_processes: Number of clients running at the same time, each with its own pool.
+    :type client_processes: int
+    :returns: The number of transforms that can run at the same time on the machine.
+    :rtype: int
+    """
+    return max(1, workers) * max(1, client_processes)
+
+
+def thread_budget(workers: int, client_processes: int = 1, cpu_count: int = None) -> int:
+    """
+    Splits the machine's cores between the transforms that can run at the same time.
+
+    :param workers: Transform workers per client process.
+    :type workers: int
+    :param client_processes: Number of clients running at the same time, each with its own pool.
+    :type client_processes: int
+    :param cpu_count: Number of cores, defaults to ``os.cpu_count()``.
+    :type cpu_count: int, optional
+    :returns: The ``POLARS_MAX_THREADS`` of one worker, at least 1.
+    :rtype: int
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // concurrent_transforms(workers, client_processes))
+
+
+def memory_budget(total_bytes: int, workers: int, client_processes: int = 1) -> int:
+    """
+    Splits a memory budget between the transforms that can run at the same time.
+
+    :param total_bytes: Memory all transforms of the machine may use together.
+    :type total_bytes: int
+    :param workers: Transform workers per client process.
+    :type workers: int
+    :param client_processes: Number of clients running at the same time, each with its own pool.
+    :type client_processes: int
+    :returns: The memory limit of one worker, in bytes.
+    :rtype: int
+    """
+    return total_bytes // concurrent_transforms(workers, client_processes)
+
+
+def _init_worker(polars_threads: int) -> None:
+    # Polars sizes its thread pool on first use, which is after this in a fresh worker
+    os.environ["POLARS_MAX_THREADS"] = str(polars_threads)
+
+
+def _run_transform(client_id: int, date_time_stamp: str, options: dict, method: str, args: tuple, kwargs: dict):
+    """
+    Runs one ``TransformCSV`` method in a worker. The transformer of each client is reused by
+    the later tasks of the worker.
+    """
+    from utils.etl.transform_csv import TransformCSV
+
+    key = (client_id, date_time_stamp, tuple(sorted(options.items())))
+    transform = _worker_transforms.get(key)
+    if transform is None:
+        transform = _worker_transforms[key] = TransformCSV(client_id, date_time_stamp, **options)
+    return getattr(transform, method)(*args, **kwargs)
+
+
+def _acquire_pool(workers: int, polars_threads: int) -> ProcessPoolExecutor:
+    global _pool, _pool_settings, _pool_users
+    with _pool_lock:
+        if _pool is None:
+            logging.info("Starting %s transform workers with %s Polars threads each.", workers, polars_threads)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker, initargs=(polars_threads,))
+            _pool_settings = (workers, polars_threads)
+        elif _pool_settings != (workers, polars_threads):
+            logging.warning("The transform pool already runs %s workers with %s Polars threads each, ignoring %s workers "
+                            "with %s threads.", *_pool_settings, workers, polars_threads)
+        _pool_users += 1
+        return _pool
+
+
+def _release_pool(wait: bool = True) -> None:
+    global _pool, _pool_settings, _pool_users
+    with _pool_lock:
+        _pool_users -= 1
+        if _pool_users > 0 or _pool is None:
+            return
+        pool, _pool, _pool_settings = _pool, None, None
+    pool.shutdown(wait=wait)
+
+
+class TransformExecutor:
+    """
+    Submits ``TransformCSV`` methods of one client to the shared process pool.
+
+    With ``workers=0`` the transforms run inline in the calling thread, which is useful for
+    debugging and on machines where starting processes is not allowed.
+
+    Methods:
+        submit(self, method, *args, **kwargs):
+            Schedules a transform and returns its future.
+        run(self, method, *args, **kwargs):
+            Runs a transform in the pool and waits for its result.
+        shutdown(self, wait):
+            Releases the shared pool, which stops when its last executor is shut down.
+    """
+
+    def __init__(self, client_id: int, date_time_stamp: str, workers: int = DEFAULT_WORKERS,
+                 client_processes: int = 1, polars_threads: int = None, memory_total: int = None,
+                 chunk_threshold: int = None, date_formats_file: str = None) -> None:
+        """
+        :param client_id: The client whose reports are transformed.
+        :type client_id: int
+        :param date_time_stamp: The ``Date_Updated`` stamp of the run.
+        :type date_time_stamp: str
+        :param workers: Number of worker processes of the shared pool, 0 to transform inline.
+        :type workers: int
+        :param client_processes: Number of clients running at the same time, used for the thread budget.
+        :type client_processes: int
+        :param polars_threads: ``POLARS_MAX_THREADS`` of each worker, defaults to :func:`thread_budget`.
+        :type polars_threads: int, optional
+        :param memory_total: Bytes all transforms of the machine may use, split with :func:`memory_budget`;
+            defaults to the ``TransformCSV`` limit per worker.
+        :type memory_total: int, optional
+        :param chunk_threshold: Raw file size in bytes above which reports are transformed in row batches,
+            defaults to the ``TransformCSV`` threshold.
+        :type chunk_threshold: int, optional
+        :param date_formats_file: JSON file keeping the detected date formats between runs.
+        :type date_formats_file: str, optional
+        """
+        self.client_id = client_id
+        self.date_time_stamp = date_time_stamp
+        self.workers = workers
+        self.polars_threads = polars_threads or thread_budget(workers, client_processes)
+        self.options = {}
+        if memory_total:
+            self.options["memory_limit"] = memory_budget(memory_total, workers, client_processes)
+        if chunk_threshold:
+            self.options["chunk_threshold"] = chunk_threshold
+        if date_formats_file:
+            self.options["date_formats_file"] = date_formats_file
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = _acquire_pool(self.workers, self.polars_threads)
+            return self._pool
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        """
+        Schedules a ``TransformCSV`` method, e.g. ``submit("cnt_27", raw_file, processed_file, table_columns)``.
+
+        :param method: The name of the ``TransformCSV`` method.
+        :type method: str
+        :returns: The future of the method's result.
+        :rtype: Future
+        """
+        if not self.workers:
+            future = Future()
+            try:
+                future.set_result(_run_transform(self.client_id, self.date_time_stamp, self.options, method, args, kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._get_pool().submit(_run_transform, self.client_id, self.date_time_stamp, self.options, method, args, kwargs)
+
+    def run(self, method: str, *args, **kwargs):
+        """
+        Runs a ``TransformCSV`` method in the pool and waits for it, raising its exception if it failed.
+        """
+        return self.submit(method, *args, **kwargs).result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool = None
+                _release_pool(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown()
@@ -0,0 +1,218 @@
+"""
+Transform Specs
+
+This module describes the report transforms declaratively. Most Experity reports only differ in
+the columns they read, rename, clean as currency, strip commas from or parse as dates, so each
+report is a :class:`TransformSpec` in :data:`TRANSFORM_SPECS` instead of a dedicated method. A
+spec is compiled once into a fused list of Polars expressions, which
+:meth:`TransformCSV.transform` applies in a single ``with_columns`` of the lazy plan.
+
+Adding a report that fits this shape is a new registry entry; reports with structural steps
+(``fin_25`` explodes procedure codes, ``med_01`` cuts the export at a repeated header) keep
+their own methods in :class:`TransformCSV`.
+
+:module: transform_specs.py
+:platform: Unix, Windows
+:synopsis: Declarative per-report transform specs compiled to Polars expressions.
+"""
+
+from decimal import Decimal
+
+import polars as pl
+
+
+# Money is parsed to fixed-point decimals, so sums over a report are exact
+CURRENCY_PRECISION = 18
+# Raw values are read at a wider scale, then rounded to the decimals of the column
+CURRENCY_PARSE_PRECISION = 38
+CURRENCY_PARSE_SCALE = 10
+
+
+def currency_expr(column: str, decimals: int = 2) -> pl.Expr:
+    """
+    Parses a currency text column such as ``$1,234.50`` or ``(12.00)`` into ``Decimal(18, decimals)``.
+    Values with more decimal places are rounded half away from zero, like ``ROUND`` in SQL Server.
+    Values that cannot be parsed become null; :func:`currency_reject_expr` finds them.
+
+    >>> frame = pl.DataFrame({"Amt": ["$1,234.50", "123.456", "1.999", "(2.555)", "0.005", "n/a"]})
+    >>> [str(value) for value in frame.select(currency_expr("Amt"))["Amt"]]
+    ['1234.50', '123.46', '2.00', '-2.56', '0.01', 'None']
+
+    :param column: The name of the column.
+    :type column: str
+    :param decimals: The number of decimal places kept.
+    :type decimals: int
+    :returns: The parsing expression, aliased to the column.
+    :rtype: pl.Expr
+    """
+    value = (
+        pl.col(column)
+        .str.strip_chars()
+        .str.replace_all(r"[\$,]", "")
+        .str.replace_all(r"^\((.*)\)$", r"-$1")
+        .cast(pl.Decimal(CURRENCY_PARSE_PRECISION, CURRENCY_PARSE_SCALE), strict=False)
+    )
+    # Casting to fewer decimal places truncates, so half a unit is added away from zero first
+    half = pl.lit(Decimal(5).scaleb(-decimals - 1), dtype=pl.Decimal(CURRENCY_PARSE_PRECISION, CURRENCY_PARSE_SCALE))
+    return (
+        pl.when(value < 0).then(value - half).otherwise(value + half)
+        .cast(pl.Decimal(CURRENCY_PRECISION, decimals), strict=False)
+        .alias(column)
+    )
+
+
+def currency_reject_expr(column: str, decimals: int = 2) -> pl.Expr:
+    """
+    Flags the non-empty raw values of a currency column that :func:`currency_expr` cannot parse.
+
+    :param column: The name of the raw text column.
+    :type column: str
+    :param decimals: The number of decimal places kept.
+    :type decimals: int
+    :returns: A boolean expression, true for rejected values.
+    :rtype: pl.Expr
+    """
+    return (pl.col(column).str.strip_chars() != "") & currency_expr(column, decimals).is_null()
+
+
+def strip_commas_expr(column: str) -> pl.Expr:
+    """
+    Removes the commas of a text column, e.g. in ``Last, First`` names.
+
+    :param column: The name of the column.
+    :type column: str
+    :returns: The expression, aliased to the column.
+    :rtype: pl.Expr
+    """
+    return pl.col(column).str.replace_all(",", "").alias(column)
+
+
+class TransformSpec:
+    """
+    The transform of one report.
+
+    The steps run in a fixed order: read ``columns``, drop all-null rows, drop ``textbox``
+    columns, ``rename``, parse ``dates``, clean ``currency``/``strip_commas`` columns, add
+    ``Client_ID`` and ``Date_Updated``, align with the table and finally ``fill_null``.
+
+    Attributes:
+        :report: The report key, e.g. ``"cnt_27"``.
+
+        :columns: Raw columns to read, None for all.
+
+        :rename: Mapping of raw to table column names.
+
+        :currency: Columns parsed as currency (after ``rename``).
+
+        :strip_commas: Text columns whose commas are removed.
+
+        :dates: Columns parsed as dates, in the format detected by :class:`DateNormalizer`.
+
+        :drop_textbox: Whether unnamed ``textbox`` columns are dropped.
+
+        :keep_textbox: ``textbox`` columns kept when ``drop_textbox`` is set.
+
+        :drop_textbox_first: Drop the ``textbox`` columns before the all-null row filter, so
+            rows holding only textbox values are removed as well.
+
+        :fill_null: Mapping of table column to the value that replaces its nulls.
+    """
+
+    def __init__(self, report: str, columns: list[str] = None, rename: dict[str, str] = None,
+                 currency: list[str] = (), strip_commas: list[str] = (), dates: list[str] = (),
+                 drop_textbox: bool = False, keep_textbox: list[str] = (), drop_textbox_first: bool = False,
+                 fill_null: dict[str, object] = None) -> None:
+        self.report = report
+        self.columns = list(columns) if columns else None
+        self.rename = dict(rename or {})
+        self.currency = list(currency)
+        self.strip_commas = list(strip_commas)
+        self.dates = list(dates)
+        self.drop_textbox = drop_textbox or drop_textbox_first or bool(keep_textbox)
+        self.keep_textbox = list(keep_textbox)
+        self.drop_textbox_first = drop_textbox_first
+        self.fill_null = dict(fill_null or {})
+        self._compiled = None
+
+    def compile(self) -> tuple[list[pl.Expr], list[pl.Expr]]:
+        """
+        Compiles the column steps of the spec, once.
+
+        :returns: The ``with_columns`` expressions applied before the table alignment, and the
+            ``fill_null`` expressions applied after it.
+        :rtype: tuple[list[pl.Expr], list[pl.Expr]]
+        """
+        if self._compiled is None:
+            columns = [currency_expr(col) for col in self.currency]
+            columns += [strip_commas_expr(col) for col in self.strip_commas]
+            fill_null = [pl.col(col).fill_null(value) for col, value in self.fill_null.items()]
+            self._compiled = (columns, fill_null)
+        return self._compiled
+
+    def __repr__(self) -> str:
+        return f"TransformSpec({self.report!r})"
+
+
+TRANSFORM_SPECS = {}
+
+
+def register_spec(spec: TransformSpec) -> TransformSpec:
+    """
+    Adds or replaces the spec of a report in :data:`TRANSFORM_SPECS`.
+
+    :param spec: The report spec.
+    :type spec: TransformSpec
+    :returns: The registered spec.
+    :rtype: TransformSpec
+    """
+    TRANSFORM_SPECS[spec.report] = spec
+    return spec
+
+
+def get_spec(report: str) -> TransformSpec:
+    """
+    :param report: The report key, case-insensitive.
+    :type report: str
+    :returns: The spec of the report.
+    :rtype: TransformSpec
+    :raises KeyError: If no spec is registered for the report.
+    """
+    try:
+        return TRANSFORM_SPECS[report.lower()]
+    except KeyError:
+        raise KeyError(f"No transform spec registered for report '{report}'.") from None
+
+
+for _spec in [
+    TransformSpec("cnt_27", currency=["Total_Charge"]),
+    TransformSpec("cnt_19", drop_textbox=True),
+    TransformSpec("adj_4", keep_textbox=["textbox20"], currency=["textbox20", "Adj_Amt"]),
+    TransformSpec("adj_11", drop_textbox=True, currency=["Adj_Amt"], fill_null={"rebilled_status": 0}),
+    TransformSpec("fin_18", currency=["Total_Charge", "Rebilled_Total_Charge"]),
+    TransformSpec("pay_41", drop_textbox=True, currency=["Payment"], fill_null={"rebilled_status": 0}),
+    TransformSpec("xry_03"),
+    TransformSpec("pay_4", keep_textbox=["textbox13"], currency=["textbox13", "Payment"]),
+    TransformSpec(
+        "pay_10",
+        columns=["Payer_Class", "Payer_Name", "Pat_Name", "Svc_Date", "CPT_Code", "textbox18", "Paid_Amt", "Adj_Amt", "textbox22"],
+        rename={"textbox18": "Charge_Amt", "textbox22": "Net_AR"},
+        currency=["Charge_Amt", "Paid_Amt", "Adj_Amt", "Net_AR"],
+        strip_commas=["Payer_Name", "Pat_Name"],
+        dates=["Svc_Date"],
+    ),
+    TransformSpec("rev_16", keep_textbox=["textbox33", "textbox34"], currency=["textbox33", "textbox34", "Charge_Amt", "Rebilled_Amt"]),
+    TransformSpec(
+        "rev_19",
+        columns=["Phy_Name", "Rev_Type", "Proc_Code", "Description", "Charge_Amt"],
+        currency=["Charge_Amt"],
+        strip_commas=["Phy_Name"],
+    ),
+    TransformSpec("ccr_03", drop_textbox=True, currency=["ReserveAmt"]),
+    TransformSpec("ccr_02", drop_textbox=True, currency=["Payment_Amt"]),
+    TransformSpec("per_02", rename={"textbox5": "Provider"}),
+    TransformSpec("pat_20", rename={"Textbox32": "Last_Clinic"}),
+    TransformSpec("cht_02"),
+    TransformSpec("lab_01"),
+    TransformSpec("pat_02", drop_textbox_first=True),
+]:
+    register_spec(_spec)
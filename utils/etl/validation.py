@@ -0,0 +1,438 @@
+"""
+Validation
+
+This module is the data-quality gate between the transform and the load of a report. Bad
+downloads (an HTML error page saved as ``.csv``, a truncated export, a missing column, an
+all-null money column) are rejected before they reach the base tables, instead of surfacing as
+a failed ``BULK INSERT``.
+
+The checks run in two steps:
+
+- :meth:`ReportValidator.check_raw` runs before the transform and only reads the start of the
+  raw file: the file must be a CSV and not an HTML page, and must have the required columns.
+- :meth:`ReportValidator.validate` runs on the processed file. The rules of the report are
+  compiled into Polars aggregations that run in a single pass over the file: row count, null
+  ratios, value ranges and rows outside the extracted date window. The row count is compared
+  with the history of the client's previous loads of the report, which also records the files
+  rejected only for their row count, so a lasting change of volume is accepted after a few runs.
+
+A failed check raises :class:`DataQualityException` with the :class:`ValidationReport`, which is
+also written as JSON to the ``Quarantine`` folder next to the processed file.
+
+:module: validation.py
+:platform: Unix, Windows
+:synopsis: Per-report data-quality rules compiled to Polars expressions, checked before load.
+"""
+
+import os
+import json
+import time
+import logging
+import statistics
+import threading
+from datetime import date
+
+import polars as pl
+
+from utils.automation_exceptions import DataQualityException
+from utils.etl.date_normalizer import DATE_FORMATS, DATETIME_FORMATS
+from utils.etl.transform_specs import TRANSFORM_SPECS
+
+
+RAW_SNIFF_BYTES = 4096
+HTML_MARKERS = (b"<!doctype html", b"<html", b"<head", b"<body")
+
+# Row counts are compared per day of the extracted window, with the median of the last runs.
+HISTORY_RUNS = 10
+MIN_HISTORY_RUNS = 3
+ROW_RATE_BOUNDS = (0.2, 5.0)
+
+# Share of rows allowed outside the extracted window, for rows on the edge of a day.
+MAX_OUTSIDE_WINDOW = 0.01
+
+SCANNERS = {".parquet": pl.scan_parquet, ".arrow": pl.scan_ipc, ".ipc": pl.scan_ipc}
+
+
+class ValidationRules:
+    """
+    The data-quality rules of one report.
+
+    Attributes:
+        :report: The report key, e.g. ``"cnt_27"``.
+
+        :required_columns: Columns the raw file must have.
+
+        :min_rows: The fewest rows a processed file may have. Most reports can be empty on a quiet
+            day, so by default only the row count history decides when a count is suspicious.
+
+        :max_null_ratio: Mapping of processed column to the highest share of nulls allowed.
+
+        :any_not_null: Processed columns of which at least one must hold a value, e.g. the money
+            columns of a report, which are all null when the export is broken.
+
+        :ranges: Mapping of processed column to its ``(min, max)`` allowed values, None for no bound.
+
+        :max_outside_window: Highest share of rows whose ``date_column`` is outside the extracted window.
+
+        :row_rate_bounds: ``(low, high)`` factors of the historic rows per window day, None to skip the check.
+    """
+
+    def __init__(self, report: str, required_columns: list[str] = (), min_rows: int = 0,
+                 max_null_ratio: dict[str, float] = None, any_not_null: list[str] = (), ranges: dict[str, tuple] = None,
+                 max_outside_window: float = MAX_OUTSIDE_WINDOW,
+                 row_rate_bounds: tuple[float, float] | None = ROW_RATE_BOUNDS) -> None:
+        self.report = report
+        self.required_columns = list(required_columns)
+        self.min_rows = min_rows
+        self.max_null_ratio = dict(max_null_ratio or {})
+        self.any_not_null = list(any_not_null)
+        self.ranges = dict(ranges or {})
+        self.max_outside_window = max_outside_window
+        self.row_rate_bounds = row_rate_bounds
+
+    def compile(self, schema: pl.Schema, date_column: str = None, window: tuple[date, date] = None) -> list[pl.Expr]:
+        """
+        Compiles the rules into aggregations over a processed file, named ``<check>|<column>``.
+        Rules on columns the file does not have are skipped; the processed file has the columns
+        of the table, and missing raw columns are caught by :meth:`ReportValidator.check_raw`.
+
+        :param schema: The schema of the processed file.
+        :type schema: pl.Schema
+        :param date_column: The column checked against ``window``.
+        :type date_column: str, optional
+        :param window: The extracted ``(first_day, last_day)`` window.
+        :type window: tuple[date, date], optional
+        :returns: The aggregation expressions.
+        :rtype: list[pl.Expr]
+        """
+        exprs = [pl.len().alias("rows|")]
+        for col in dict.fromkeys([*self.max_null_ratio, *self.any_not_null]):
+            if col in schema:
+                exprs.append(pl.col(col).null_count().alias(f"nulls|{col}"))
+        for col in self.ranges:
+            if col in schema:
+                value = _numeric(col, schema[col])
+                exprs += [value.min().alias(f"min|{col}"), value.max().alias(f"max|{col}")]
+        if date_column and window and date_column in schema:
+            day = _date(date_column, schema[date_column])
+            exprs.append((day.is_not_null() & ~day.is_between(*window)).sum().alias(f"outside_window|{date_column}"))
+        return exprs
+
+    def __repr__(self) -> str:
+        return f"ValidationRules({self.report!r})"
+
+
+def _numeric(column: str, dtype: pl.DataType) -> pl.Expr:
+    if dtype == pl.Utf8:
+        return pl.col(column).cast(pl.Float64, strict=False)
+    return pl.col(column).cast(pl.Float64)
+
+
+def _date(column: str, dtype: pl.DataType) -> pl.Expr:
+    if dtype == pl.Date:
+        return pl.col(column)
+    if dtype.is_temporal():
+        return pl.col(column).cast(pl.Date)
+    value = pl.col(column).cast(pl.Utf8)
+    return pl.coalesce(
+        [value.str.to_date(fmt, strict=False) for fmt in DATE_FORMATS]
+        + [value.str.to_datetime(fmt, strict=False).dt.date() for fmt in DATETIME_FORMATS]
+    )
+
+
+VALIDATION_RULES = {}
+
+
+def register_rules(rules: ValidationRules) -> ValidationRules:
+    """
+    Adds or replaces the rules of a report in :data:`VALIDATION_RULES`.
+
+    :param rules: The report rules.
+    :type rules: ValidationRules
+    :returns: The registered rules.
+    :rtype: ValidationRules
+    """
+    VALIDATION_RULES[rules.report] = rules
+    return rules
+
+
+def get_rules(report: str) -> ValidationRules:
+    """
+    :param report: The report key, case-insensitive.
+    :type report: str
+    :returns: The registered rules of the report, or the default rules: a row count in line with
+        the history.
+    :rtype: ValidationRules
+    """
+    return VALIDATION_RULES.get(report.lower()) or ValidationRules(report.lower())
+
+
+def rules_from_spec(spec) -> ValidationRules:
+    """
+    Derives the rules of a report from its :class:`TransformSpec`: the columns it reads, its
+    currency and date columns are required in the raw file, and its currency columns must not
+    all be entirely null.
+
+    :param spec: The transform spec.
+    :type spec: TransformSpec
+    :returns: The rules.
+    :rtype: ValidationRules
+    """
+    raw_names = {new: old for old, new in spec.rename.items()}
+    required = list(spec.columns or [])
+    for col in [*spec.currency, *spec.dates]:
+        raw = raw_names.get(col, col)
+        if raw not in required:
+            required.append(raw)
+    return ValidationRules(spec.report, required_columns=required, any_not_null=spec.currency)
+
+
+for _spec in TRANSFORM_SPECS.values():
+    register_rules(rules_from_spec(_spec))
+register_rules(ValidationRules(
+    "fin_25",
+    required_columns=["Textbox2", "Proc_Code", "Total_Charge", "Pat_Name", "Rendering_Phy"],
+    any_not_null=["Total_Charge", "Copay_Paid", "Curr_Pay_Amt", "Other_Paid", "Total_Adj", "Crg_Balance"],
+))
+
+
+class ValidationReport:
+    """
+    The outcome of the checks of one file.
+
+    Attributes:
+        :report: The report key.
+
+        :file: The checked file.
+
+        :rows: The rows of the processed file, None for raw checks.
+
+        :failures: One dict per failed check, with its ``check``, ``column``, ``expected`` and ``actual`` values.
+    """
+
+    def __init__(self, report: str, file: str, rows: int = None) -> None:
+        self.report = report
+        self.file = file
+        self.rows = rows
+        self.failures = []
+
+    def fail(self, check: str, column: str = None, expected=None, actual=None) -> None:
+        self.failures.append({"check": check, "column": column, "expected": expected, "actual": actual})
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures
+
+    def to_dict(self) -> dict:
+        return {"report": self.report, "file": self.file, "rows": self.rows, "passed": self.passed, "failures": self.failures}
+
+    def __str__(self) -> str:
+        if self.passed:
+            return f"{self.report}: passed ({self.rows} rows)"
+        checks = "; ".join(
+            f"{f['check']}{' ' + f['column'] if f['column'] else ''}: expected {f['expected']}, got {f['actual']}"
+            for f in self.failures
+        )
+        return f"{self.report} failed {len(self.failures)} data-quality checks: {checks}"
+
+
+class RowCountHistory:
+    """
+    The rows per window day of the last loads of each report of a client, kept in a JSON file.
+
+    Methods:
+        rates(self, report):
+            Returns the recorded rates of a report, oldest first.
+        record(self, report, rows, days):
+            Records the rows of a load.
+        forget(self, report):
+            Drops the history of a report, so the next loads set its normal level again.
+    """
+
+    def __init__(self, path: str, runs: int = HISTORY_RUNS) -> None:
+        """
+        :param path: The JSON file, created on the first record.
+        :type path: str
+        :param runs: Number of loads kept per report.
+        :type runs: int
+        """
+        self.path = path
+        self.runs = runs
+        self._lock = threading.Lock()
+        self._rates = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._rates = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning("Ignoring unreadable row count history '%s': %s", path, e)
+
+    def rates(self, report: str) -> list[float]:
+        with self._lock:
+            return list(self._rates.get(report, []))
+
+    def record(self, report: str, rows: int, days: int) -> None:
+        with self._lock:
+            rates = self._rates.setdefault(report, [])
+            rates.append(rows / max(1, days))
+            del rates[:-self.runs]
+            self._save()
+
+    def forget(self, report: str) -> None:
+        with self._lock:
+            self._rates.pop(report, None)
+            self._save()
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._rates, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def window_days(window: tuple[date, date] | None) -> int:
+    return (window[1] - window[0]).days + 1 if window else 1
+
+
+class ReportValidator:
+    """
+    Runs the data-quality checks of the reports of one client.
+
+    Methods:
+        check_raw(self, report, raw_file):
+            Checks a raw download before it is transformed.
+        validate(self, report, processed_file, date_column, window):
+            Checks a processed file before it is loaded.
+        record(self, report, rows, window):
+            Adds a load to the row count history.
+        reset(self, report):
+            Drops the row count history of a report.
+    """
+
+    def __init__(self, history: RowCountHistory = None) -> None:
+        """
+        :param history: The row count history of the client, None to skip the history checks.
+        :type history: RowCountHistory, optional
+        """
+        self.history = history
+
+    def check_raw(self, report: str, raw_file: str) -> ValidationReport:
+        """
+        Checks that a raw download is a CSV export with the required columns. Only the first
+        bytes and the header of the file are read.
+
+        :param report: The report key.
+        :type report: str
+        :param raw_file: The downloaded file.
+        :type raw_file: str
+        :returns: The passed validation report.
+        :rtype: ValidationReport
+
+        :raises DataQualityException: If a check failed.
+        """
+        result = ValidationReport(report, raw_file)
+        with open(raw_file, "rb") as f:
+            head = f.read(RAW_SNIFF_BYTES)
+        sniff = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+        if not sniff:
+            result.fail("empty_file", expected="a CSV export", actual="0 bytes")
+        elif sniff.startswith(HTML_MARKERS):
+            result.fail("html_page", expected="a CSV export", actual=head[:80].decode("utf-8", "replace").strip())
+        else:
+            columns = pl.scan_csv(raw_file, infer_schema=False).collect_schema().names()
+            missing = [col for col in get_rules(report).required_columns if col not in columns]
+            if missing:
+                result.fail("required_columns", expected=missing, actual=f"missing from {len(columns)} columns")
+        return self._finish(result)
+
+    def validate(self, report: str, processed_file: str, date_column: str = None,
+                 window: tuple[date, date] = None) -> ValidationReport:
+        """
+        Checks a processed file against the rules of the report, with one aggregation pass.
+
+        :param report: The report key.
+        :type report: str
+        :param processed_file: The processed CSV, Parquet or Arrow IPC file.
+        :type processed_file: str
+        :param date_column: The column whose dates must be inside ``window``.
+        :type date_column: str, optional
+        :param window: The extracted ``(first_day, last_day)`` window.
+        :type window: tuple[date, date], optional
+        :returns: The passed validation report, with the number of rows.
+        :rtype: ValidationReport
+
+        :raises DataQualityException: If a check failed.
+        """
+        rules = get_rules(report)
+        scanner = SCANNERS.get(os.path.splitext(processed_file)[1].lower())
+        frame = scanner(processed_file) if scanner else pl.scan_csv(processed_file, infer_schema=False)
+        schema = frame.collect_schema()
+        stats = frame.select(rules.compile(schema, date_column, window)).collect(engine="streaming").row(0, named=True)
+
+        rows = stats["rows|"]
+        result = ValidationReport(report, processed_file, rows)
+        if rows < rules.min_rows:
+            result.fail("min_rows", expected=f">= {rules.min_rows}", actual=rows)
+
+        for col, ratio in rules.max_null_ratio.items():
+            if col in schema and rows and stats[f"nulls|{col}"] / rows > ratio:
+                result.fail("null_ratio", col, expected=f"<= {ratio:.0%}", actual=f"{stats[f'nulls|{col}'] / rows:.0%}")
+
+        present = [col for col in rules.any_not_null if col in schema]
+        if rows and present and all(stats[f"nulls|{col}"] == rows for col in present):
+            result.fail("all_null", ", ".join(present), expected="values in at least one column", actual="all null")
+
+        for col, (low, high) in rules.ranges.items():
+            if col not in schema:
+                continue
+            col_min, col_max = stats[f"min|{col}"], stats[f"max|{col}"]
+            if (low is not None and col_min is not None and col_min < low) or (high is not None and col_max is not None and col_max > high):
+                result.fail("range", col, expected=[low, high], actual=[col_min, col_max])
+
+        outside = stats.get(f"outside_window|{date_column}")
+        if outside and rows and outside / rows > rules.max_outside_window:
+            result.fail("date_window", date_column, expected=[window[0].isoformat(), window[1].isoformat()],
+                        actual=f"{outside} rows outside")
+
+        # An empty file is a quiet day for reports that may be empty, not a row count anomaly
+        if self.history is not None and rules.row_rate_bounds and (rows or rules.min_rows):
+            rates = self.history.rates(report)
+            # Without enough history, or with a median of 0, there is no normal level to compare with
+            median = statistics.median(rates) if len(rates) >= MIN_HISTORY_RUNS else 0
+            low, high = rules.row_rate_bounds
+            rate = rows / window_days(window)
+            if median and not median * low <= rate <= median * high:
+                result.fail("row_count", expected=f"{median * low:.1f}-{median * high:.1f} rows per day",
+                            actual=f"{rate:.1f} rows per day ({rows} rows)")
+                if len(result.failures) == 1:
+                    # A file rejected only for its row count is still recorded, so the median follows a lasting change of volume
+                    self.record(report, rows, window)
+        return self._finish(result)
+
+    def record(self, report: str, rows: int, window: tuple[date, date] = None) -> None:
+        """
+        Adds the rows of a load to the history, for the row count checks of the next runs.
+        """
+        if self.history is not None:
+            self.history.record(report, rows, window_days(window))
+
+    def reset(self, report: str) -> None:
+        """
+        Accepts a new normal row count of a report by dropping its history; the row count check is
+        skipped until :data:`MIN_HISTORY_RUNS` loads are recorded again.
+        """
+        if self.history is not None:
+            self.history.forget(report)
+
+    def _finish(self, result: ValidationReport) -> ValidationReport:
+        if result.passed:
+            logging.info(str(result))
+            return result
+        folder, name = os.path.split(result.file)
+        report_file = os.path.join(folder, "Quarantine", f"{os.path.splitext(name)[0]}_validation.json")
+        os.makedirs(os.path.dirname(report_file), exist_ok=True)
+        with open(report_file, "w", encoding="utf-8") as f:
+            json.dump({**result.to_dict(), "checked_at": time.strftime("%Y-%m-%d %H:%M:%S")}, f, indent=1, default=str)
+        logging.error("%s, see %s", result, report_file)
+        raise DataQualityException(str(result), result)
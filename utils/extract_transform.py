@@ -3,6 +3,8 @@ import logging
 import datetime
 import polars as pl
 
+from utils.etl.transform_csv import combine_csv_files as etl_combine_csv_files
+
 def clean_currency_column(df: pl.DataFrame, column_names: str | list[str], decimals: int = 2) -> pl.DataFrame:
     """
     Cleans and converts currency columns in a Polars DataFrame to numeric values.
@@ -248,6 +250,9 @@ def combine_csv_files(folder_path: str, output_file: str, start_with: str = None
     """
     Combines multiple CSV files in a given folder into a single CSV file.
 
+    Kept for the older scripts, the streaming implementation lives in
+    :func:`utils.etl.transform_csv.combine_csv_files`.
+
     :param folder_path: Path to the folder containing CSV files.
     :type folder_path: str
     :param output_file: Path where the combined CSV file will be saved.
@@ -258,16 +263,4 @@ def combine_csv_files(folder_path: str, output_file: str, start_with: str = None
 
     :raises FileNotFoundError: If no matching CSV files are found in the folder.
     """
-    all_files = [
-        os.path.join(folder_path, f) for f in os.listdir(folder_path)
-        if f.endswith('.csv') and (start_with is None or f.startswith(start_with))
-    ]
-    
-    if not all_files:
-        raise FileNotFoundError("No matching CSV files found.")
-    
-    df_list = [pl.read_csv(file) for file in all_files]
-    combined_df = pl.concat(df_list)
-    combined_df.write_csv(output_file)
-    
-    logging.info(f" Combined {len(all_files)} CSV files.")
\ No newline at end of file
+    etl_combine_csv_files(folder_path, output_file, start_with)
\ No newline at end of file
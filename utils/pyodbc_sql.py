@@ -14,10 +14,299 @@ This module contains the PyODBCSQL class, which allows executing SQL queries and
 # TODO: Implement logging along with proper error handling with error codes, as per guidelines.
 
 import os
-import pyodbc
+import time
+import atexit
 import logging
+import threading
+import contextlib
+import collections
+import polars as pl
 import utils.error_messages as em
 from dotenv import load_dotenv
+from utils.sql_backends import BulkInsertOptions, MSSQLBackend, get_backend
+
+try:
+    from arrow_odbc import read_arrow_batches_from_odbc
+except ImportError:
+    read_arrow_batches_from_odbc = None
+
+FETCH_BATCH_SIZE = 10000
+# Stays below the 5000 locks per statement at which SQL Server escalates to a table lock.
+DELETE_BATCH_SIZE = 4000
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of reusable pyodbc connections.
+
+    Connections are handed out in LIFO order so the most recently used (and therefore warmest)
+    connection is reused first. Idle connections above ``min_size`` are closed once they have been
+    idle longer than ``idle_timeout``. A checked-out connection is validated before it is returned
+    to the caller, and a pool inherited by a forked child process (e.g. ``multiprocessing.Pool``)
+    drops the parent's connections instead of sharing sockets across processes.
+
+    Methods:
+        acquire(self):
+            Checks out a healthy connection, opening a new one if the pool is not exhausted.
+        release(self, conn, discard=False):
+            Returns a connection to the pool, or closes it when ``discard`` is set.
+        connection(self):
+            Context manager wrapping ``acquire`` and ``release``.
+        close(self):
+            Closes all idle connections.
+    """
+
+    def __init__(self, connect, min_size: int = 0, max_size: int = 5, idle_timeout: float = 300,
+                 checkout_timeout: float = 30, ping_after: float = 5) -> None:
+        """
+        Initializes the ConnectionPool class.
+
+        :param connect: Zero-argument callable returning a new DB-API connection.
+        :type connect: callable
+        :param min_size: Number of connections kept open even when idle.
+        :type min_size: int
+        :param max_size: Maximum number of open connections (idle and checked out).
+        :type max_size: int
+        :param idle_timeout: Seconds after which an idle connection above ``min_size`` is closed.
+        :type idle_timeout: float
+        :param checkout_timeout: Seconds to wait for a free connection when the pool is exhausted.
+        :type checkout_timeout: float
+        :param ping_after: Idle seconds after which a connection is pinged before being handed out.
+        :type ping_after: float
+        :returns: None
+        """
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1.")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+        self._idle = collections.deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._pid = os.getpid()
+
+    def _check_process(self) -> None:
+        """
+        Forgets connections opened by a parent process. Must be called with the lock held.
+        """
+        if self._pid != os.getpid():
+            # The sockets belong to the parent, closing them here would break its sessions.
+            self._idle.clear()
+            self._size = 0
+            self._pid = os.getpid()
+
+    def _evict_idle(self) -> list:
+        """
+        Pops idle connections that exceeded ``idle_timeout``. Must be called with the lock held.
+
+        :returns: The evicted connections, to be closed outside the lock.
+        :rtype: list
+        """
+        evicted = []
+        now = time.monotonic()
+        # The left end of the deque holds the least recently used connections.
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            evicted.append(conn)
+        return evicted
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, idle_for: float) -> bool:
+        """
+        Checks whether a pooled connection is still usable.
+
+        :param conn: The connection to validate.
+        :param idle_for: Seconds the connection has been idle.
+        :type idle_for: float
+        :returns: True if the connection can be handed out.
+        :rtype: bool
+        """
+        if getattr(conn, "closed", False):
+            return False
+        if idle_for < self.ping_after:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception as e:
+            logging.warning("Discarding unhealthy pooled connection: %s", e)
+            return False
+
+    def _open(self):
+        """
+        Opens a new connection for a slot that has already been reserved in ``_size``.
+        """
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def acquire(self):
+        """
+        Checks out a healthy connection, opening a new one if the pool is not exhausted.
+
+        :returns: An open connection.
+        :raises TimeoutError: If no connection became available within ``checkout_timeout``.
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            conn = None
+            with self._cond:
+                self._check_process()
+                evicted = self._evict_idle()
+                while True:
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No database connection available after {self.checkout_timeout} seconds.")
+                    self._cond.wait(remaining)
+
+            for stale in evicted:
+                self._close_quietly(stale)
+
+            if conn is None:
+                return self._open()
+            if self._is_healthy(conn, time.monotonic() - last_used):
+                return conn
+            self.release(conn, discard=True)
+
+    def release(self, conn, discard: bool = False) -> None:
+        """
+        Returns a connection to the pool.
+
+        :param conn: The connection obtained from ``acquire``.
+        :param discard: Close the connection instead of keeping it for reuse.
+        :type discard: bool
+        :returns: None
+        """
+        with self._cond:
+            if self._pid != os.getpid():
+                # Checked out before a fork, it is not accounted for in this process.
+                return
+            self._size -= 1
+            if not discard and not getattr(conn, "closed", False):
+                self._idle.append((conn, time.monotonic()))
+                self._size += 1
+                conn = None
+            self._cond.notify()
+
+        if conn is not None:
+            self._close_quietly(conn)
+
+    @contextlib.contextmanager
+    def connection(self):
+        """
+        Context manager that checks out a connection and returns it to the pool afterwards.
+
+        If the block raises, the open transaction is rolled back. Connections that cannot even be
+        rolled back are considered broken and are closed instead of being reused.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                self.release(conn, discard=True)
+                raise
+            self.release(conn)
+            raise
+        self.release(conn)
+
+    def close(self) -> None:
+        """
+        Closes all idle connections. Checked-out connections are closed when they are released.
+
+        :returns: None
+        """
+        with self._cond:
+            idle = [conn for conn, _ in self._idle] if self._pid == os.getpid() else []
+            self._size -= len(idle)
+            self._idle.clear()
+            self.min_size = 0
+        for conn in idle:
+            self._close_quietly(conn)
+
+
+_POOLS: dict[tuple, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_connection_pool(conn_str: str, connect=None, **pool_kwargs) -> ConnectionPool:
+    """
+    Returns the process-wide connection pool for a connection string, creating it on first use.
+
+    Pools are keyed by process id, so a child process started by ``multiprocessing`` never reuses
+    the connections of its parent.
+
+    :param conn_str: ODBC connection string.
+    :type conn_str: str
+    :param connect: Callable opening a connection from ``conn_str``, defaults to ``pyodbc.connect``.
+    :type connect: callable
+    :param pool_kwargs: Keyword arguments forwarded to :class:`ConnectionPool` on creation. The
+        settings of an existing pool are kept, a warning is logged when they differ.
+    :returns: The shared connection pool.
+    :rtype: ConnectionPool
+    """
+    key = (os.getpid(), conn_str)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            connect = connect or MSSQLBackend().connect
+            pool = ConnectionPool(lambda: connect(conn_str), **pool_kwargs)
+            _POOLS[key] = pool
+            return pool
+    differing = {name: value for name, value in pool_kwargs.items() if getattr(pool, name) != value}
+    if differing:
+        logging.warning("Connection pool already exists with %s, ignoring %s.",
+                        {name: getattr(pool, name) for name in differing}, differing)
+    return pool
+
+
+def close_connection_pools() -> None:
+    """
+    Closes the idle connections of every pool owned by the current process.
+
+    :returns: None
+    """
+    with _POOLS_LOCK:
+        pools = [pool for (pid, _), pool in _POOLS.items() if pid == os.getpid()]
+    for pool in pools:
+        pool.close()
+
+
+def _forget_pools_after_fork() -> None:
+    global _POOLS_LOCK
+    _POOLS_LOCK = threading.Lock()
+    _POOLS.clear()
+
+
+atexit.register(close_connection_pools)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pools_after_fork)
 
 class PyODBCSQL:
     """
@@ -32,28 +321,43 @@ class PyODBCSQL:
 
         :password: The password for the SQL server.
 
-        :conn: The connection to the SQL server.
+        :pool: The process-wide connection pool used to run the queries.
+
+        :backend: The database backend (SQL Server or SQLite), see :mod:`utils.sql_backends`.
 
     Methods:
-        execute_query (self, query(str)): 
+        transaction(self):
+            Runs the queries of the enclosed block on one connection in one transaction.
+        savepoint(self, name=None):
+            Rolls back only the enclosed block on error, inside a transaction.
+        execute_query (self, query(str), params(tuple)): 
             Executes the specified SQL query and returns the result.
+        execute_many(self, query: str, rows: list[tuple]):
+            Executes a parameterized statement for a batch of rows.
         get_column_names(self, table_name: str):
             Returns the column names of the specified table.
+        get_table_schema(self, table_name: str):
+            Returns the column names, ordinals and SQL types of the specified table.
         get_users_credentials(self, client_ids: list[int]):
             Returns list of client credentials
-        csv_bulk_insert(self, output_csv_path: str, table_name: str):
-            Load data from a CSV file into a database table.
+        csv_bulk_insert(self, output_csv_path: str, table_name: str, options: BulkInsertOptions = None):
+            Load data from a CSV file into a database table and return the row count.
         get_all_active_client_ids(self):
             Retrieves all active Client IDs from the Database table.
+        get_all_active_credentials(self):
+            Returns the credentials of all active clients in a single query.
         check_and_create_table(self, table_name, create_table_query):
             Checks if a table exists in the database and creates it if it does not exist.
-        delete_table_data(self, table_name: str, client_id: int):
-            Deletes the data from the specified table.
+        get_client_partition(self, table_name: str, client_id: int):
+            Returns the partition holding only the rows of a client, if the table is partitioned by client.
+        delete_table_data(self, table_name: str, client_id: int, batch_size: int, pause: float, use_partitions: bool, progress):
+            Deletes the data of a client from the specified table in lock-friendly batches.
         truncate_table(self, table_name: str):
             Deletes all data for particular client_id from the specified database table.
     """
 
-    def __init__(self, database):
+    def __init__(self, database, min_pool_size: int = 0, max_pool_size: int = 5, idle_timeout: float = 300,
+                 backend: str = None):
         """
         Initializes the MSSQLDatabase class.
 
@@ -65,6 +369,14 @@ class PyODBCSQL:
         :type username: str
         :param password: The password for the SQL server.
         :type password: str
+        :param min_pool_size: Number of connections the pool keeps open while idle.
+        :type min_pool_size: int
+        :param max_pool_size: Maximum number of concurrent connections to the database.
+        :type max_pool_size: int
+        :param idle_timeout: Seconds after which idle connections above ``min_pool_size`` are closed.
+        :type idle_timeout: float
+        :param backend: ``mssql`` or ``sqlite``, see :mod:`utils.sql_backends`. Defaults to the ``SQL_BACKEND`` environment variable, then ``mssql``.
+        :type backend: str
         :returns: None
         :rtype: None
         """
@@ -73,36 +385,297 @@ class PyODBCSQL:
         self.database = database
         self.username = os.getenv("SQL_USERNAME")
         self.password = os.getenv("SQL_PASSWORD")
-        self.conn = None
+        self.pool_options = {"min_size": min_pool_size, "max_size": max_pool_size, "idle_timeout": idle_timeout}
+        self.backend = get_backend(backend)
+        self._local = threading.local()
+
+    @property
+    def connection_string(self) -> str:
+        return self.backend.connection_string(self)
 
-    def execute_query(self, query: str) -> list[tuple[str, str]]:
+    @property
+    def pool(self) -> ConnectionPool:
+        """
+        The connection pool shared by all instances pointing at the same database in this process.
+        """
+        return get_connection_pool(self.connection_string, connect=self.backend.connect, **self.pool_options)
+
+    @property
+    def in_transaction(self) -> bool:
+        """
+        Whether the current thread is inside :meth:`transaction`.
+        """
+        return getattr(self._local, "conn", None) is not None
+
+    @staticmethod
+    def _run(conn, query: str) -> None:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+        finally:
+            cursor.close()
+
+    @contextlib.contextmanager
+    def _connection(self):
+        """
+        Yields ``(connection, owned)``: the transaction connection of this thread if there is one,
+        otherwise a pooled connection that the caller commits.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn, False
+            return
+        with self.pool.connection() as conn:
+            yield conn, True
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Runs every query of the enclosed block, issued from this thread through this instance, on
+        one pooled connection inside one transaction. The transaction is committed when the block
+        exits and rolled back if it raises. A nested call becomes a :meth:`savepoint`.
+
+        :returns: The connection of the transaction.
+        """
+        if self.in_transaction:
+            with self.savepoint():
+                yield self._local.conn
+            return
+
+        with self.pool.connection() as conn:
+            self._local.conn, self._local.savepoints, self._local.callbacks = conn, 0, []
+            try:
+                if self.backend.begin_transaction_sql:
+                    self._run(conn, self.backend.begin_transaction_sql)
+                yield conn
+                conn.commit()
+            except BaseException:
+                self._run_callbacks(self._local.callbacks, committed=False)
+                raise
+            else:
+                self._run_callbacks(self._local.callbacks, committed=True)
+            finally:
+                self._local.conn, self._local.callbacks = None, []
+
+    @staticmethod
+    def _run_callbacks(callbacks: list, committed: bool) -> None:
+        for _, on_commit, on_rollback in callbacks:
+            callback = on_commit if committed else on_rollback
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception as e:
+                logging.warning("Transaction %s callback failed: %s", "commit" if committed else "rollback", e)
+
+    def after_commit(self, on_commit, on_rollback=None) -> None:
+        """
+        Runs ``on_commit`` once the work of the current thread is committed: when the outermost
+        :meth:`transaction` commits, or immediately outside a transaction. If the transaction, or
+        the savepoint the callback was registered in, is rolled back, ``on_rollback`` runs instead.
+
+        Used for side effects outside the database that must only happen if the data they describe
+        is committed, e.g. saving the snapshot of a merged delta.
+
+        :param on_commit: Zero-argument callable run after the commit.
+        :type on_commit: callable
+        :param on_rollback: Zero-argument callable run after a rollback.
+        :type on_rollback: callable, optional
+        :returns: None
+        """
+        if not self.in_transaction:
+            on_commit()
+            return
+        self._local.callbacks.append((self._local.savepoints, on_commit, on_rollback))
+
+    @contextlib.contextmanager
+    def savepoint(self, name: str = None):
+        """
+        Marks a savepoint in the current transaction. If the enclosed block raises, the work done
+        since the savepoint is rolled back and the error is re-raised, leaving the earlier work of
+        the transaction intact.
+
+        :param name: The savepoint name, generated when omitted.
+        :type name: str
+        :returns: None
+
+        :raises RuntimeError: If called outside :meth:`transaction`.
+        """
+        if not self.in_transaction:
+            raise RuntimeError("A savepoint can only be created inside a transaction.")
+
+        conn = self._local.conn
+        self._local.savepoints += 1
+        name = name or f"sp_{self._local.savepoints}"
+        self._run(conn, self.backend.savepoint_sql(name))
+        try:
+            yield
+        except BaseException:
+            for query in self.backend.rollback_savepoint_sql(name):
+                self._run(conn, query)
+            depth = self._local.savepoints
+            rolled_back = [entry for entry in self._local.callbacks if entry[0] >= depth]
+            self._local.callbacks = [entry for entry in self._local.callbacks if entry[0] < depth]
+            self._run_callbacks(rolled_back, committed=False)
+            raise
+        else:
+            if self.backend.release_savepoint_sql(name):
+                self._run(conn, self.backend.release_savepoint_sql(name))
+        finally:
+            self._local.savepoints -= 1
+
+    def execute_query(self, query: str, params: tuple | list = None) -> list[tuple[str, str]]:
         """
         Executes a SQL query and returns the result.
 
         :param query: The SQL query to execute.
         :type query: str
+        :param params: Optional values bound to the ``?`` placeholders of the query.
+        :type params: tuple | list
         :returns: The result of the query.
         :rtype: list[tuple[str, str]] | None
         """
 
-        self.conn = pyodbc.connect(
-            f"""DRIVER={{ODBC Driver 18 for SQL Server}};SERVER={self.server};DATABASE={self.database};
-                                UID={self.username};PWD={self.password}""",
-            TrustServerCertificate="yes",
-        )
-        
-        cursor = self.conn.cursor()
-        cursor.execute(query)
+        query = self.backend.translate(query)
+        with self._connection() as (conn, owned):
+            cursor = conn.cursor()
+            try:
+                if params is None:
+                    cursor.execute(query)
+                else:
+                    cursor.execute(query, params)
+
+                if cursor.description is not None:
+                    data = cursor.fetchall()
+                else:
+                    data = None
+
+                if owned:
+                    conn.commit()
+            finally:
+                cursor.close()
+        return data
 
-        if cursor.description is not None:
-            data = cursor.fetchall()
-        else:
-            data = None
+    def execute_many(self, query: str, rows: list[tuple]) -> None:
+        """
+        Executes a parameterized SQL statement once per row in a single round-trip batch.
 
-        self.conn.commit()
-        cursor.close()
-        self.conn.close()
-        return data
+        :param query: The SQL statement with ``?`` placeholders.
+        :type query: str
+        :param rows: One tuple of parameter values per execution.
+        :type rows: list[tuple]
+        :returns: None
+        """
+        if not rows:
+            return
+
+        query = self.backend.translate(query)
+        with self._connection() as (conn, owned):
+            cursor = conn.cursor()
+            try:
+                if self.backend.fast_executemany:
+                    cursor.fast_executemany = True
+                cursor.executemany(query, rows)
+                if owned:
+                    conn.commit()
+            finally:
+                cursor.close()
+
+    def _fetch_batches(self, query: str, params: tuple | list = None, batch_size: int = FETCH_BATCH_SIZE):
+        """
+        Executes a query and yields ``(column_names, rows)`` pairs of at most ``batch_size`` rows.
+        The first pair is yielded even if the result is empty.
+
+        The pooled connection is held until the generator is exhausted or closed.
+        """
+        query = self.backend.translate(query)
+        with self._connection() as (conn, owned):
+            cursor = conn.cursor()
+            try:
+                if params is None:
+                    cursor.execute(query)
+                else:
+                    cursor.execute(query, params)
+
+                if cursor.description is not None:
+                    columns = [col[0] for col in cursor.description]
+                    cursor.arraysize = batch_size
+                    rows = cursor.fetchmany(batch_size)
+                    # An empty result still yields once, so callers learn the column names.
+                    yield columns, rows
+                    while rows:
+                        rows = cursor.fetchmany(batch_size)
+                        if rows:
+                            yield columns, rows
+
+                if owned:
+                    conn.commit()
+            finally:
+                cursor.close()
+
+    def iter_query(self, query: str, params: tuple | list = None, batch_size: int = FETCH_BATCH_SIZE):
+        """
+        Executes a SQL query and yields the result in batches, so large results are never held in memory at once.
+
+        The pooled connection stays checked out while iterating. Exhaust the generator or close it
+        (e.g. with ``contextlib.closing``) when stopping early, so the connection returns to the pool.
+
+        :param query: The SQL query to execute.
+        :type query: str
+        :param params: Optional values bound to the ``?`` placeholders of the query.
+        :type params: tuple | list
+        :param batch_size: Maximum number of rows per batch.
+        :type batch_size: int
+        :returns: A generator of row batches.
+        :rtype: Iterator[list[tuple]]
+        """
+        for _, rows in self._fetch_batches(query, params, batch_size):
+            if rows:
+                yield rows
+
+    def query_polars(self, query: str, params: tuple | list = None, batch_size: int = FETCH_BATCH_SIZE,
+                     use_arrow: bool = None) -> pl.DataFrame:
+        """
+        Executes a SQL query and returns the result as a Polars DataFrame, built batch by batch.
+
+        When ``arrow-odbc`` is installed the result is read as Arrow record batches instead, which
+        avoids creating a Python object per value. Arrow reads open their own connection and do
+        not support ``params``.
+
+        :param query: The SQL query to execute.
+        :type query: str
+        :param params: Optional values bound to the ``?`` placeholders of the query.
+        :type params: tuple | list
+        :param batch_size: Number of rows fetched per round-trip.
+        :type batch_size: int
+        :param use_arrow: Forces (True) or disables (False) the Arrow path. By default Arrow is used when available.
+        :type use_arrow: bool
+        :returns: The query result. Empty if the query returns no rows.
+        :rtype: pl.DataFrame
+
+        :raises ImportError: If ``use_arrow`` is True and ``arrow-odbc`` is not installed.
+        """
+        if use_arrow is None:
+            use_arrow = (read_arrow_batches_from_odbc is not None and params is None and self.backend.supports_arrow
+                         and not self.in_transaction)
+        if use_arrow:
+            if read_arrow_batches_from_odbc is None:
+                raise ImportError("arrow-odbc is required to read query results as Arrow batches.")
+            reader = read_arrow_batches_from_odbc(query=query, connection_string=self.connection_string,
+                                                  batch_size=batch_size)
+            frames = [pl.from_arrow(batch) for batch in reader]
+            if not frames:
+                return pl.from_arrow(reader.schema.empty_table())
+            return pl.concat(frames, rechunk=True)
+
+        columns, frames = [], []
+        for columns, rows in self._fetch_batches(query, params, batch_size):
+            if rows:
+                frames.append(pl.DataFrame(rows, schema=columns, orient="row", infer_schema_length=None))
+        if not frames:
+            return pl.DataFrame(schema={col: pl.Null for col in columns})
+        # A batch that is entirely NULL in a column infers the Null dtype, so relax to the common type.
+        return pl.concat(frames, how="vertical_relaxed", rechunk=True)
 
     def get_column_names(self, table_name: str) -> list[tuple[str, str]]:
         """
@@ -113,8 +686,18 @@ class PyODBCSQL:
         :returns: The column names of the specified table.
         :rtype: list[tuple[str, str]]
         """
-        column_names_query = f"SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = '{table_name}';"
-        return self.execute_query(column_names_query)
+        return [(row[0],) for row in self.get_table_schema(table_name)]
+
+    def get_table_schema(self, table_name: str) -> list[tuple]:
+        """
+        Returns the column metadata of the specified table, ordered by ordinal position.
+
+        :param table_name: The name of the table to describe.
+        :type table_name: str
+        :returns: ``(column_name, ordinal_position, data_type, max_length, precision, scale)`` rows.
+        :rtype: list[tuple]
+        """
+        return self.backend.table_schema(self, table_name)
 
     def get_users_credentials(self, client_ids: list[int]) -> list[tuple[str, str]]:
         """
@@ -139,11 +722,11 @@ class PyODBCSQL:
             logging.info("Successfully retrieved user credentials.")
             return [(row[0], row[1], row[2]) for row in results]
 
-        except pyodbc.Error as e:
+        except self.backend.Error as e:
             logging.error(f"Database error occurred while fecthing users credentials: {e}")
             raise
 
-    def csv_bulk_insert(self, output_csv_path: str, table_name: str) -> None:
+    def csv_bulk_insert(self, output_csv_path: str, table_name: str, options: BulkInsertOptions = None) -> int:
         """
         Load data from a CSV file into a database table.
 
@@ -154,23 +737,16 @@ class PyODBCSQL:
         :type output_csv_path: str
         :param table_name: The name of the target database table.
         :type table_name: str
-        :returns: None
+        :param options: Table lock, batching and error file options of the load.
+        :type options: BulkInsertOptions
+        :returns: The number of rows loaded, as reported by the server.
+        :rtype: int
         """
         try:
-            sql = f"""
-            BULK INSERT {table_name}
-            FROM '{output_csv_path}'
-            WITH (
-                FORMAT = 'CSV',
-                FIELDTERMINATOR = ',',
-                ROWTERMINATOR = '0x0A',
-                FIRSTROW = 2,
-                FIELDQUOTE = '"'
-            );
-            """
-            self.execute_query(sql)
-            logging.info(f"Records inserted successfully.")
-        except pyodbc.Error as e:
+            rows_loaded = self.backend.csv_bulk_insert(self, output_csv_path, table_name, options)
+            logging.info("Inserted %s records into '%s' (%s).", rows_loaded, table_name, options or "default options")
+            return rows_loaded
+        except self.backend.Error as e:
             logging.error(f"Code: {em.DATA_LOAD_ISSUE} | Message : Database operation failed while bulk insert into database.")
             raise
     
@@ -191,6 +767,21 @@ class PyODBCSQL:
             logging.error("Failed to retrieve Client IDs: %s", str(e))
             raise
 
+    def get_all_active_credentials(self) -> list[tuple[int, str, str]]:
+        """
+        Retrieves the credentials of all active clients in a single query.
+
+        :returns: A list of tuples, where each tuple contains (client_id, Username, Password).
+        :rtype: list[tuple[int, str, str]]
+        """
+        try:
+            results = self.execute_query("SELECT client_id, Username, Password FROM bi_afc.dbo.afc_password_tbl WHERE active = 1;")
+            logging.info("Successfully retrieved credentials of %d active clients.", len(results))
+            return [(row[0], row[1], row[2]) for row in results]
+        except self.backend.Error as e:
+            logging.error(f"Database error occurred while fecthing active credentials: {e}")
+            raise
+
     def check_and_create_table(self, table_name, create_table_query):
         """
         Checks if a table exists in the database and creates it if it does not exist.
@@ -204,7 +795,7 @@ class PyODBCSQL:
         try:
             logging.info("Checking if table '%s' exists.", table_name)
             
-            result = self.execute_query(f"SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME = '{table_name}';")
+            result = self.execute_query(*self.backend.table_exists_query(table_name))
             table_exists = result[0][0]
 
             if table_exists == 1:
@@ -217,26 +808,106 @@ class PyODBCSQL:
             logging.error("Error checking or creating table '%s': %s", table_name, str(e))
             raise
 
-    def delete_table_data(self, table_name: str, client_id: int) -> None:
+    def get_client_partition(self, table_name: str, client_id: int) -> tuple[int, int] | None:
+        """
+        Returns the partition holding a client's rows, if the table is partitioned on ``Client_ID``
+        and that partition holds no other client.
+
+        :param table_name: The name of the table.
+        :type table_name: str
+        :param client_id: The client ID.
+        :type client_id: int
+        :returns: ``(partition_number, rows)``, or None if the partition cannot be truncated on its own.
+        :rtype: tuple[int, int] | None
+        """
+        if not self.backend.supports_partitions:
+            return None
+
+        scheme = self.execute_query(
+            """SELECT pf.name, c.name
+               FROM sys.indexes i
+               JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+               JOIN sys.partition_functions pf ON pf.function_id = ps.function_id
+               JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id AND ic.partition_ordinal = 1
+               JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+               WHERE i.object_id = OBJECT_ID(?) AND i.index_id IN (0, 1);""",
+            (table_name,),
+        )
+        if not scheme or scheme[0][1].lower() != "client_id":
+            return None
+
+        function_name = scheme[0][0]
+        partition, others, rows = self.execute_query(
+            f"""SELECT p.partition_number,
+                       (SELECT COUNT(*) FROM {table_name}
+                        WHERE $PARTITION.{function_name}(Client_ID) = p.partition_number
+                          AND (Client_ID <> ? OR Client_ID IS NULL)),
+                       (SELECT SUM(rows) FROM sys.partitions
+                        WHERE object_id = OBJECT_ID(?) AND index_id IN (0, 1) AND partition_number = p.partition_number)
+                FROM (SELECT $PARTITION.{function_name}(?) AS partition_number) AS p;""",
+            (client_id, table_name, client_id),
+        )[0]
+        if others:
+            logging.info("Partition %s of '%s' is shared with other clients, using batched deletes.", partition, table_name)
+            return None
+        return partition, rows or 0
+
+    def delete_table_data(self, table_name: str, client_id: int, batch_size: int = DELETE_BATCH_SIZE,
+                          pause: float = 0.0, use_partitions: bool = True, progress=None) -> int:
         """
         Deletes all data for particular client_id from the specified database table.
 
-        This method executes a SQL `DELETE` statement to remove all rows of the particular client_id from the given table. 
+        If the table is partitioned on ``Client_ID`` and the client has a partition of its own, the
+        partition is truncated, which is a metadata-only operation. Otherwise the rows are deleted in
+        batches of ``batch_size``, each committed on its own (unless called inside
+        :meth:`transaction`), so the delete never escalates to a table lock that blocks the loads of
+        other clients and the transaction log can be reused between batches.
 
         :param table_name: The name of the table from which data should be deleted.
         :type table_name: str
         :param client_id: Client ID for which the data to be deleted.
         :type client_id: int
-        :returns: None
+        :param batch_size: Rows deleted per statement. ``None`` deletes everything in one statement.
+        :type batch_size: int
+        :param pause: Seconds to sleep between batches, giving other sessions room on busy tables.
+        :type pause: float
+        :param use_partitions: Truncate the client's partition when the table is partitioned by client.
+        :type use_partitions: bool
+        :param progress: Optional callable receiving the number of rows deleted so far after every batch.
+        :type progress: callable
+        :returns: The number of rows deleted.
+        :rtype: int
 
         :raises pyodbc.Error: If an error occurs while executing the SQL query.
         """
         try:
-            query = f"DELETE FROM {table_name} where Client_id = {client_id}"
-            self.execute_query(query)
-            logging.info(f"Successfully deleted table data for client : {client_id}.")
-
-        except pyodbc.Error as e:
+            partition = self.get_client_partition(table_name, client_id) if use_partitions else None
+            if partition is not None:
+                partition_number, rows = partition
+                self.execute_query(f"TRUNCATE TABLE {table_name} WITH (PARTITIONS ({partition_number}));")
+                logging.info("Truncated partition %s of '%s' (%s rows) for client : %s.", partition_number, table_name, rows, client_id)
+                if progress:
+                    progress(rows)
+                return rows
+
+            deleted = 0
+            started = time.monotonic()
+            while True:
+                count = self.backend.delete_batch(self, table_name, "Client_ID", client_id, batch_size)
+                deleted += count
+                if progress:
+                    progress(deleted)
+                if not batch_size or count < batch_size:
+                    break
+                logging.info("Deleted %d rows of client %s from '%s' so far (%.0f rows/s).",
+                             deleted, client_id, table_name, deleted / max(time.monotonic() - started, 1e-6))
+                if pause:
+                    time.sleep(pause)
+
+            logging.info(f"Successfully deleted {deleted} rows of table data for client : {client_id}.")
+            return deleted
+
+        except self.backend.Error as e:
             logging.error(f"Database error occurred while deleting the table data: {e}")
             raise
 
@@ -257,7 +928,7 @@ class PyODBCSQL:
             self.execute_query(query)
             logging.info(f"Successfully deleted table data.")
 
-        except pyodbc.Error as e:
+        except self.backend.Error as e:
             logging.error(f"Database error occurred while deleting the table data: {e}")
             raise
 
@@ -283,8 +954,8 @@ class PyODBCSQL:
         :returns: None
         """
         query = f"""INSERT INTO {table_name} WITH (ROWLOCK) (etl_id, client_id, report_name, status, date_updated)
-                VALUES ('{etl_log_id}', '{client_id}', '{report_name}', 'IN_PROGRESS', '{date_updated}');"""
-        self.execute_query(query)
+                VALUES (?, ?, ?, 'IN_PROGRESS', ?);"""
+        self.execute_query(query, (etl_log_id, str(client_id), report_name, date_updated))
 
 
     def log_etl_success(self, table_name, etl_log_id, date_updated):
@@ -303,9 +974,9 @@ class PyODBCSQL:
         :returns: None
         """
         query = f"""UPDATE {table_name} WITH (ROWLOCK) 
-                    SET status = 'SUCCESS', date_updated = '{date_updated}' 
-                    WHERE etl_id = '{etl_log_id}';"""
-        self.execute_query(query)
+                    SET status = 'SUCCESS', date_updated = ? 
+                    WHERE etl_id = ?;"""
+        self.execute_query(query, (date_updated, etl_log_id))
 
 
     def log_etl_failure(self, table_name, etl_log_id, date_updated, error_msg):
@@ -327,9 +998,26 @@ class PyODBCSQL:
         :returns: None
         """
         query = f"""UPDATE {table_name} WITH (ROWLOCK) 
-                    SET status = 'FAILED', date_updated = '{date_updated}', error_msg = '{error_msg}' 
-                    WHERE etl_id = '{etl_log_id}';"""
-        self.execute_query(query)
+                    SET status = 'FAILED', date_updated = ?, error_msg = ? 
+                    WHERE etl_id = ?;"""
+        self.execute_query(query, (date_updated, str(error_msg), etl_log_id))
+
+    def upsert_etl_status(self, table_name: str, rows: list[tuple]) -> None:
+        """
+        Inserts or updates a batch of ETL status rows in one parameterized statement.
+
+        Each row is ``(etl_id, client_id, report_name, status, date_updated, error_msg)``. A ``None``
+        ``client_id`` or ``report_name`` keeps the value already stored for that ``etl_id``.
+
+        :type table_name: str
+        :param table_name: Name of the ETL log table in the database.
+
+        :type rows: list[tuple]
+        :param rows: The status rows to write.
+
+        :returns: None
+        """
+        self.backend.upsert_etl_status(self, table_name, rows)
 
 
 if __name__ == "__main__":
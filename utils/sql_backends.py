@@ -0,0 +1,378 @@
+"""
+SQL Backends
+
+This module contains the database backends used by :class:`utils.pyodbc_sql.PyODBCSQL`. The
+``mssql`` backend talks to SQL Server through pyodbc and is used in production. The ``sqlite``
+backend runs the same ETL against a local SQLite file, so the transform and load pipeline can be
+benchmarked and profiled without a SQL Server instance or an ODBC driver.
+
+The backend is selected with the ``backend`` argument of ``PyODBCSQL`` or the ``SQL_BACKEND``
+environment variable.
+
+:module: sql_backends.py
+:platform: Unix, Windows
+:synopsis: Pluggable SQL Server and SQLite backends for PyODBCSQL.
+"""
+
+import os
+import re
+import csv
+import time
+import sqlite3
+import logging
+from decimal import Decimal
+from datetime import date, datetime
+
+try:
+    import pyodbc
+except ImportError:
+    # Only the mssql backend needs pyodbc, the sqlite backend works without an ODBC driver.
+    pyodbc = None
+
+
+class BulkInsertOptions:
+    """
+    Tuning options of a ``BULK INSERT`` load.
+
+    ``tablock`` takes a table lock, which together with an empty or heap target table and the SIMPLE
+    or BULK_LOGGED recovery model makes the load minimally logged. Every client has its own staging
+    table, so the lock does not block other clients. ``batch_size`` commits every N rows, which
+    bounds the transaction log; leave it unset to load the file in a single batch.
+
+    Attributes:
+        :tablock: Take a bulk update table lock (``TABLOCK``).
+
+        :batch_size: Rows per committed batch (``BATCHSIZE``).
+
+        :rows_per_batch: Approximate row count of the file, used by the optimizer when ``batch_size`` is not set (``ROWS_PER_BATCH``).
+
+        :order: Columns the file is sorted by, matching the clustered index of the target (``ORDER``).
+
+        :max_errors: Rejected rows tolerated before the load fails (``MAXERRORS``).
+
+        :codepage: Code page of the file, e.g. ``65001`` for UTF-8 (``CODEPAGE``).
+
+        :error_file: Server-side path receiving the rejected rows (``ERRORFILE``). May contain ``{table}`` and
+            ``{timestamp}`` placeholders, since ``BULK INSERT`` fails if the error file already exists.
+    """
+
+    def __init__(self, tablock: bool = False, batch_size: int = None, rows_per_batch: int = None,
+                 order: list[str] = None, max_errors: int = None, codepage: str | int = None,
+                 error_file: str = None) -> None:
+        self.tablock = tablock
+        self.batch_size = batch_size
+        self.rows_per_batch = rows_per_batch
+        self.order = order
+        self.max_errors = max_errors
+        self.codepage = codepage
+        self.error_file = error_file
+
+    def with_options(self, table_name: str) -> list[str]:
+        """
+        Renders the options as ``BULK INSERT ... WITH`` clauses.
+
+        :param table_name: The target table, substituted into the ``error_file`` template.
+        :type table_name: str
+        :returns: The clauses, without the CSV format options.
+        :rtype: list[str]
+        """
+        options = []
+        if self.tablock:
+            options.append("TABLOCK")
+        if self.batch_size:
+            options.append(f"BATCHSIZE = {int(self.batch_size)}")
+        if self.rows_per_batch:
+            options.append(f"ROWS_PER_BATCH = {int(self.rows_per_batch)}")
+        if self.order:
+            options.append(f"ORDER ({', '.join(self.order)})")
+        if self.max_errors is not None:
+            options.append(f"MAXERRORS = {int(self.max_errors)}")
+        if self.codepage:
+            options.append(f"CODEPAGE = '{self.codepage}'")
+        if self.error_file:
+            error_file = self.error_file.format(table=table_name, timestamp=time.strftime("%Y%m%d_%H%M%S"))
+            options.append(f"ERRORFILE = '{error_file}'")
+        return options
+
+    def __repr__(self) -> str:
+        set_options = {key: value for key, value in vars(self).items() if value not in (None, False)}
+        return f"BulkInsertOptions({', '.join(f'{key}={value!r}' for key, value in set_options.items())})"
+
+
+class MSSQLBackend:
+    """
+    SQL Server backend using pyodbc and ``ODBC Driver 18 for SQL Server``.
+
+    Every dialect hook is a no-op or the original T-SQL, so queries written for SQL Server run unchanged.
+
+    Methods:
+        connection_string(self, sql):
+            Returns the ODBC connection string of a database.
+        connect(self, connection_string):
+            Opens a new connection.
+        translate(self, query):
+            Rewrites a T-SQL statement for the backend.
+        savepoint_sql(self, name), rollback_savepoint_sql(self, name), release_savepoint_sql(self, name):
+            Return the statements managing a savepoint.
+        table_exists_query(self, table_name):
+            Returns a query and parameters counting the tables with the given name.
+        table_schema(self, sql, table_name):
+            Returns the column metadata of a table.
+        csv_bulk_insert(self, sql, csv_path, table_name, options=None):
+            Loads a CSV file into a table and returns the number of rows loaded.
+        delete_batch(self, sql, table_name, column, value, batch_size=None):
+            Deletes one batch of matching rows and returns the number deleted.
+        upsert_etl_status(self, sql, table_name, rows):
+            Inserts or updates a batch of ETL status rows.
+    """
+
+    name = "mssql"
+    fast_executemany = True
+    supports_merge = True
+    supports_arrow = True
+    supports_partitions = True
+
+    @property
+    def Error(self):
+        return pyodbc.Error
+
+    def connection_string(self, sql) -> str:
+        return (f"DRIVER={{ODBC Driver 18 for SQL Server}};SERVER={sql.server};DATABASE={sql.database};"
+                f"UID={sql.username};PWD={sql.password}")
+
+    def connect(self, connection_string: str):
+        return pyodbc.connect(connection_string, TrustServerCertificate="yes")
+
+    def translate(self, query: str) -> str:
+        return query
+
+    # pyodbc connections are in manual-commit mode, an explicit BEGIN makes SAVE TRANSACTION valid from the first statement.
+    begin_transaction_sql = "IF @@TRANCOUNT = 0 BEGIN TRANSACTION;"
+
+    def savepoint_sql(self, name: str) -> str:
+        return f"SAVE TRANSACTION {name};"
+
+    def rollback_savepoint_sql(self, name: str) -> list[str]:
+        return [f"ROLLBACK TRANSACTION {name};"]
+
+    def release_savepoint_sql(self, name: str) -> str | None:
+        # SQL Server savepoints are released with the transaction.
+        return None
+
+    def table_exists_query(self, table_name: str) -> tuple[str, tuple]:
+        return "SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME = ?;", (table_name,)
+
+    def table_schema(self, sql, table_name: str) -> list[tuple]:
+        """
+        Returns the column metadata of a table, ordered by ordinal position.
+
+        :param sql: The database wrapper used to run the query.
+        :type sql: PyODBCSQL
+        :param table_name: The name of the table to describe.
+        :type table_name: str
+        :returns: ``(column_name, ordinal_position, data_type, max_length, precision, scale)`` rows.
+        :rtype: list[tuple]
+        """
+        schema_query = """SELECT COLUMN_NAME, ORDINAL_POSITION, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE
+                          FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = ? ORDER BY ORDINAL_POSITION;"""
+        return [tuple(row) for row in sql.execute_query(schema_query, (table_name,))]
+
+    def csv_bulk_insert(self, sql, csv_path: str, table_name: str, options: BulkInsertOptions = None) -> int:
+        """
+        Loads a CSV file with a header row into a table using ``BULK INSERT``.
+        The paths are resolved by the SQL Server instance, not by this process.
+
+        :returns: The number of rows reported by the server.
+        :rtype: int
+        """
+        with_clauses = [
+            "FORMAT = 'CSV'",
+            "FIELDTERMINATOR = ','",
+            "ROWTERMINATOR = '0x0A'",
+            "FIRSTROW = 2",
+            "FIELDQUOTE = '\"'",
+        ] + (options or BulkInsertOptions()).with_options(table_name)
+        with_clause = ",\n                ".join(with_clauses)
+        query = f"""SET NOCOUNT ON;
+            BULK INSERT {table_name}
+            FROM '{csv_path}'
+            WITH (
+                {with_clause}
+            );
+            SELECT @@ROWCOUNT;
+            """
+        return sql.execute_query(query)[0][0]
+
+    def delete_batch(self, sql, table_name: str, column: str, value, batch_size: int = None) -> int:
+        """
+        Deletes at most ``batch_size`` rows where ``column`` equals ``value``, all of them if ``batch_size`` is None.
+
+        :returns: The number of rows deleted.
+        :rtype: int
+        """
+        top = f"TOP ({int(batch_size)}) " if batch_size else ""
+        query = f"SET NOCOUNT ON; DELETE {top}FROM {table_name} WHERE {column} = ?; SELECT @@ROWCOUNT;"
+        return sql.execute_query(query, (value,))[0][0]
+
+    def upsert_etl_status(self, sql, table_name: str, rows: list[tuple]) -> None:
+        query = f"""MERGE {table_name} WITH (HOLDLOCK) AS target
+                    USING (SELECT ? AS etl_id, ? AS client_id, ? AS report_name, ? AS status, ? AS date_updated, ? AS error_msg) AS source
+                    ON target.etl_id = source.etl_id
+                    WHEN MATCHED THEN UPDATE SET
+                        client_id = COALESCE(source.client_id, target.client_id),
+                        report_name = COALESCE(source.report_name, target.report_name),
+                        status = source.status,
+                        date_updated = source.date_updated,
+                        error_msg = source.error_msg
+                    WHEN NOT MATCHED THEN
+                        INSERT (etl_id, client_id, report_name, status, date_updated, error_msg)
+                        VALUES (source.etl_id, source.client_id, source.report_name, source.status, source.date_updated, source.error_msg);"""
+        sql.execute_many(query, rows)
+
+
+# Typed parameters from columnar loads are stored as their text form, like BULK INSERT would.
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+
+
+class SQLiteBackend(MSSQLBackend):
+    """
+    SQLite backend for offline benchmarks and development.
+
+    Each database is a file ``<SQLITE_DIR>/<database>.sqlite3`` (``SQLITE_DIR`` defaults to ``sqlite``).
+    :meth:`translate` rewrites the T-SQL constructs used by the ETL (table hints, ``(MAX)`` lengths,
+    ``TRUNCATE``, ``SELECT TOP 0 ... INTO`` and three-part names) so existing queries run unchanged.
+    ``MERGE`` based loads are not supported.
+    """
+
+    name = "sqlite"
+    fast_executemany = False
+    supports_merge = False
+    supports_arrow = False
+    supports_partitions = False
+    Error = sqlite3.Error
+
+    CSV_BATCH_SIZE = 10000
+
+    _REWRITES = [
+        (re.compile(r"\bWITH\s*\(\s*(?:ROWLOCK|HOLDLOCK|TABLOCK|NOLOCK|UPDLOCK)(?:\s*,\s*\w+)*\s*\)", re.I), ""),
+        (re.compile(r"\(\s*MAX\s*\)", re.I), ""),
+        (re.compile(r"\b\w+\.dbo\.(\w+)", re.I), r"\1"),
+        (re.compile(r"^\s*TRUNCATE\s+TABLE\s+", re.I), "DELETE FROM "),
+        (re.compile(r"^\s*IF\s+OBJECT_ID\(\s*N?'(\w+)'\s*,\s*N?'U'\s*\)\s+IS\s+NULL\s+SELECT\s+TOP\s+0\s+\*\s+INTO\s+\w+\s+FROM\s+(\w+)", re.I),
+         r"CREATE TABLE IF NOT EXISTS \1 AS SELECT * FROM \2 WHERE 0"),
+        (re.compile(r"^\s*SELECT\s+TOP\s+0\s+\*\s+INTO\s+(\w+)\s+FROM\s+(\w+)", re.I), r"CREATE TABLE \1 AS SELECT * FROM \2 WHERE 0"),
+        (re.compile(r"^\s*SELECT\s+TOP\s+(\d+)\s+(.*?);?\s*$", re.I | re.S), r"SELECT \2 LIMIT \1"),
+    ]
+    _TYPE = re.compile(r"^\s*(\w+)\s*(?:\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?")
+
+    def connection_string(self, sql) -> str:
+        return os.path.join(os.getenv("SQLITE_DIR", "sqlite"), f"{sql.database}.sqlite3")
+
+    def connect(self, connection_string: str):
+        os.makedirs(os.path.dirname(os.path.abspath(connection_string)), exist_ok=True)
+        return sqlite3.connect(connection_string, timeout=30, check_same_thread=False)
+
+    def translate(self, query: str) -> str:
+        for pattern, replacement in self._REWRITES:
+            query = pattern.sub(replacement, query)
+        return query
+
+    begin_transaction_sql = "BEGIN;"
+
+    def savepoint_sql(self, name: str) -> str:
+        return f"SAVEPOINT {name};"
+
+    def rollback_savepoint_sql(self, name: str) -> list[str]:
+        return [f"ROLLBACK TO SAVEPOINT {name};", f"RELEASE SAVEPOINT {name};"]
+
+    def release_savepoint_sql(self, name: str) -> str | None:
+        return f"RELEASE SAVEPOINT {name};"
+
+    def table_exists_query(self, table_name: str) -> tuple[str, tuple]:
+        return "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?;", (table_name,)
+
+    def table_schema(self, sql, table_name: str) -> list[tuple]:
+        rows = []
+        for cid, name, declared_type, *_ in sql.execute_query(f"PRAGMA table_info({table_name});") or []:
+            match = self._TYPE.match(declared_type or "")
+            data_type = match.group(1).lower() if match and match.group(1) else "text"
+            size, scale = (match.group(2), match.group(3)) if match else (None, None)
+            if data_type in ("decimal", "numeric"):
+                rows.append((name, cid + 1, data_type, None, int(size) if size else 18, int(scale) if scale else 0))
+            elif data_type.endswith("char"):
+                rows.append((name, cid + 1, data_type, int(size) if size else -1, None, None))
+            else:
+                rows.append((name, cid + 1, data_type, None, None, None))
+        return rows
+
+    def csv_bulk_insert(self, sql, csv_path: str, table_name: str, options: BulkInsertOptions = None) -> int:
+        """
+        Loads a CSV file with a header row into a table with batched ``executemany`` calls.
+        Columns are matched by position, like ``BULK INSERT``, and empty fields are loaded as NULL.
+        Only ``batch_size`` of the options applies, the others are SQL Server specific.
+        """
+        batch_size = (options and options.batch_size) or self.CSV_BATCH_SIZE
+        loaded = 0
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return 0
+            query = f"INSERT INTO {table_name} VALUES ({', '.join('?' * len(header))});"
+            batch = []
+            for row in reader:
+                batch.append([value if value != "" else None for value in row])
+                if len(batch) >= batch_size:
+                    sql.execute_many(query, batch)
+                    loaded += len(batch)
+                    batch = []
+            sql.execute_many(query, batch)
+        return loaded + len(batch)
+
+    def delete_batch(self, sql, table_name: str, column: str, value, batch_size: int = None) -> int:
+        if batch_size:
+            query = f"""DELETE FROM {table_name} WHERE rowid IN
+                        (SELECT rowid FROM {table_name} WHERE {column} = ? LIMIT {int(batch_size)}) RETURNING 1;"""
+        else:
+            query = f"DELETE FROM {table_name} WHERE {column} = ? RETURNING 1;"
+        return len(sql.execute_query(query, (value,)) or [])
+
+    def upsert_etl_status(self, sql, table_name: str, rows: list[tuple]) -> None:
+        query = f"""INSERT INTO {table_name} (etl_id, client_id, report_name, status, date_updated, error_msg)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (etl_id) DO UPDATE SET
+                        client_id = COALESCE(excluded.client_id, client_id),
+                        report_name = COALESCE(excluded.report_name, report_name),
+                        status = excluded.status,
+                        date_updated = excluded.date_updated,
+                        error_msg = excluded.error_msg;"""
+        sql.execute_many(query, rows)
+
+
+BACKENDS = {
+    "mssql": MSSQLBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def get_backend(name: str = None) -> MSSQLBackend:
+    """
+    Returns the backend registered under ``name``, defaulting to the ``SQL_BACKEND`` environment variable, then ``mssql``.
+
+    :param name: The backend name.
+    :type name: str
+    :returns: The backend instance.
+    :rtype: MSSQLBackend
+
+    :raises ValueError: If the backend is unknown.
+    :raises ImportError: If the mssql backend is requested but pyodbc cannot be imported.
+    """
+    name = (name or os.getenv("SQL_BACKEND") or "mssql").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown SQL backend '{name}', expected one of {sorted(BACKENDS)}.")
+    if name == "mssql" and pyodbc is None:
+        raise ImportError("pyodbc is required for the mssql backend. Set SQL_BACKEND=sqlite to run offline.")
+    logging.debug("Using the '%s' SQL backend.", name)
+    return BACKENDS[name]()